@@ -1,6 +1,11 @@
 import yaml
+import hashlib
 import logging
-from sqlalchemy import create_engine, Engine
+from typing import Optional
+from sqlalchemy import create_engine, Engine, MetaData, text
+from sqlalchemy.dialects import mysql
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.schema import CreateTable, CreateIndex
 from sqlmodel import SQLModel
 
 logging.basicConfig(level=logging.INFO)
@@ -9,8 +14,13 @@ log = logging.getLogger(__name__)
 """
 建表
 需要在工程根目录下通过 python -m base.init_db 执行
+
+应用启动时只比对 schema_version 中记录的表结构指纹，一致则跳过 create_all（不反射表）；
+命令行执行时始终完整执行 DDL
 """
 
+SCHEMA_VERSION_TABLE = "schema_version"
+
 def get_database_uri_from_config() -> str:
     try:
         with open("config.yaml", "r") as f:
@@ -38,11 +48,59 @@ def get_mysql_sync_engine(db_uri: str, echo: bool = False) -> Engine:
     return engine
 
 
-def init_database(verbose: bool = False):
+def compute_schema_fingerprint(metadata: MetaData) -> str:
+    """计算表结构指纹（按表名排序后的 MySQL DDL 的 sha256）
+
+    Args:
+        metadata: SQLModel/SQLAlchemy MetaData
+
+    Returns:
+        str: 64位十六进制指纹
+    """
+    dialect = mysql.dialect()
+    digest = hashlib.sha256()
+    for table in sorted(metadata.tables.values(), key=lambda t: t.name):
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode("utf-8"))
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def get_stored_fingerprint(engine: Engine) -> Optional[str]:
+    """读取已记录的表结构指纹，版本表不存在时返回 None"""
+    try:
+        with engine.connect() as conn:
+            row = conn.execute(text(
+                f"SELECT fingerprint FROM {SCHEMA_VERSION_TABLE} WHERE id = 1"
+            )).fetchone()
+            return row[0] if row else None
+    except ProgrammingError:
+        # 版本表尚未创建（首次启动或旧库）
+        return None
+
+
+def save_fingerprint(engine: Engine, fingerprint: str):
+    """记录表结构指纹（版本表只有 id = 1 一行）"""
+    with engine.begin() as conn:
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} (
+                id INT PRIMARY KEY,
+                fingerprint VARCHAR(64) NOT NULL,
+                updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='表结构指纹'
+        """))
+        conn.execute(text(f"""
+            INSERT INTO {SCHEMA_VERSION_TABLE} (id, fingerprint) VALUES (1, :fingerprint)
+            ON DUPLICATE KEY UPDATE fingerprint = VALUES(fingerprint)
+        """), {"fingerprint": fingerprint})
+
+
+def init_database(verbose: bool = False, force: bool = False):
     """初始化数据库，创建所有定义的 SQLModel 表
 
     Args:
         verbose: 是否打印详细日志（包括SQL语句）
+        force: 是否忽略指纹强制执行 create_all（命令行执行时为 True）
     """
     log.info("Starting database initialization...")
     try:
@@ -55,6 +113,7 @@ def init_database(verbose: bool = False):
             BetTable,
             ChatTable,
             DrawHistoryTable,
+            DrawChatResultTable,
             OddsConfigTable,
             AdminAccountTable,
             OnlineStatusTable,
@@ -79,6 +138,7 @@ def init_database(verbose: bool = False):
             log.info(f"  - {BetTable.__tablename__}")
             log.info(f"  - {ChatTable.__tablename__}")
             log.info(f"  - {DrawHistoryTable.__tablename__}")
+            log.info(f"  - {DrawChatResultTable.__tablename__}")
             log.info(f"  - {OddsConfigTable.__tablename__}")
             log.info(f"  - {AdminAccountTable.__tablename__}")
             log.info(f"  - {OnlineStatusTable.__tablename__}")
@@ -89,15 +149,22 @@ def init_database(verbose: bool = False):
         db_uri = get_database_uri_from_config()
         engine = get_mysql_sync_engine(db_uri, echo=verbose)
 
-        if verbose:
-            log.info("Creating tables...")
+        try:
+            fingerprint = compute_schema_fingerprint(SQLModel.metadata)
+            if not force and get_stored_fingerprint(engine) == fingerprint:
+                log.info("Database schema is up to date, skipping table creation")
+                return
 
-        # create_all 会自动检查表是否存在，只创建不存在的表
-        SQLModel.metadata.create_all(engine)
+            if verbose:
+                log.info("Creating tables...")
 
-        log.info("Database tables initialized successfully")
+            # create_all 会自动检查表是否存在，只创建不存在的表
+            SQLModel.metadata.create_all(engine)
+            save_fingerprint(engine, fingerprint)
 
-        engine.dispose()
+            log.info("Database tables initialized successfully")
+        finally:
+            engine.dispose()
 
     except Exception as e:
         log.error(f"Database initialization failed: {e}", exc_info=True)
@@ -106,4 +173,4 @@ def init_database(verbose: bool = False):
 
 if __name__ == "__main__":
     # 命令行运行时打印详细日志
-    init_database(verbose=True)
+    init_database(verbose=True, force=True)
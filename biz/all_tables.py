@@ -5,6 +5,7 @@
 from datetime import datetime, date
 from decimal import Decimal
 from typing import Optional
+from sqlalchemy import BigInteger, Index, UniqueConstraint
 from sqlmodel import Field, SQLModel, Column, JSON, TEXT
 
 
@@ -12,6 +13,12 @@ from sqlmodel import Field, SQLModel, Column, JSON, TEXT
 class UserTable(SQLModel, table=True):
     """用户表"""
     __tablename__ = "users"
+    __table_args__ = (
+        # 群内用户列表 / 排行榜 / 新用户（见 migrations/004_add_hot_query_indexes.sql）
+        Index("idx_users_chat_created", "chat_id", "created_at"),
+        Index("idx_users_chat_status_balance", "chat_id", "status", "balance"),
+        Index("idx_users_chat_new_created", "chat_id", "is_new", "created_at"),
+    )
 
     id: str = Field(primary_key=True, description="用户ID（悦聊平台ID）")
     chat_id: str = Field(primary_key=True, description="群聊ID", index=True)
@@ -37,6 +44,16 @@ class UserTable(SQLModel, table=True):
 class BetTable(SQLModel, table=True):
     """投注表"""
     __tablename__ = "bets"
+    __table_args__ = (
+        # 待结算查询：get_all_pending_bets / get_user_all_pending_bets / get_pending_bets_by_issue
+        Index("idx_bets_chat_pending", "chat_id", "status", "result", "created_at"),
+        Index("idx_bets_user_chat_pending", "user_id", "chat_id", "status", "result", "created_at"),
+        Index("idx_bets_chat_issue_pending", "chat_id", "issue", "status", "result", "created_at"),
+        Index("idx_bets_pending_created", "status", "result", "created_at"),
+        # 流水/投注记录：get_user_bets_since / get_user_bets / get_chat_bets
+        Index("idx_bets_user_chat_created", "user_id", "chat_id", "created_at"),
+        Index("idx_bets_chat_created", "chat_id", "created_at"),
+    )
 
     id: str = Field(primary_key=True, description="投注ID")
     user_id: str = Field(..., description="用户ID", index=True)
@@ -44,7 +61,11 @@ class BetTable(SQLModel, table=True):
     chat_id: str = Field(..., description="群聊ID", index=True)
     game_type: str = Field(default="lucky8", description="游戏类型：lucky8/liuhecai")
     lottery_type: str = Field(..., description="投注类型：fan/zheng/nian/jiao/tong/tema等")
-    bet_number: Optional[int] = Field(None, description="投注号码")
+    bet_number: Optional[int] = Field(None, description="投注号码（番/正/特码的号码，禁号玩法的赢号）")
+    bet_first: Optional[int] = Field(None, description="首位号码（念/通）")
+    bet_second: Optional[int] = Field(None, description="次位/末位号码（念/通）")
+    bet_numbers_mask: Optional[int] = Field(None, sa_column=Column(BigInteger), description="号码组合位掩码（角/中，号码 n 对应第 n 位）")
+    bet_jin_number: Optional[int] = Field(None, description="禁号（正禁号玩法）")
     bet_amount: Decimal = Field(..., description="投注金额", max_digits=15, decimal_places=2)
     valid_amount: Decimal = Field(default=Decimal("0.00"), description="有效投注额", max_digits=15, decimal_places=2)
     odds: Decimal = Field(..., description="赔率", max_digits=10, decimal_places=2)
@@ -55,7 +76,7 @@ class BetTable(SQLModel, table=True):
     issue: Optional[str] = Field(None, description="期号", index=True)
     draw_number: Optional[int] = Field(None, description="开奖号码")
     draw_code: Optional[str] = Field(None, description="开奖号码串")
-    bet_details: Optional[str] = Field(None, sa_column=Column(TEXT), description="投注详情JSON")
+    bet_details: Optional[str] = Field(None, sa_column=Column(TEXT), description="投注详情JSON（旧记录；新注单写入形状列）")
     created_at: datetime = Field(default_factory=datetime.now, index=True)
     settled_at: Optional[datetime] = Field(None, description="结算时间")
 
@@ -83,6 +104,17 @@ class ChatTable(SQLModel, table=True):
 class DrawHistoryTable(SQLModel, table=True):
     """开奖历史表"""
     __tablename__ = "draw_history"
+    __table_args__ = (
+        # 期号去重：upsert_many / create 依赖该唯一键，同时覆盖 get_draw_by_issue / exists_issue
+        UniqueConstraint("game_type", "chat_id", "issue", name="uq_draw_game_chat_issue"),
+        # 最新/最近开奖：get_latest_draw / get_recent_draws
+        Index("idx_draw_game_chat_ts", "game_type", "chat_id", "timestamp"),
+        Index("idx_draw_chat_ts", "chat_id", "timestamp"),
+        # 开奖列表（按日期）：get_draw_history / get_draw_history_by_date
+        Index("idx_draw_game_ts", "game_type", "timestamp"),
+        # 当日最新期号：get_latest_draw_by_date
+        Index("idx_draw_game_issue", "game_type", "issue"),
+    )
 
     id: int = Field(default=None, primary_key=True, description="自增ID")
     draw_number: int = Field(..., description="开奖号码（主号码）")
@@ -94,9 +126,50 @@ class DrawHistoryTable(SQLModel, table=True):
     bet_count: int = Field(default=0, description="投注数量")
     timestamp: datetime = Field(default_factory=datetime.now, description="开奖时间", index=True)
     special_number: Optional[int] = Field(None, description="特殊号码（六合彩特码）")
+    # 开奖指标：写入时由 biz.draw.metrics.metric_columns 计算，开奖结果接口直接读取
+    numbers_packed: Optional[str] = Field(None, description="开奖号码定长编码（每个号码两位）")
+    champion_sum: Optional[int] = Field(None, description="冠亚和")
+    champion_size: Optional[str] = Field(None, description="冠亚和大小：大/小")
+    champion_parity: Optional[str] = Field(None, description="冠亚和单双：单/双")
+    dragon_tiger: Optional[str] = Field(None, description="五组龙虎（每位 龙/虎）")
     created_at: datetime = Field(default_factory=datetime.now)
 
 
+# 4.1 draw_chat_results表（开奖记录与群聊的关联）
+class DrawChatResultTable(SQLModel, table=True):
+    """
+    群聊开奖结果表
+    draw_history 每期只存一条全局记录（chat_id='system'），
+    各群的投注数量、结算状态记录在本表
+    """
+    __tablename__ = "draw_chat_results"
+    __table_args__ = (
+        # 同一群同一期只有一条：DrawRepository.create / claim_settlement_run 依赖该唯一键
+        UniqueConstraint("chat_id", "game_type", "issue", name="uq_draw_chat_issue"),
+        # 按期号查询各群结算情况
+        Index("idx_draw_chat_game_issue", "game_type", "issue"),
+        # 启动恢复扫描未完成的结算运行
+        Index("idx_draw_chat_status", "status"),
+    )
+
+    id: int = Field(default=None, primary_key=True, description="自增ID")
+    draw_id: Optional[int] = Field(None, description="draw_history.id（随机开奖无全局记录时为空）")
+    chat_id: str = Field(..., description="群聊ID")
+    game_type: str = Field(default="lucky8", description="游戏类型：lucky8/liuhecai")
+    issue: str = Field(..., description="期号")
+    bet_count: int = Field(default=0, description="本期结算的投注数量")
+    draw_number: Optional[int] = Field(None, description="开奖番数/特码（认领结算时记录）")
+    draw_code: Optional[str] = Field(None, description="开奖号码（认领结算时记录）")
+    special_number: Optional[int] = Field(None, description="特码（认领结算时记录）")
+    bet_ids: Optional[str] = Field(None, sa_column=Column(TEXT), description="本次结算的注单ID（JSON 数组，计算完成时记录）")
+    status: str = Field(
+        default="claimed",
+        description="结算状态：claimed(已认领)/computed(已计算)/committed(已入账)/announced(已播报)；旧记录为 drawn/settled"
+    )
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+
 # 5. odds_config表
 class OddsConfigTable(SQLModel, table=True):
     """赔率配置表"""
@@ -196,6 +269,11 @@ class LoginLogTable(SQLModel, table=True):
 class BetOrderTable(SQLModel, table=True):
     """注单表（管理后台）"""
     __tablename__ = "bet_orders"
+    __table_args__ = (
+        # 报表按时间段汇总已结算注单 / 会员注单列表
+        Index("idx_bet_orders_status_time", "status", "bet_time"),
+        Index("idx_bet_orders_user_time", "user_id", "bet_time"),
+    )
 
     id: int = Field(default=None, primary_key=True)
     order_no: str = Field(..., description="注单号", unique=True, index=True)
@@ -219,6 +297,11 @@ class BetOrderTable(SQLModel, table=True):
 class TransactionTable(SQLModel, table=True):
     """交易记录表"""
     __tablename__ = "transactions"
+    __table_args__ = (
+        # 财务总报表 / 存取款报表
+        Index("idx_transactions_status_time", "status", "transaction_time"),
+        Index("idx_transactions_type_time", "transaction_type", "transaction_time"),
+    )
 
     id: int = Field(default=None, primary_key=True)
     user_id: str = Field(..., description="用户ID", index=True)
@@ -237,6 +320,10 @@ class TransactionTable(SQLModel, table=True):
 class AccountChangeTable(SQLModel, table=True):
     """账变记录表"""
     __tablename__ = "account_changes"
+    __table_args__ = (
+        # 会员/代理账变列表
+        Index("idx_account_changes_user_created", "user_id", "created_at"),
+    )
 
     id: int = Field(default=None, primary_key=True)
     user_id: str = Field(..., description="用户ID", index=True)
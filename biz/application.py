@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 from dotenv import load_dotenv
@@ -16,6 +17,11 @@ from base.middleware import (
 )
 from base.exception import UnifyException
 from biz.game.scheduler import init_scheduler, shutdown_scheduler
+from biz.bet.repo.pending_bet_book import get_pending_bet_book
+from biz.game.logic.liability_matrix import get_liability_matrix
+from biz.game.service.settlement_stage import get_settlement_stage
+from biz.game.logic import outcome_table
+from utils import get_draw_image_generator, get_render_stats, get_upload_storage, shutdown_render_executor
 
 # 加载环境变量（必须在其他模块导入前执行）
 load_dotenv()
@@ -29,30 +35,23 @@ logging.basicConfig(
 # 初始化依赖注入容器（需要在应用创建前初始化）
 container = Container()
 
-# 生命周期管理
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """应用生命周期管理"""
-    # 启动时
-    logger = logging.getLogger(__name__)
-    logger.info("🚀 应用启动中...")
+# 启动预热状态：pending / ready / failed（/health 返回）
+warmup_state = {
+    "draw_data": "pending",
+    "chats": "pending",
+    "registered_chats": 0,
+    "pending_bets": "pending",
+    "settlement_recovery": "pending",
+    "recovered_runs": 0,
+}
 
-    # 1. 自动初始化数据库表
-    logger.info("📊 检查数据库表...")
-    try:
-        from base.init_db import init_database
-        init_database()
-        logger.info("✅ 数据库表检查完成")
-    except Exception as e:
-        logger.error(f"❌ 数据库表初始化失败: {str(e)}")
-        logger.warning("⚠️ 请手动运行: python -m base.init_db")
+# 启动时注册群聊的分页大小
+CHAT_REGISTER_PAGE_SIZE = 500
 
-    is_testing = os.getenv("PYTEST_CURRENT_TEST") is not None
-
-    # 2. 初始化开奖API数据（与Node.js版本相同）
-    from external import get_draw_api_client
-    draw_client = get_draw_api_client()
 
+async def _load_draw_data(draw_client, is_testing: bool):
+    """预热阶段：并发加载两个开奖数据源，并启动自动刷新"""
+    logger = logging.getLogger(__name__)
     try:
         logger.info("📡 初始化开奖API数据...")
         result = await draw_client.initialize_draw_data()
@@ -68,52 +67,111 @@ async def lifespan(app: FastAPI):
             logger.warning("⚠️ 澳门六合彩开奖数据加载失败")
 
         if not is_testing:
-            await draw_client.start_auto_refresh(interval_minutes=5)
-            logger.info("✅ 开奖数据自动刷新已启动（间隔5分钟）")
+            draw_client.start_adaptive_polling()
+            logger.info("✅ 开奖数据自适应轮询已启动")
+
+        warmup_state["draw_data"] = "ready"
 
     except Exception as e:
+        warmup_state["draw_data"] = "failed"
         logger.error(f"❌ 开奖API初始化失败: {str(e)}")
         logger.warning("⚠️ 将使用随机数据作为兜底方案")
 
-    # 初始化开奖调度器
-    game_service = container.game_service()
-    bot_client = container.bot_api_client()
-    scheduler = None
-    if not is_testing:
-        scheduler = init_scheduler(game_service, bot_client)
-        logger.info("✅ 开奖调度器已初始化")
-
-    # 将scheduler保存到container中,供其他服务使用
-    container.scheduler_instance = scheduler
-
-    # 自动注册所有已存在的活跃群聊到调度器
-    if not is_testing:
-        try:
-            from biz.chat.repo.chat_repo import ChatRepository
-            chat_repo = container.chat_repo()
-
-            active_chats = await chat_repo.get_all_chats(limit=1000, status='active')
-            logger.info(f"📊 发现 {len(active_chats)} 个活跃群聊")
-
-            lucky8_count = 0
-            liuhecai_count = 0
 
-            for chat in active_chats:
-                chat_id = chat['id']
-                game_type = chat.get('game_type', 'lucky8')
-                scheduler.register_chat_to_global_timer(chat_id, game_type)
+async def _register_active_chats(scheduler):
+    """预热阶段：按主键分页遍历全部活跃群聊并注册到调度器（无数量上限）"""
+    logger = logging.getLogger(__name__)
+    try:
+        chat_repo = container.chat_repo()
+
+        lucky8_count = 0
+        liuhecai_count = 0
+        after_id = None
+
+        while True:
+            chats = await chat_repo.get_chats_after(
+                after_id=after_id,
+                limit=CHAT_REGISTER_PAGE_SIZE,
+                status='active'
+            )
+            for chat in chats:
+                game_type = chat.get('game_type') or 'lucky8'
+                scheduler.register_chat_to_global_timer(chat['id'], game_type)
                 if game_type == 'lucky8':
                     lucky8_count += 1
                 elif game_type == 'liuhecai':
                     liuhecai_count += 1
 
-            logger.info(f"✅ 已注册群聊到调度器:")
-            logger.info(f"   - 澳洲幸运8: {lucky8_count} 个群聊")
-            logger.info(f"   - 六合彩: {liuhecai_count} 个群聊")
+            warmup_state["registered_chats"] = lucky8_count + liuhecai_count
+            if len(chats) < CHAT_REGISTER_PAGE_SIZE:
+                break
+            after_id = chats[-1]['id']
 
-        except Exception as e:
-            logger.error(f"❌ 自动注册群聊失败: {str(e)}", exc_info=True)
-            logger.warning("⚠️ 定时器未启动，需要等待群聊事件触发")
+        logger.info(f"✅ 已注册群聊到调度器:")
+        logger.info(f"   - 澳洲幸运8: {lucky8_count} 个群聊")
+        logger.info(f"   - 六合彩: {liuhecai_count} 个群聊")
+        warmup_state["chats"] = "ready"
+
+    except Exception as e:
+        warmup_state["chats"] = "failed"
+        logger.error(f"❌ 自动注册群聊失败: {str(e)}", exc_info=True)
+        logger.warning("⚠️ 定时器未启动，需要等待群聊事件触发")
+
+
+async def _load_pending_bets(is_testing: bool):
+    """预热阶段：从数据库重建待结算投注内存账本（未就绪前投注查询直接走数据库）"""
+    logger = logging.getLogger(__name__)
+    if is_testing:
+        warmup_state["pending_bets"] = "skipped"
+        return
+    try:
+        # 盈亏矩阵订阅账本，随账本加载一起重建
+        get_liability_matrix()
+        count = await container.bet_repo().load_pending_book()
+        warmup_state["pending_bets"] = "ready"
+        logger.info(f"✅ 待结算投注账本已加载: {count} 笔")
+    except Exception as e:
+        warmup_state["pending_bets"] = "failed"
+        logger.error(f"❌ 待结算投注账本加载失败: {str(e)}", exc_info=True)
+        logger.warning("⚠️ 待结算投注将直接查询数据库")
+
+
+async def _recover_settlement_runs(is_testing: bool):
+    """预热阶段：继续进程中途退出时未完成的结算运行（账本加载完成后执行）"""
+    logger = logging.getLogger(__name__)
+    if is_testing:
+        warmup_state["settlement_recovery"] = "skipped"
+        return
+    try:
+        recovered = await container.game_service().recover_settlement_runs()
+        warmup_state["recovered_runs"] = recovered
+        warmup_state["settlement_recovery"] = "ready"
+        if recovered:
+            logger.info(f"✅ 已恢复未完成的结算: {recovered} 个")
+    except Exception as e:
+        warmup_state["settlement_recovery"] = "failed"
+        logger.error(f"❌ 结算恢复失败: {str(e)}", exc_info=True)
+        logger.warning("⚠️ 未完成的结算将在各群下次开奖前继续")
+
+
+async def _recover_and_register_chats(scheduler, is_testing: bool):
+    """账本加载、结算恢复完成后再注册群聊，避免定时开奖与恢复中的结算重叠"""
+    await _load_pending_bets(is_testing)
+    await _recover_settlement_runs(is_testing)
+    if scheduler:
+        await _register_active_chats(scheduler)
+    else:
+        warmup_state["chats"] = "ready"
+
+
+async def _warm_up(draw_client, scheduler, is_testing: bool):
+    """启动预热：开奖数据与账本加载、结算恢复、群聊注册并发进行，完成后启动历史开奖同步"""
+    logger = logging.getLogger(__name__)
+
+    await asyncio.gather(
+        _load_draw_data(draw_client, is_testing),
+        _recover_and_register_chats(scheduler, is_testing),
+    )
 
     # 启动历史开奖定期同步（每60分钟一次）
     if not is_testing and scheduler:
@@ -123,19 +181,88 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"⚠️ 历史开奖同步任务启动失败: {str(e)}")
 
+    logger.info("✅ 启动预热完成")
+
+
+# 生命周期管理
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期管理"""
+    # 启动时
+    logger = logging.getLogger(__name__)
+    logger.info("🚀 应用启动中...")
+
+    # 1. 自动初始化数据库表
+    logger.info("📊 检查数据库表...")
+    try:
+        from base.init_db import init_database
+        # 同步建表放到线程中执行，避免阻塞事件循环；表结构未变化时只读取一次指纹
+        await asyncio.to_thread(init_database)
+        logger.info("✅ 数据库表检查完成")
+    except Exception as e:
+        logger.error(f"❌ 数据库表初始化失败: {str(e)}")
+        logger.warning("⚠️ 请手动运行: python -m base.init_db")
+
+    is_testing = os.getenv("PYTEST_CURRENT_TEST") is not None
+
+    # 2. 开奖API数据与群聊注册在后台预热，应用立即开始接收请求（进度见 /health）
+    from external import get_draw_api_client
+    draw_client = get_draw_api_client()
+
+    # 初始化开奖调度器
+    game_service = container.game_service()
+    bot_client = container.bot_api_client()
+    scheduler = None
+    if not is_testing:
+        scheduler = init_scheduler(game_service, bot_client)
+        logger.info("✅ 开奖调度器已初始化")
+
+    # 将scheduler保存到container中,供其他服务使用
+    container.scheduler_instance = scheduler
+
+    warmup_task = asyncio.create_task(_warm_up(draw_client, scheduler, is_testing))
+
+    # 启动冷热数据归档任务
+    archive_service = None
+    if not is_testing:
+        try:
+            archive_service = container.archive_service()
+            archive_service.start(interval_minutes=int(os.getenv("ARCHIVE_INTERVAL_MINUTES", "360")))
+        except Exception as e:
+            logger.warning(f"⚠️ 数据归档任务启动失败: {str(e)}")
+
+    # 启动开奖图片目录清理任务
+    upload_storage = None
+    if not is_testing:
+        upload_storage = get_upload_storage(get_draw_image_generator().uploads_dir)
+        upload_storage.start(interval_minutes=int(os.getenv("UPLOADS_SWEEP_INTERVAL_MINUTES", "30")))
+
     yield
 
     # 关闭时
     logger.info("🔴 应用关闭中...")
 
+    if not warmup_task.done():
+        warmup_task.cancel()
+
     # 停止自动刷新
     if not is_testing:
         draw_client.stop_auto_refresh()
+    await draw_client.close()
 
     # 关闭调度器
     if scheduler:
         await shutdown_scheduler()
 
+    # 停止归档任务
+    if archive_service:
+        await archive_service.stop()
+
+    # 关闭开奖图片渲染工作池与清理任务
+    shutdown_render_executor()
+    if upload_storage:
+        await upload_storage.stop()
+
     logger.info("✅ 应用已关闭")
 
 # API 路由前缀
@@ -267,7 +394,21 @@ container.wire(modules=[
 async def health_check():
     from datetime import datetime
     ts = datetime.utcnow().isoformat(timespec='milliseconds') + 'Z'
-    return {"status": "healthy", "timestamp": ts}
+    ready = all(
+        warmup_state[key] != "pending"
+        for key in ("draw_data", "pending_bets", "settlement_recovery", "chats")
+    )
+    return {
+        "status": "healthy",
+        "timestamp": ts,
+        "ready": ready,
+        "warmup": dict(warmup_state),
+        "image_render": get_render_stats(),
+        "uploads": get_upload_storage(get_draw_image_generator().uploads_dir).get_stats(),
+        "pending_bets": get_pending_bet_book().get_stats(),
+        "settlement_stage": get_settlement_stage().get_stats(),
+        "outcome_table": outcome_table.get_stats(),
+    }
 
 
 # 测试端点
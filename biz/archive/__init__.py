@@ -0,0 +1 @@
+# Archive模块初始化文件
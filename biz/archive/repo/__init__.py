@@ -0,0 +1,3 @@
+from .archive_repo import ArchiveRepository
+
+__all__ = ["ArchiveRepository"]
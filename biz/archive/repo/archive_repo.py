@@ -0,0 +1,190 @@
+"""
+ArchiveRepository - 冷热数据归档数据访问层
+热表只保留近期/未结算数据，超过保留期的已结算数据按批次迁移到 {table}_archive 冷表
+"""
+import os
+from datetime import datetime, date, timedelta
+from typing import Optional, List, Dict, Any, Union
+from sqlalchemy import text, bindparam
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+
+
+ARCHIVE_SUFFIX = "_archive"
+
+# 参与归档的表：时间列 + 主键 + “已结算”条件（只有满足条件的行才允许归档）
+ARCHIVE_TABLES: Dict[str, Dict[str, str]] = {
+    "bets": {
+        "time_column": "created_at",
+        "pk": "id",
+        "settled": "result <> 'pending'",
+    },
+    "bet_orders": {
+        "time_column": "bet_time",
+        "pk": "id",
+        "settled": "status <> 'unsettled'",
+    },
+    "draw_history": {
+        "time_column": "timestamp",
+        "pk": "id",
+        "settled": "1 = 1",
+    },
+    "draw_chat_results": {
+        "time_column": "created_at",
+        "pk": "id",
+        "settled": "status IN ('settled', 'announced')",
+    },
+    "account_changes": {
+        "time_column": "created_at",
+        "pk": "id",
+        "settled": "1 = 1",
+    },
+}
+
+# 冷表是否已确认存在（未确认时读取只走热表：没有冷表就不可能有已归档数据）
+_archive_ready = False
+
+
+def get_retention_days() -> int:
+    """热表保留天数（ARCHIVE_RETENTION_DAYS，默认90天）"""
+    return int(os.getenv("ARCHIVE_RETENTION_DAYS", "90"))
+
+
+def get_archive_cutoff(now: Optional[datetime] = None) -> datetime:
+    """归档分界线：早于该时间的已结算数据可能已在冷表中"""
+    now = now or datetime.now()
+    return now - timedelta(days=get_retention_days())
+
+
+def mark_archive_ready(ready: bool = True) -> None:
+    """标记冷表已就绪（由 ArchiveRepository.ensure_archive_tables 调用）"""
+    global _archive_ready
+    _archive_ready = ready
+
+
+def is_archive_ready() -> bool:
+    return _archive_ready
+
+
+def _to_datetime(value: Union[str, date, datetime, None]) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    text_value = str(value).strip()
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(text_value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def archive_source(table: str, alias: str) -> str:
+    """热表与冷表合并的数据源（UNION ALL 派生表，用于 FROM 子句）"""
+    return f"(SELECT * FROM {table} UNION ALL SELECT * FROM {table}{ARCHIVE_SUFFIX}) {alias}"
+
+
+def table_source(table: str, alias: str, start: Union[str, date, datetime, None]) -> str:
+    """
+    按查询起始时间选择数据源（用于 FROM 子句）
+
+    起始时间晚于归档分界线时只读热表；早于分界线（或无法解析）时合并冷表。
+    没有时间下限的查询只读热表（近期数据视图）。
+
+    Args:
+        table: 热表名（必须在 ARCHIVE_TABLES 中）
+        alias: 表别名
+        start: 查询时间范围下限
+
+    Returns:
+        str: 如 "bet_orders b" 或 "(SELECT * FROM bet_orders UNION ALL SELECT * FROM bet_orders_archive) b"
+    """
+    if table not in ARCHIVE_TABLES:
+        raise ValueError(f"不支持归档的表: {table}")
+
+    if start is None or not _archive_ready:
+        return f"{table} {alias}"
+
+    start_dt = _to_datetime(start)
+    if start_dt is not None and start_dt >= get_archive_cutoff():
+        return f"{table} {alias}"
+
+    return archive_source(table, alias)
+
+
+class ArchiveRepository:
+    """归档Repository"""
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self._session_factory = session_factory
+
+    async def ensure_archive_tables(self) -> None:
+        """创建缺失的冷表（结构与热表一致，含索引）"""
+        async with self._session_factory() as session:
+            for table in ARCHIVE_TABLES:
+                await session.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {table}{ARCHIVE_SUFFIX} LIKE {table}"
+                ))
+            await session.commit()
+        mark_archive_ready()
+
+    async def archive_batch(
+        self,
+        table: str,
+        cutoff: datetime,
+        batch_size: int = 1000
+    ) -> int:
+        """
+        迁移一批早于 cutoff 的已结算数据到冷表
+
+        同一事务内：选出主键 -> 复制到冷表 -> 从热表删除
+
+        Args:
+            table: 热表名
+            cutoff: 归档分界时间
+            batch_size: 每批行数
+
+        Returns:
+            int: 本批迁移的行数（小于 batch_size 表示已迁移完）
+        """
+        spec = ARCHIVE_TABLES[table]
+        pk = spec["pk"]
+        time_column = spec["time_column"]
+
+        async with self._session_factory() as session:
+            select_query = text(f"""
+                SELECT {pk} FROM {table}
+                WHERE {time_column} < :cutoff AND {spec['settled']}
+                ORDER BY {time_column} ASC
+                LIMIT :batch_size
+            """)
+            result = await session.execute(select_query, {"cutoff": cutoff, "batch_size": batch_size})
+            ids: List[Any] = [row[0] for row in result.fetchall()]
+            if not ids:
+                return 0
+
+            copy_query = text(f"""
+                INSERT IGNORE INTO {table}{ARCHIVE_SUFFIX}
+                SELECT * FROM {table} WHERE {pk} IN :ids
+            """).bindparams(bindparam("ids", expanding=True))
+            delete_query = text(f"""
+                DELETE FROM {table} WHERE {pk} IN :ids
+            """).bindparams(bindparam("ids", expanding=True))
+
+            await session.execute(copy_query, {"ids": ids})
+            await session.execute(delete_query, {"ids": ids})
+            await session.commit()
+
+            return len(ids)
+
+    async def count_archivable(self, table: str, cutoff: datetime) -> int:
+        """统计可归档的行数"""
+        spec = ARCHIVE_TABLES[table]
+        async with self._session_factory() as session:
+            query = text(f"""
+                SELECT COUNT(*) FROM {table}
+                WHERE {spec['time_column']} < :cutoff AND {spec['settled']}
+            """)
+            result = await session.execute(query, {"cutoff": cutoff})
+            row = result.fetchone()
+            return row[0] if row else 0
@@ -0,0 +1,3 @@
+from .archive_service import ArchiveService
+
+__all__ = ["ArchiveService"]
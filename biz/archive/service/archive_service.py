@@ -0,0 +1,80 @@
+"""
+ArchiveService - 冷热数据归档服务
+定期把超过保留期的已结算数据从热表迁移到冷表，控制热表体量
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Dict, Optional
+
+from biz.archive.repo.archive_repo import ArchiveRepository, ARCHIVE_TABLES, get_archive_cutoff
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveService:
+    """归档服务"""
+
+    def __init__(self, archive_repo: ArchiveRepository):
+        self.archive_repo = archive_repo
+        self.batch_size = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        执行一轮归档：逐表分批迁移，直到没有可归档数据
+
+        Returns:
+            Dict[str, int]: {表名: 本轮迁移行数}
+        """
+        await self.archive_repo.ensure_archive_tables()
+
+        cutoff = get_archive_cutoff(now)
+        moved: Dict[str, int] = {}
+        for table in ARCHIVE_TABLES:
+            total = 0
+            while True:
+                count = await self.archive_repo.archive_batch(table, cutoff, self.batch_size)
+                total += count
+                if count < self.batch_size:
+                    break
+                # 批次之间让出事件循环，避免长时间占用连接影响开奖
+                await asyncio.sleep(0)
+            moved[table] = total
+            if total:
+                logger.info(f"🗄️ {table} 归档 {total} 行（早于 {cutoff:%Y-%m-%d %H:%M:%S}）")
+        return moved
+
+    def start(self, interval_minutes: int = 360):
+        """启动定期归档任务"""
+        if self._task is not None:
+            logger.warning("⚠️ 归档任务已运行，跳过重复启动")
+            return
+
+        async def _loop():
+            try:
+                # 启动时先确认冷表，读取路由才会合并冷表数据
+                await self.archive_repo.ensure_archive_tables()
+            except Exception as e:
+                logger.error(f"❌ 冷表检查失败: {str(e)}", exc_info=True)
+            while True:
+                await asyncio.sleep(interval_minutes * 60)
+                try:
+                    await self.run_once()
+                except Exception as e:
+                    logger.error(f"❌ 数据归档失败: {str(e)}", exc_info=True)
+
+        self._task = asyncio.create_task(_loop())
+        logger.info(f"🗄️ 数据归档任务已启动（间隔 {interval_minutes} 分钟）")
+
+    async def stop(self):
+        """停止定期归档任务"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
@@ -19,14 +19,18 @@ class BetTable(SQLModel, table=True):
     chat_id: str = Field(..., description="群聊ID", index=True)
     game_type: str = Field(default="lucky8", description="游戏类型：lucky8/liuhecai")
     lottery_type: str = Field(..., description="投注类型：fan/zheng/nian/jiao/tong/tema等")
-    bet_number: Optional[int] = Field(None, description="投注号码")
+    bet_number: Optional[int] = Field(None, description="投注号码（番/正/特码的号码，禁号玩法的赢号）")
+    bet_first: Optional[int] = Field(None, description="首位号码（念/通）")
+    bet_second: Optional[int] = Field(None, description="次位/末位号码（念/通）")
+    bet_numbers_mask: Optional[int] = Field(None, description="号码组合位掩码（角/中，号码 n 对应第 n 位）")
+    bet_jin_number: Optional[int] = Field(None, description="禁号（正禁号玩法）")
     bet_amount: Decimal = Field(..., description="投注金额", max_digits=15, decimal_places=2)
     odds: Decimal = Field(..., description="赔率", max_digits=10, decimal_places=2)
     status: str = Field(default="active", description="状态：active/cancelled")
     result: str = Field(default="pending", description="结果：pending/win/lose/tie")
     pnl: Decimal = Field(default=Decimal("0.00"), description="盈亏金额", max_digits=15, decimal_places=2)
     issue: Optional[str] = Field(None, description="期号", index=True)
-    bet_details: Optional[str] = Field(None, description="投注详情JSON（包含完整的下注信息）", sa_column_kwargs={"type_": Text})
+    bet_details: Optional[str] = Field(None, description="投注详情JSON（旧记录；新注单写入形状列）", sa_column_kwargs={"type_": Text})
     draw_number: Optional[int] = Field(None, description="开奖号码")
     draw_code: Optional[str] = Field(None, description="开奖号码串")
     created_at: datetime = Field(default_factory=datetime.now, index=True)
@@ -5,15 +5,84 @@ BetRepository - 投注数据访问层
 from datetime import datetime
 from decimal import Decimal
 from typing import Optional, List, Dict, Any
-from sqlalchemy import text
+from sqlalchemy import text, bindparam
 from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+from biz.bet.repo.exposure_ledger import ExposureKey, ExposureLedger, entry_for_bet
+from biz.bet.repo.pending_bet_book import PendingBetBook, get_pending_bet_book
+from biz.draw.repo.draw_repo import RUN_COMMITTED, RUN_COMPUTED
+from biz.game.logic import game_logic
+
+# 热点查询（migrations/check_query_plans.py 直接引用，校验执行计划）
+PENDING_BETS_SQL = """
+    SELECT * FROM bets
+    WHERE status = 'active' AND result = 'pending'
+    ORDER BY created_at ASC
+"""
+PENDING_BETS_BY_CHAT_SQL = """
+    SELECT * FROM bets
+    WHERE chat_id = :chat_id
+          AND status = 'active' AND result = 'pending'
+    ORDER BY created_at ASC
+"""
+PENDING_BETS_BY_USER_SQL = """
+    SELECT * FROM bets
+    WHERE user_id = :user_id AND chat_id = :chat_id
+          AND status = 'active' AND result = 'pending'
+    ORDER BY created_at ASC
+"""
+PENDING_BETS_BY_ISSUE_SQL = """
+    SELECT * FROM bets
+    WHERE chat_id = :chat_id AND issue = :issue
+          AND status = 'active' AND result = 'pending'
+    ORDER BY created_at ASC
+"""
+USER_BETS_SQL = """
+    SELECT * FROM bets
+    WHERE user_id = :user_id AND chat_id = :chat_id
+    ORDER BY created_at DESC
+    LIMIT :limit OFFSET :skip
+"""
+USER_BETS_SINCE_SQL = """
+    SELECT * FROM bets
+    WHERE user_id = :user_id AND chat_id = :chat_id
+          AND created_at >= :since_time
+    ORDER BY created_at DESC
+"""
+USER_SETTLED_BETS_SINCE_SQL = """
+    SELECT * FROM bets
+    WHERE user_id = :user_id AND chat_id = :chat_id
+          AND created_at >= :since_time
+          AND NOT (status = 'active' AND result = 'pending')
+    ORDER BY created_at DESC
+"""
+CHAT_BETS_SQL = """
+    SELECT * FROM bets
+    WHERE chat_id = :chat_id
+    ORDER BY created_at DESC
+    LIMIT :limit OFFSET :skip
+"""
 
 
 class BetRepository:
-    """投注Repository"""
+    """
+    投注Repository
 
-    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+    待结算投注同时维护在内存账本（PendingBetBook）中：写库成功后同步更新，
+    账本就绪时待结算查询直接读内存
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        pending_book: Optional[PendingBetBook] = None
+    ):
         self._session_factory = session_factory
+        self._pending_book = pending_book or get_pending_bet_book()
+
+    def _track_pending(self, bet: Optional[Dict[str, Any]]):
+        """新建的投注若为待结算，记入账本"""
+        if bet and bet.get("status") == "active" and bet.get("result") == "pending":
+            self._pending_book.add(bet)
 
     def _parse_json_fields(self, bet_data: Dict[str, Any]) -> None:
         """解析投注数据中的 JSON 字段"""
@@ -62,7 +131,9 @@ class BetRepository:
             await session.execute(query, params)
             await session.commit()
 
-            return await self.get_bet(bet_data["id"])
+            bet = await self.get_bet(bet_data["id"])
+            self._track_pending(bet)
+            return bet
 
     async def get_bet(self, bet_id: str) -> Optional[Dict[str, Any]]:
         """获取投注记录"""
@@ -79,6 +150,23 @@ class BetRepository:
                 return data
             return None
 
+    async def get_bets_by_ids(self, bet_ids: List[str]) -> List[Dict[str, Any]]:
+        """按投注ID批量获取投注记录（按传入顺序，不存在的ID忽略）"""
+        if not bet_ids:
+            return []
+        async with self._session_factory() as session:
+            query = text("""
+                SELECT * FROM bets
+                WHERE id IN :bet_ids
+            """).bindparams(bindparam("bet_ids", expanding=True))
+            result = await session.execute(query, {"bet_ids": list(bet_ids)})
+            bets = {}
+            for row in result.fetchall():
+                data = dict(row._mapping)
+                self._parse_json_fields(data)
+                bets[data["id"]] = data
+            return [bets[bet_id] for bet_id in bet_ids if bet_id in bets]
+
     async def get_user_bets(
         self,
         user_id: str,
@@ -104,12 +192,7 @@ class BetRepository:
                     "limit": limit
                 }
             else:
-                query = text("""
-                    SELECT * FROM bets
-                    WHERE user_id = :user_id AND chat_id = :chat_id
-                    ORDER BY created_at DESC
-                    LIMIT :limit OFFSET :skip
-                """)
+                query = text(USER_BETS_SQL)
                 params = {
                     "user_id": user_id,
                     "chat_id": chat_id,
@@ -149,12 +232,7 @@ class BetRepository:
                     "limit": limit
                 }
             else:
-                query = text("""
-                    SELECT * FROM bets
-                    WHERE chat_id = :chat_id
-                    ORDER BY created_at DESC
-                    LIMIT :limit OFFSET :skip
-                """)
+                query = text(CHAT_BETS_SQL)
                 params = {"chat_id": chat_id, "skip": skip, "limit": limit}
 
             result = await session.execute(query, params)
@@ -167,29 +245,20 @@ class BetRepository:
         issue: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """获取待结算的投注记录"""
+        if self._pending_book.ready and chat_id:
+            if issue:
+                return self._pending_book.issue_bets(chat_id, issue)
+            return self._pending_book.chat_bets(chat_id)
+
         async with self._session_factory() as session:
             if chat_id and issue:
-                query = text("""
-                    SELECT * FROM bets
-                    WHERE chat_id = :chat_id AND issue = :issue
-                          AND status = 'active' AND result = 'pending'
-                    ORDER BY created_at ASC
-                """)
+                query = text(PENDING_BETS_BY_ISSUE_SQL)
                 params = {"chat_id": chat_id, "issue": issue}
             elif chat_id:
-                query = text("""
-                    SELECT * FROM bets
-                    WHERE chat_id = :chat_id
-                          AND status = 'active' AND result = 'pending'
-                    ORDER BY created_at ASC
-                """)
+                query = text(PENDING_BETS_BY_CHAT_SQL)
                 params = {"chat_id": chat_id}
             else:
-                query = text("""
-                    SELECT * FROM bets
-                    WHERE status = 'active' AND result = 'pending'
-                    ORDER BY created_at ASC
-                """)
+                query = text(PENDING_BETS_SQL)
                 params = {}
 
             result = await session.execute(query, params)
@@ -241,9 +310,106 @@ class BetRepository:
                 }
             await session.execute(query, params)
             await session.commit()
+            self._pending_book.discard([bet_id])
 
             return await self.get_bet(bet_id)
 
+    async def commit_settlement(
+        self,
+        chat_id: str,
+        issue: Optional[str],
+        draw_number: Optional[int],
+        draw_code: Optional[str],
+        settlements: List[Dict[str, Any]],
+        run_id: Optional[int] = None
+    ) -> Optional[List[str]]:
+        """
+        在同一事务中提交一个群聊一期的全部结算：更新注单并按用户汇总派彩入账
+
+        只处理仍为 pending 的注单（FOR UPDATE 锁定），重复提交或已取消的注单不会再次派彩。
+        传入 run_id 时同一事务内将结算运行 computed → committed 并记录结算数量
+
+        Args:
+            chat_id: 群聊ID
+            issue: 实际开奖期号
+            draw_number: 开奖番数/特码
+            draw_code: 开奖号码
+            settlements: [{bet_id, user_id, result, pnl, payout}]
+            run_id: 结算运行ID（draw_chat_results.id）
+
+        Returns:
+            List[str]: 实际结算的投注ID；结算运行已被提交过时返回 None
+        """
+        if not settlements and run_id is None:
+            return []
+
+        settled: List[Dict[str, Any]] = []
+        async with self._session_factory() as session:
+            if run_id is not None:
+                # 先锁定结算运行，并发的重复提交在此串行化
+                result = await session.execute(text("""
+                    SELECT status FROM draw_chat_results WHERE id = :run_id FOR UPDATE
+                """), {"run_id": run_id})
+                row = result.fetchone()
+                if row is None or row[0] != RUN_COMPUTED:
+                    await session.rollback()
+                    return None
+
+            select_query = text("""
+                SELECT id FROM bets
+                WHERE id IN :bet_ids AND result = 'pending'
+                FOR UPDATE
+            """).bindparams(bindparam("bet_ids", expanding=True))
+            if settlements:
+                result = await session.execute(select_query, {"bet_ids": [item["bet_id"] for item in settlements]})
+                pending_ids = {row[0] for row in result.fetchall()}
+                settled = [item for item in settlements if item["bet_id"] in pending_ids]
+
+            if settled:
+                await session.execute(text("""
+                    UPDATE bets
+                    SET result = :result, pnl = :pnl,
+                        draw_number = :draw_number, draw_code = :draw_code,
+                        issue = COALESCE(:issue, issue), settled_at = NOW()
+                    WHERE id = :bet_id
+                """), [
+                    {
+                        "bet_id": item["bet_id"],
+                        "result": item["result"],
+                        "pnl": item["pnl"],
+                        "draw_number": draw_number,
+                        "draw_code": draw_code,
+                        "issue": issue
+                    }
+                    for item in settled
+                ])
+
+                payouts: Dict[str, Decimal] = {}
+                for item in settled:
+                    if item["payout"] > 0:
+                        payouts[item["user_id"]] = payouts.get(item["user_id"], Decimal("0")) + item["payout"]
+                if payouts:
+                    await session.execute(text("""
+                        UPDATE users
+                        SET balance = balance + :amount, updated_at = NOW()
+                        WHERE id = :user_id AND chat_id = :chat_id
+                    """), [
+                        {"user_id": user_id, "chat_id": chat_id, "amount": amount}
+                        for user_id, amount in payouts.items()
+                    ])
+
+            if run_id is not None:
+                await session.execute(text("""
+                    UPDATE draw_chat_results
+                    SET status = :status, bet_count = :bet_count, updated_at = NOW()
+                    WHERE id = :run_id
+                """), {"run_id": run_id, "status": RUN_COMMITTED, "bet_count": len(settled)})
+            await session.commit()
+
+        settled_ids = [item["bet_id"] for item in settled]
+        self._pending_book.discard(settled_ids)
+        return settled_ids
+
     async def cancel_bet(self, bet_id: str) -> Optional[Dict[str, Any]]:
         """取消投注"""
         async with self._session_factory() as session:
@@ -254,12 +420,133 @@ class BetRepository:
             """)
             result = await session.execute(query, {"bet_id": bet_id})
             await session.commit()
+            self._pending_book.discard([bet_id])
 
             if result.rowcount == 0:
                 return None
 
             return await self.get_bet(bet_id)
 
+    async def cancel_pending_for_user(self, user_id: str, chat_id: str) -> Decimal:
+        """
+        取消用户在群聊的全部待结算投注并退还本金（不限期号）
+
+        在同一事务中锁定仍为 pending 的注单、用一条 UPDATE 取消，并按这些注单的金额退款；
+        并发结算过的注单不会被取消，也不会计入退款，中途失败时注单与余额一起回滚
+
+        Args:
+            user_id: 用户ID
+            chat_id: 群聊ID
+
+        Returns:
+            Decimal: 实际退还的总金额（没有可取消的注单时为 0）
+        """
+        params = {"user_id": user_id, "chat_id": chat_id}
+        async with self._session_factory() as session:
+            result = await session.execute(text("""
+                SELECT id, bet_amount FROM bets
+                WHERE user_id = :user_id AND chat_id = :chat_id
+                  AND status = 'active' AND result = 'pending'
+                FOR UPDATE
+            """), params)
+            rows = result.fetchall()
+            if not rows:
+                await session.rollback()
+                return Decimal("0")
+
+            bet_ids = [row[0] for row in rows]
+            refund = sum((row[1] for row in rows), Decimal("0"))
+            await session.execute(text("""
+                UPDATE bets
+                SET status = 'cancelled', result = 'cancelled'
+                WHERE id IN :bet_ids
+            """).bindparams(bindparam("bet_ids", expanding=True)), {"bet_ids": bet_ids})
+            await session.execute(text("""
+                UPDATE users
+                SET balance = balance + :amount, updated_at = NOW()
+                WHERE id = :user_id AND chat_id = :chat_id
+            """), {**params, "amount": refund})
+            await session.commit()
+
+        self._pending_book.discard(bet_ids)
+        return refund
+
+    async def load_pending_book(self) -> int:
+        """
+        从数据库重建待结算投注账本（启动时调用）
+
+        Returns:
+            int: 加载的待结算投注数量
+        """
+        self._pending_book.begin_load()
+        try:
+            async with self._session_factory() as session:
+                result = await session.execute(text(PENDING_BETS_SQL))
+                bets = [dict(row._mapping) for row in result.fetchall()]
+        except Exception:
+            self._pending_book.abort_load()
+            raise
+
+        for bet in bets:
+            self._parse_json_fields(bet)
+        self._pending_book.finish_load(bets)
+        return len(bets)
+
+    async def backfill_shape_columns(
+        self,
+        after_id: str = "",
+        batch_size: int = 500,
+        drop_details: bool = False
+    ) -> Optional[str]:
+        """
+        为一批只有 bet_details 的旧记录回填形状列（按 id 递增分批）
+
+        Args:
+            after_id: 从该 id 之后开始（上一批返回的最大 id）
+            batch_size: 每批行数
+            drop_details: 回填后清空 bet_details
+
+        Returns:
+            str: 本批最后一条记录的 id，没有待回填记录时返回 None
+        """
+        import json
+
+        async with self._session_factory() as session:
+            result = await session.execute(text("""
+                SELECT id, bet_number, bet_details FROM bets
+                WHERE id > :after_id AND bet_details IS NOT NULL
+                ORDER BY id
+                LIMIT :limit
+            """), {"after_id": after_id, "limit": batch_size})
+            rows = result.fetchall()
+            if not rows:
+                return None
+
+            updates = []
+            for bet_id, bet_number, raw_details in rows:
+                try:
+                    details = json.loads(raw_details) if raw_details else None
+                except ValueError:
+                    details = None
+                if not isinstance(details, dict):
+                    # 空串/无法解析：没有可回填的内容，保留原值
+                    continue
+                shape = game_logic.bet_shape_columns(details)
+                if shape["bet_number"] is None:
+                    shape["bet_number"] = bet_number
+                updates.append({"id": bet_id, **shape})
+
+            if updates:
+                await session.execute(text(f"""
+                    UPDATE bets
+                    SET bet_number = :bet_number, bet_first = :bet_first, bet_second = :bet_second,
+                        bet_numbers_mask = :bet_numbers_mask, bet_jin_number = :bet_jin_number
+                        {", bet_details = NULL" if drop_details else ""}
+                    WHERE id = :id
+                """), updates)
+            await session.commit()
+            return rows[-1][0]
+
     async def count_user_bets(
         self,
         user_id: str,
@@ -340,13 +627,12 @@ class BetRepository:
                 - odds: 赔率
                 - status: 状态（pending）
                 - draw_issue: 期号
-                - bet_details: 投注详情（dict/JSON）
+                - bet_details: 解析后的下注对象（写入形状列，不再整体序列化为 JSON）
 
         Returns:
             Dict: 创建的投注记录
         """
         from uuid import uuid4
-        from base.json_encoder import safe_json_dumps
 
         async with self._session_factory() as session:
             bet_id = str(uuid4())
@@ -357,15 +643,21 @@ class BetRepository:
             query = text("""
                 INSERT INTO bets (
                     id, user_id, username, chat_id, game_type, lottery_type,
-                    bet_number, bet_amount, valid_amount, odds, status, result, rebate,
-                    issue, bet_details, created_at
+                    bet_number, bet_first, bet_second, bet_numbers_mask, bet_jin_number,
+                    bet_amount, valid_amount, odds, status, result, rebate,
+                    issue, created_at
                 ) VALUES (
                     :id, :user_id, :username, :chat_id, :game_type, :lottery_type,
-                    :bet_number, :bet_amount, :valid_amount, :odds, :status, :result, :rebate,
-                    :issue, :bet_details, NOW()
+                    :bet_number, :bet_first, :bet_second, :bet_numbers_mask, :bet_jin_number,
+                    :bet_amount, :valid_amount, :odds, :status, :result, :rebate,
+                    :issue, NOW()
                 )
             """)
 
+            shape = game_logic.bet_shape_columns(bet_data.get("bet_details") or {})
+            if bet_data.get("bet_number") is not None:
+                shape["bet_number"] = bet_data["bet_number"]
+
             bet_amount = bet_data["amount"]
             params = {
                 "id": bet_id,
@@ -374,21 +666,22 @@ class BetRepository:
                 "chat_id": bet_data["chat_id"],
                 "game_type": bet_data.get("game_type", "lucky8"),
                 "lottery_type": bet_data.get("bet_type", "unknown"),
-                "bet_number": bet_data.get("bet_number"),
+                **shape,
                 "bet_amount": bet_amount,
                 "valid_amount": bet_data.get("valid_amount", bet_amount),
                 "odds": bet_data["odds"],
                 "status": "active",
                 "result": bet_data.get("status", "pending"),
                 "rebate": bet_data.get("rebate", Decimal("0.00")),
-                "issue": bet_data.get("draw_issue"),
-                "bet_details": safe_json_dumps(bet_data.get("bet_details")) if bet_data.get("bet_details") else None
+                "issue": bet_data.get("draw_issue")
             }
 
             await session.execute(query, params)
             await session.commit()
 
-            return await self.get_bet(bet_id)
+            bet = await self.get_bet(bet_id)
+            self._track_pending(bet)
+            return bet
 
     async def get_user_bets_since(
         self,
@@ -405,25 +698,32 @@ class BetRepository:
             since_time: 起始时间
 
         Returns:
-            List[Dict]: 投注记录列表
+            List[Dict]: 投注记录列表（按下注时间倒序）
+
+        账本就绪时待结算部分读内存，数据库只查询已结算/已取消的投注
         """
-        async with self._session_factory() as session:
-            query = text("""
-                SELECT * FROM bets
-                WHERE user_id = :user_id AND chat_id = :chat_id
-                      AND created_at >= :since_time
-                ORDER BY created_at DESC
-            """)
+        pending = None
+        query = USER_BETS_SINCE_SQL
+        if self._pending_book.ready:
+            pending = [
+                bet for bet in self._pending_book.user_bets(chat_id, user_id)
+                if bet.get("created_at") is None or bet["created_at"] >= since_time
+            ]
+            query = USER_SETTLED_BETS_SINCE_SQL
 
+        async with self._session_factory() as session:
             params = {
                 "user_id": user_id,
                 "chat_id": chat_id,
                 "since_time": since_time
             }
 
-            result = await session.execute(query, params)
-            rows = result.fetchall()
-            return [dict(row._mapping) for row in rows]
+            result = await session.execute(text(query), params)
+            bets = [dict(row._mapping) for row in result.fetchall()]
+
+        if pending:
+            bets = sorted(bets + pending, key=lambda bet: bet.get("created_at") or since_time, reverse=True)
+        return bets
 
     async def get_user_pending_bets(
         self,
@@ -442,6 +742,9 @@ class BetRepository:
         Returns:
             List[Dict]: 投注记录列表
         """
+        if self._pending_book.ready:
+            return [bet for bet in self._pending_book.user_bets(chat_id, user_id) if bet.get("issue") == issue]
+
         async with self._session_factory() as session:
             query = text("""
                 SELECT * FROM bets
@@ -475,13 +778,11 @@ class BetRepository:
         Returns:
             List[Dict]: 投注记录列表
         """
+        if self._pending_book.ready:
+            return self._pending_book.chat_bets(chat_id)
+
         async with self._session_factory() as session:
-            query = text("""
-                SELECT * FROM bets
-                WHERE chat_id = :chat_id
-                      AND status = 'active' AND result = 'pending'
-                ORDER BY created_at ASC
-            """)
+            query = text(PENDING_BETS_BY_CHAT_SQL)
 
             params = {
                 "chat_id": chat_id
@@ -508,13 +809,11 @@ class BetRepository:
         Returns:
             List[Dict]: 投注记录列表
         """
+        if self._pending_book.ready:
+            return self._pending_book.user_bets(chat_id, user_id)
+
         async with self._session_factory() as session:
-            query = text("""
-                SELECT * FROM bets
-                WHERE user_id = :user_id AND chat_id = :chat_id
-                      AND status = 'active' AND result = 'pending'
-                ORDER BY created_at ASC
-            """)
+            query = text(PENDING_BETS_BY_USER_SQL)
 
             params = {
                 "user_id": user_id,
@@ -541,13 +840,11 @@ class BetRepository:
         Returns:
             List[Dict]: 投注记录列表
         """
+        if self._pending_book.ready:
+            return self._pending_book.issue_bets(chat_id, issue)
+
         async with self._session_factory() as session:
-            query = text("""
-                SELECT * FROM bets
-                WHERE chat_id = :chat_id AND issue = :issue
-                      AND status = 'active' AND result = 'pending'
-                ORDER BY created_at ASC
-            """)
+            query = text(PENDING_BETS_BY_ISSUE_SQL)
 
             params = {
                 "chat_id": chat_id,
@@ -557,3 +854,36 @@ class BetRepository:
             result = await session.execute(query, params)
             rows = result.fetchall()
             return [dict(row._mapping) for row in rows]
+
+    async def get_pending_exposure(
+        self,
+        issue: Optional[str],
+        bet_types: List[str]
+    ) -> Optional[Dict[ExposureKey, List[int]]]:
+        """
+        从数据库汇总某期已入库待结算投注的风险敞口（账本未就绪时供单期限额校验使用）
+
+        Args:
+            issue: 期号
+            bet_types: 下注类型
+
+        Returns:
+            Dict: {敞口键: [下注额, 最坏派彩]}（分）；账本就绪时返回 None，直接使用敞口账本
+        """
+        if self._pending_book.ready:
+            return None
+
+        async with self._session_factory() as session:
+            result = await session.execute(text("""
+                SELECT * FROM bets
+                WHERE issue = :issue AND lottery_type IN :bet_types
+                      AND status = 'active' AND result = 'pending'
+            """).bindparams(bindparam("bet_types", expanding=True)), {
+                "issue": issue,
+                "bet_types": list(bet_types)
+            })
+            bets = [dict(row._mapping) for row in result.fetchall()]
+
+        for bet in bets:
+            self._parse_json_fields(bet)
+        return ExposureLedger.totals(entry_for_bet(bet) for bet in bets)
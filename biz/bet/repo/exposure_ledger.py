@@ -0,0 +1,185 @@
+"""
+ExposureLedger - 单期风险敞口账本
+按 (game_type, issue, bet_type, 投注内容) 汇总待结算投注的总下注额和最坏情况派彩，
+用于在下注时以 O(1) 校验赔率配置的 period_max（单期最大投注额）
+
+已入库的待结算投注随 PendingBetBook 增减（启动时随账本一起从数据库重建）；
+账本未就绪（加载中或加载失败）时由调用方从数据库汇总已入库部分传入 reserve。
+下注流程中尚未入库的投注以预占（reserve）计入，入库后释放预占，
+检查与预占之间没有 await，单进程内天然原子。金额在账本内以整数分累加
+"""
+import os
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from biz.game.logic import game_logic, money, outcome_table
+
+# 敞口键：(game_type, issue, bet_type, 投注内容)
+ExposureKey = Tuple[str, Optional[str], str, str]
+# 敞口条目：(敞口键, 下注额, 最坏情况派彩)，金额单位为分
+ExposureEntry = Tuple[ExposureKey, int, int]
+
+
+def selection_key(bet_type: str, details: Optional[Dict[str, Any]], bet_number: Any = None) -> str:
+    """
+    投注内容标识（同一内容的投注合并计算敞口）
+
+    Args:
+        bet_type: 下注类型
+        details: 解析后的下注详情（game_logic.parse_bets 的结果）
+        bet_number: 无详情时使用 bets.bet_number
+    """
+    if not details:
+        return "" if bet_number is None else str(bet_number)
+    if details.get("numbers"):
+        # 角/中：号码组合与顺序无关
+        return "".join(str(n) for n in sorted(details["numbers"]))
+    if bet_type == "nian":
+        return f"{details.get('first')}念{details.get('second')}"
+    if bet_type == "tong":
+        return f"{details.get('first')}通{details.get('second')}"
+    if bet_type == "zheng_jin":
+        return f"{details.get('number')}无{details.get('jin_number')}"
+    if details.get("number") is not None:
+        return str(details["number"])
+    return ""
+
+
+def worst_payout_cents(
+    game_type: str,
+    bet: Dict[str, Any],
+    amount: int,
+    odds: Any,
+    odds_bp: Optional[int] = None
+) -> int:
+    """
+    最坏情况派彩（分）：幸运8 按结果表取全部结果中的最大派彩（如不可能中奖的投注最多退本金），
+    其余游戏按 本金 × 赔率（已有基点赔率 odds_bp 时直接使用）
+    """
+    if game_type == "lucky8":
+        best = max(outcome_table.compile_signature(bet))
+        if best != outcome_table.WIN:
+            return amount if best == outcome_table.TIE else 0
+    if odds_bp is None:
+        odds_bp = money.exact_basis_points(odds)
+    if odds_bp is None:
+        return money.to_cents(money.from_cents(amount) * Decimal(str(odds)))
+    return money.payout_cents(amount, odds_bp)
+
+
+def entry_for_bet(bet: Dict[str, Any]) -> ExposureEntry:
+    """由 bets 表记录计算敞口条目"""
+    game_type = bet.get("game_type") or "lucky8"
+    bet_type = bet.get("lottery_type") or ""
+    details = game_logic.bet_for_settlement(bet)
+    key = (game_type, bet.get("issue"), bet_type, selection_key(bet_type, details, bet.get("bet_number")))
+    amount = money.to_cents(bet["bet_amount"])
+    return key, amount, worst_payout_cents(game_type, details, amount, bet["odds"])
+
+
+def entry_for_new_bet(game_type: str, issue: Optional[str], bet: Dict[str, Any]) -> ExposureEntry:
+    """由解析后的下注（入库前，金额已为整数分）计算敞口条目"""
+    key = (game_type, issue, bet["type"], selection_key(bet["type"], bet))
+    amount = bet["amount_cents"]
+    return key, amount, worst_payout_cents(game_type, bet, amount, bet["odds"], bet.get("odds_bp"))
+
+
+class ExposureLedger:
+    """单期风险敞口账本（单进程内共享）"""
+
+    def __init__(self, payout_multiple: Optional[Decimal] = None):
+        # {敞口键: [下注额, 最坏派彩]}，单位为分
+        self._committed: Dict[ExposureKey, List[int]] = {}
+        self._reserved: Dict[ExposureKey, List[int]] = {}
+        # 最坏派彩上限 = period_max × 倍数（0 表示不校验派彩）
+        self.payout_multiple = payout_multiple if payout_multiple is not None else Decimal(
+            os.getenv("PERIOD_MAX_PAYOUT_MULTIPLE", "1")
+        )
+        self.rejected = 0
+
+    @classmethod
+    def totals(cls, entries: Iterable[ExposureEntry]) -> Dict[ExposureKey, List[int]]:
+        """按敞口键汇总条目：{敞口键: [下注额, 最坏派彩]}"""
+        totals: Dict[ExposureKey, List[int]] = {}
+        cls._apply(totals, entries, 1)
+        return totals
+
+    @staticmethod
+    def _apply(totals: Dict[ExposureKey, List[int]], entries: Iterable[ExposureEntry], sign: int):
+        for key, amount, payout in entries:
+            values = totals.setdefault(key, [0, 0])
+            values[0] += sign * amount
+            values[1] += sign * payout
+            if values[0] <= 0:
+                del totals[key]
+
+    # ==================== 已入库投注（由 PendingBetBook 调用） ====================
+
+    def add_bet(self, bet: Dict[str, Any]):
+        self._apply(self._committed, [entry_for_bet(bet)], 1)
+
+    def remove_bet(self, bet: Dict[str, Any]):
+        self._apply(self._committed, [entry_for_bet(bet)], -1)
+
+    def clear(self):
+        self._committed.clear()
+
+    # ==================== 下注流程 ====================
+
+    def _exposure_cents(
+        self,
+        key: ExposureKey,
+        committed_totals: Optional[Dict[ExposureKey, List[int]]] = None
+    ) -> Tuple[int, int]:
+        committed = (self._committed if committed_totals is None else committed_totals).get(key)
+        reserved = self._reserved.get(key)
+        stake = (committed[0] if committed else 0) + (reserved[0] if reserved else 0)
+        payout = (committed[1] if committed else 0) + (reserved[1] if reserved else 0)
+        return stake, payout
+
+    def exposure(self, key: ExposureKey) -> Tuple[Decimal, Decimal]:
+        """当前敞口（已入库 + 预占）：(下注额, 最坏派彩)"""
+        stake, payout = self._exposure_cents(key)
+        return money.from_cents(stake), money.from_cents(payout)
+
+    def reserve(
+        self,
+        entries: List[ExposureEntry],
+        limits: Dict[str, Decimal],
+        committed: Optional[Dict[ExposureKey, List[int]]] = None
+    ) -> Optional[ExposureKey]:
+        """
+        校验并预占敞口（全部通过才预占）
+
+        Args:
+            entries: 本次下注的敞口条目
+            limits: {bet_type: period_max}，未配置的类型不限制
+            committed: 已入库敞口（账本未就绪时从数据库汇总），None 表示使用账本
+
+        Returns:
+            ExposureKey: 超限的敞口键；全部通过返回 None
+        """
+        for key, (amount, payout) in self.totals(entries).items():
+            limit = limits.get(key[2])
+            if limit is None:
+                continue
+            stake_total, payout_total = self._exposure_cents(key, committed)
+            if stake_total + amount > money.to_cents(limit):
+                self.rejected += 1
+                return key
+            if self.payout_multiple > 0 and payout_total + payout > money.to_cents(limit * self.payout_multiple):
+                self.rejected += 1
+                return key
+        self._apply(self._reserved, entries, 1)
+        return None
+
+    def release(self, entries: List[ExposureEntry]):
+        """释放预占（投注已入库或下注失败）"""
+        self._apply(self._reserved, entries, -1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "keys": len(self._committed),
+            "reserved_keys": len(self._reserved),
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,157 @@
+"""
+PendingBetBook - 待结算投注内存账本
+对应 Node.js 的 session.pendingBets：按群聊保存待结算投注，并按用户、期号建立索引
+
+MySQL 仍是唯一数据源：启动时从 bets 表重建，BetRepository 写库成功后同步更新账本。
+账本未就绪（尚未加载或加载失败）时 BetRepository 直接查库
+"""
+from typing import Any, Dict, Iterable, List, Optional, Protocol, Tuple
+
+from biz.bet.repo.exposure_ledger import ExposureLedger
+
+
+class PendingBetListener(Protocol):
+    """账本变更订阅者（增量维护的汇总数据，如风险敞口、盈亏矩阵）"""
+
+    def add_bet(self, bet: Dict[str, Any]) -> None: ...
+
+    def remove_bet(self, bet: Dict[str, Any]) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+class PendingBetBook:
+    """待结算投注账本（单进程内共享）"""
+
+    def __init__(self):
+        # {chat_id: {bet_id: bet}}，按下注顺序
+        self._chats: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # {(chat_id, user_id): {bet_id: None}} / {(chat_id, issue): {bet_id: None}}
+        self._by_user: Dict[Tuple[str, str], Dict[str, None]] = {}
+        self._by_issue: Dict[Tuple[str, Optional[str]], Dict[str, None]] = {}
+        # 投注ID -> chat_id
+        self._bet_chat: Dict[str, str] = {}
+        # 单期风险敞口（随账本增减）
+        self.exposure = ExposureLedger()
+        self._listeners: List[PendingBetListener] = [self.exposure]
+
+        self.ready = False
+        # 加载期间的写入记录，快照完成后重放，避免加载过程中的下注/结算丢失
+        self._journal: Optional[List[Tuple[str, Any]]] = None
+
+    # ==================== 加载 ====================
+
+    def begin_load(self):
+        """开始加载：此后的写入先记入日志"""
+        self._journal = []
+
+    def finish_load(self, bets: Iterable[Dict[str, Any]]):
+        """用数据库快照重建账本，并重放加载期间的写入"""
+        journal = self._journal or []
+        self._chats.clear()
+        self._by_user.clear()
+        self._by_issue.clear()
+        self._bet_chat.clear()
+        for listener in self._listeners:
+            listener.clear()
+        for bet in bets:
+            self._add(bet)
+        for op, payload in journal:
+            if op == "add":
+                self._add(payload)
+            else:
+                self._discard(payload)
+        self._journal = None
+        self.ready = True
+
+    def abort_load(self):
+        """加载失败：保持未就绪，读取继续走数据库"""
+        self._journal = None
+        self.ready = False
+
+    def add_listener(self, listener: PendingBetListener):
+        """注册订阅者，并用当前账本内容初始化"""
+        listener.clear()
+        for bets in self._chats.values():
+            for bet in bets.values():
+                listener.add_bet(bet)
+        self._listeners.append(listener)
+
+    # ==================== 写入 ====================
+
+    def add(self, bet: Dict[str, Any]):
+        """记录新的待结算投注"""
+        if self._journal is not None:
+            self._journal.append(("add", bet))
+        if self.ready:
+            self._add(bet)
+
+    def discard(self, bet_ids: Iterable[str]):
+        """移除已结算/已取消的投注"""
+        bet_ids = list(bet_ids)
+        if self._journal is not None:
+            self._journal.append(("discard", bet_ids))
+        if self.ready:
+            self._discard(bet_ids)
+
+    def _add(self, bet: Dict[str, Any]):
+        bet_id = bet["id"]
+        chat_id = bet["chat_id"]
+        if bet_id in self._bet_chat:
+            return
+        self._chats.setdefault(chat_id, {})[bet_id] = bet
+        self._by_user.setdefault((chat_id, bet["user_id"]), {})[bet_id] = None
+        self._by_issue.setdefault((chat_id, bet.get("issue")), {})[bet_id] = None
+        self._bet_chat[bet_id] = chat_id
+        for listener in self._listeners:
+            listener.add_bet(bet)
+
+    def _discard(self, bet_ids: Iterable[str]):
+        for bet_id in bet_ids:
+            chat_id = self._bet_chat.pop(bet_id, None)
+            if chat_id is None:
+                continue
+            bet = self._chats[chat_id].pop(bet_id)
+            for listener in self._listeners:
+                listener.remove_bet(bet)
+            if not self._chats[chat_id]:
+                del self._chats[chat_id]
+            for index, key in ((self._by_user, (chat_id, bet["user_id"])), (self._by_issue, (chat_id, bet.get("issue")))):
+                ids = index.get(key)
+                if ids is not None:
+                    ids.pop(bet_id, None)
+                    if not ids:
+                        del index[key]
+
+    # ==================== 查询 ====================
+
+    def chat_bets(self, chat_id: str) -> List[Dict[str, Any]]:
+        """群聊全部待结算投注（不限期号）"""
+        return [dict(bet) for bet in self._chats.get(chat_id, {}).values()]
+
+    def user_bets(self, chat_id: str, user_id: str) -> List[Dict[str, Any]]:
+        """用户在群聊的全部待结算投注（不限期号）"""
+        bets = self._chats.get(chat_id, {})
+        return [dict(bets[bet_id]) for bet_id in self._by_user.get((chat_id, user_id), {})]
+
+    def issue_bets(self, chat_id: str, issue: str) -> List[Dict[str, Any]]:
+        """群聊某期的待结算投注"""
+        bets = self._chats.get(chat_id, {})
+        return [dict(bets[bet_id]) for bet_id in self._by_issue.get((chat_id, issue), {})]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "chats": len(self._chats),
+            "bets": len(self._bet_chat),
+            "exposure": self.exposure.get_stats(),
+        }
+
+
+# 全局单例
+_book = PendingBetBook()
+
+
+def get_pending_bet_book() -> PendingBetBook:
+    """获取待结算投注账本单例"""
+    return _book
@@ -164,6 +164,40 @@ class ChatRepository:
 
             return await self.get_chat(chat_id)
 
+    async def get_chats_after(
+        self,
+        after_id: Optional[str] = None,
+        limit: int = 500,
+        status: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        按主键顺序分页获取群聊（id, game_type），用于全量遍历
+
+        Args:
+            after_id: 上一页最后一个群聊ID，None 表示从头开始
+            limit: 每页数量
+            status: 群聊状态过滤（可选）
+        """
+        where = []
+        params: Dict[str, Any] = {"limit": limit}
+        if after_id is not None:
+            where.append("id > :after_id")
+            params["after_id"] = after_id
+        if status:
+            where.append("status = :status")
+            params["status"] = status
+        where_clause = f"WHERE {' AND '.join(where)}" if where else ""
+
+        async with self._session_factory() as session:
+            query = text(f"""
+                SELECT id, game_type FROM chats
+                {where_clause}
+                ORDER BY id ASC
+                LIMIT :limit
+            """)
+            result = await session.execute(query, params)
+            return [dict(row._mapping) for row in result.fetchall()]
+
     async def get_all_chats(
         self,
         skip: int = 0,
@@ -38,6 +38,8 @@ from biz.reports.service.report_service import ReportService
 from biz.users.service.bot_user_service import BotUserService
 from biz.yueliao.repo.yueliao_user_repo import YueliaoUserRepo
 from biz.yueliao.service.yueliao_user_service import YueliaoUserService
+from biz.archive.repo.archive_repo import ArchiveRepository
+from biz.archive.service.archive_service import ArchiveService
 
 # Import external clients
 from external.bot_api_client import BotApiClient
@@ -224,6 +226,17 @@ class Container(containers.DeclarativeContainer):
         repo=yueliao_user_repo
     )
 
+    archive_repo = providers.Factory(
+        ArchiveRepository,
+        session_factory=db_session_factory
+    )
+
+    # 归档服务持有后台任务，需单例
+    archive_service = providers.Singleton(
+        ArchiveService,
+        archive_repo=archive_repo
+    )
+
     # ===== External Clients =====
 
     bot_api_client = providers.Singleton(
@@ -7,10 +7,10 @@ from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-import re
 
 from biz.draw.service.draw_service import DrawService
 from biz.draw.models.model import DrawCreate
+from biz.draw.metrics import metrics_from_row
 from dependency_injector.wiring import inject, Provide
 from biz.containers import Container
 from base.api import UnifyResponse
@@ -194,35 +194,6 @@ def _to_chinese_game_name(game_type: str) -> str:
     return "168澳洲幸运8" if game_type == "lucky8" else "新奥六合彩"
 
 
-def _parse_numbers(draw_code: str) -> List[str]:
-    return re.findall(r"\d+", str(draw_code))
-
-
-def _compute_metrics(numbers: List[int]) -> Dict[str, Any]:
-    if len(numbers) < 2:
-        return {
-            "championSum": None,
-            "championSize": None,
-            "championParity": None,
-            "dragonTiger": [None, None, None, None, None]
-        }
-    s = numbers[0] + numbers[1]
-    size = "大" if s >= 12 else "小"
-    parity = "单" if s % 2 == 1 else "双"
-    dt = []
-    if len(numbers) >= 10:
-        for i in range(5):
-            dt.append("龙" if numbers[i] > numbers[9 - i] else "虎")
-    else:
-        dt = [None, None, None, None, None]
-    return {
-        "championSum": s,
-        "championSize": size,
-        "championParity": parity,
-        "dragonTiger": dt
-    }
-
-
 def _format_time(ts: Any) -> str:
     if isinstance(ts, datetime):
         return ts.strftime("%Y-%m-%d %H:%M:%S")
@@ -266,20 +237,13 @@ async def get_lottery_results(
             total = stats.get("total_count", 0)
         items = []
         for r in rows:
-            nums_str = _parse_numbers(r.get("draw_code", ""))
-            nums_int = []
-            for s in nums_str:
-                try:
-                    nums_int.append(int(s))
-                except Exception:
-                    nums_int.append(None)
-            metrics = _compute_metrics([n for n in nums_int if isinstance(n, int)])
+            metrics = metrics_from_row(r)
             item = {
                 "id": r.get("id"),
                 "issueNumber": r.get("issue"),
                 "lotteryTime": _format_time(r.get("timestamp")),
                 "lotteryType": _to_chinese_game_name(r.get("game_type", gt)),
-                "numbers": nums_str,
+                "numbers": metrics["numbers"],
                 "championSum": metrics["championSum"],
                 "championSize": metrics["championSize"],
                 "championParity": metrics["championParity"],
@@ -309,20 +273,13 @@ async def get_lottery_result_detail(
         r = await draw_service.draw_repo.get_draw(id)
         if not r:
             raise UnifyException("资源不存在", biz_code=404, http_code=200)
-        nums_str = _parse_numbers(r.get("draw_code", ""))
-        nums_int = []
-        for s in nums_str:
-            try:
-                nums_int.append(int(s))
-            except Exception:
-                nums_int.append(None)
-        metrics = _compute_metrics([n for n in nums_int if isinstance(n, int)])
+        metrics = metrics_from_row(r)
         item = {
             "id": r.get("id"),
             "issueNumber": r.get("issue"),
             "lotteryTime": _format_time(r.get("timestamp")),
             "lotteryType": _to_chinese_game_name(r.get("game_type", "lucky8")),
-            "numbers": nums_str,
+            "numbers": metrics["numbers"],
             "championSum": metrics["championSum"],
             "championSize": metrics["championSize"],
             "championParity": metrics["championParity"],
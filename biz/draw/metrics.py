@@ -0,0 +1,100 @@
+"""
+开奖指标
+冠亚和、大小、单双、五组龙虎在写入开奖记录时计算一次并存入 draw_history，
+开奖结果接口直接读取，不再逐行解析 draw_code
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+# 号码定长编码：每个号码两位（01-99），如 "1,2,10" -> "010210"
+NUMBER_WIDTH = 2
+
+METRIC_COLUMNS = ("numbers_packed", "champion_sum", "champion_size", "champion_parity", "dragon_tiger")
+
+
+def parse_numbers(draw_code: Any) -> List[int]:
+    """从开奖号码串中提取号码"""
+    return [int(n) for n in re.findall(r"\d+", str(draw_code or ""))]
+
+
+def pack_numbers(numbers: List[int]) -> str:
+    """号码编码为定长字符串"""
+    return "".join(f"{n:0{NUMBER_WIDTH}d}" for n in numbers)
+
+
+def unpack_numbers(packed: str) -> List[int]:
+    """定长字符串解码为号码"""
+    return [int(packed[i:i + NUMBER_WIDTH]) for i in range(0, len(packed), NUMBER_WIDTH)]
+
+
+def compute_metrics(numbers: List[int]) -> Dict[str, Any]:
+    """计算冠亚和（前两个号码）与五组龙虎（需至少10个号码）"""
+    if len(numbers) < 2:
+        return {
+            "championSum": None,
+            "championSize": None,
+            "championParity": None,
+            "dragonTiger": [None, None, None, None, None]
+        }
+    s = numbers[0] + numbers[1]
+    size = "大" if s >= 12 else "小"
+    parity = "单" if s % 2 == 1 else "双"
+    dt = []
+    if len(numbers) >= 10:
+        for i in range(5):
+            dt.append("龙" if numbers[i] > numbers[9 - i] else "虎")
+    else:
+        dt = [None, None, None, None, None]
+    return {
+        "championSum": s,
+        "championSize": size,
+        "championParity": parity,
+        "dragonTiger": dt
+    }
+
+
+def metric_columns(draw_code: Any) -> Dict[str, Any]:
+    """
+    计算写入 draw_history 的指标列
+
+    Returns:
+        Dict: numbers_packed / champion_sum / champion_size / champion_parity / dragon_tiger
+              （dragon_tiger 为5个字符“龙/虎”，号码不足10个时为空）
+    """
+    numbers = parse_numbers(draw_code)
+    metrics = compute_metrics(numbers)
+    dragon_tiger = metrics["dragonTiger"]
+    return {
+        "numbers_packed": pack_numbers(numbers),
+        "champion_sum": metrics["championSum"],
+        "champion_size": metrics["championSize"],
+        "champion_parity": metrics["championParity"],
+        "dragon_tiger": "".join(dragon_tiger) if all(dragon_tiger) else None,
+    }
+
+
+def metrics_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    读取开奖记录中的指标列
+
+    未回填指标的旧记录（numbers_packed 为空）按 draw_code 现场计算
+
+    Returns:
+        Dict: numbers（两位字符串列表）及 compute_metrics 的各字段
+    """
+    packed: Optional[str] = row.get("numbers_packed")
+    if packed is None:
+        numbers = parse_numbers(row.get("draw_code"))
+        metrics = compute_metrics(numbers)
+    else:
+        numbers = unpack_numbers(packed)
+        dragon_tiger = row.get("dragon_tiger")
+        metrics = {
+            "championSum": row.get("champion_sum"),
+            "championSize": row.get("champion_size"),
+            "championParity": row.get("champion_parity"),
+            "dragonTiger": list(dragon_tiger) if dragon_tiger else [None, None, None, None, None],
+        }
+    # 与上游开奖号码格式一致，每个号码补零为两位（如 "08"）
+    metrics["numbers"] = [f"{n:0{NUMBER_WIDTH}d}" for n in numbers]
+    return metrics
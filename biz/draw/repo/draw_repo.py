@@ -2,10 +2,99 @@
 DrawRepository - 开奖历史数据访问层
 主键：id (自增)
 """
+import json
 from datetime import datetime
 from typing import Optional, List, Dict, Any
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
 from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+from biz.archive.repo.archive_repo import table_source
+from biz.draw.metrics import metric_columns
+
+
+# 全局开奖序列的 chat_id：每期开奖只存一条，各群通过 draw_chat_results 关联
+GLOBAL_CHAT_ID = "system"
+
+# 群聊结算运行状态（draw_chat_results.status）：claimed → computed → committed → announced
+RUN_CLAIMED = "claimed"
+RUN_COMPUTED = "computed"
+RUN_COMMITTED = "committed"
+RUN_ANNOUNCED = "announced"
+RUN_UNFINISHED = (RUN_CLAIMED, RUN_COMPUTED, RUN_COMMITTED)
+# 009 迁移之前写入的记录的状态：drawn 为开奖后未结算，settled 为已结算（新记录不再使用）
+LEGACY_DRAWN = "drawn"
+RUN_FINISHED = (RUN_ANNOUNCED, "settled")
+
+# 热点查询（migrations/check_query_plans.py 直接引用，校验执行计划）
+DRAW_BY_ISSUE_SQL = """
+    SELECT * FROM draw_history
+    WHERE issue = :issue AND game_type = :game_type AND chat_id = :chat_id
+    LIMIT 1
+"""
+ISSUE_EXISTS_SQL = """
+    SELECT 1 FROM draw_history
+    WHERE issue = :issue AND game_type = :game_type AND chat_id = :chat_id
+    LIMIT 1
+"""
+LATEST_DRAW_SQL = """
+    SELECT * FROM draw_history
+    WHERE game_type = :game_type AND chat_id = :chat_id
+    ORDER BY timestamp DESC
+    LIMIT 1
+"""
+RECENT_DRAWS_BY_GAME_SQL = """
+    SELECT * FROM draw_history
+    WHERE chat_id = :chat_id AND game_type = :game_type
+    ORDER BY timestamp DESC
+    LIMIT :limit
+"""
+RECENT_DRAWS_SQL = """
+    SELECT * FROM draw_history
+    WHERE chat_id = :chat_id
+    ORDER BY timestamp DESC
+    LIMIT :limit
+"""
+DRAW_HISTORY_SQL = """
+    SELECT * FROM draw_history
+    WHERE game_type = :game_type
+    ORDER BY timestamp DESC
+    LIMIT :limit OFFSET :skip
+"""
+LATEST_DRAW_BY_DATE_SQL = """
+    SELECT * FROM draw_history
+    WHERE issue LIKE :pattern AND game_type = :game_type
+    ORDER BY issue DESC
+    LIMIT 1
+"""
+# {source} 为 table_source() 选择的数据源（早于归档分界线时合并冷表）
+DRAW_HISTORY_BY_DATE_SQL = """
+    SELECT d.* FROM {source}
+    WHERE game_type = :game_type
+      AND timestamp >= :lottery_date
+      AND timestamp < DATE_ADD(:lottery_date, INTERVAL 1 DAY)
+    ORDER BY timestamp DESC
+    LIMIT :limit OFFSET :skip
+"""
+SETTLEMENT_RUN_SQL = """
+    SELECT * FROM draw_chat_results
+    WHERE chat_id = :chat_id AND game_type = :game_type AND issue = :issue
+    FOR UPDATE
+"""
+UNFINISHED_RUNS_SQL = """
+    SELECT * FROM draw_chat_results
+    WHERE status IN :statuses
+    ORDER BY id
+"""
+CHAT_UNFINISHED_RUNS_SQL = """
+    SELECT * FROM draw_chat_results
+    WHERE status IN :statuses AND chat_id = :chat_id
+    ORDER BY id
+"""
+
+
+def _parse_run(run: Dict[str, Any]) -> Dict[str, Any]:
+    """解析结算运行记录的 bet_ids（JSON 数组）"""
+    run["bet_ids"] = json.loads(run["bet_ids"]) if run.get("bet_ids") else None
+    return run
 
 
 class DrawRepository:
@@ -15,15 +104,30 @@ class DrawRepository:
         self._session_factory = session_factory
 
     async def create_draw(self, draw_data: Dict[str, Any]) -> Dict[str, Any]:
-        """创建开奖记录"""
+        """
+        创建开奖记录
+
+        draw_history 每期只存一条全局记录；群聊开奖交给 create() 写入全局记录与 draw_chat_results 关联
+        """
+        chat_id = draw_data.get("chat_id", GLOBAL_CHAT_ID)
+        if chat_id != GLOBAL_CHAT_ID:
+            return await self.create({
+                **draw_data,
+                "draw_time": draw_data.get("timestamp", datetime.now())
+            })
+
         async with self._session_factory() as session:
             query = text("""
                 INSERT INTO draw_history (
                     draw_number, issue, draw_code, game_type, is_random,
-                    chat_id, bet_count, timestamp, created_at
+                    chat_id, bet_count, timestamp,
+                    numbers_packed, champion_sum, champion_size, champion_parity, dragon_tiger,
+                    created_at
                 ) VALUES (
                     :draw_number, :issue, :draw_code, :game_type, :is_random,
-                    :chat_id, :bet_count, :timestamp, NOW()
+                    :chat_id, :bet_count, :timestamp,
+                    :numbers_packed, :champion_sum, :champion_size, :champion_parity, :dragon_tiger,
+                    NOW()
                 )
             """)
 
@@ -33,9 +137,10 @@ class DrawRepository:
                 "draw_code": draw_data["draw_code"],
                 "game_type": draw_data.get("game_type", "lucky8"),
                 "is_random": draw_data.get("is_random", False),
-                "chat_id": draw_data.get("chat_id", "system"),
+                "chat_id": GLOBAL_CHAT_ID,
                 "bet_count": draw_data.get("bet_count", 0),
-                "timestamp": draw_data.get("timestamp", datetime.now())
+                "timestamp": draw_data.get("timestamp", datetime.now()),
+                **metric_columns(draw_data["draw_code"])
             }
 
             await session.execute(query, params)
@@ -69,15 +174,12 @@ class DrawRepository:
     ) -> Optional[Dict[str, Any]]:
         """根据期号获取开奖记录"""
         async with self._session_factory() as session:
-            query = text("""
-                SELECT * FROM draw_history
-                WHERE issue = :issue AND game_type = :game_type AND chat_id = :chat_id
-                LIMIT 1
-            """)
+            # 注意: 开奖为全局序列，chat_id 仅为兼容保留
+            query = text(DRAW_BY_ISSUE_SQL)
             result = await session.execute(query, {
                 "issue": issue,
                 "game_type": game_type,
-                "chat_id": chat_id
+                "chat_id": GLOBAL_CHAT_ID
             })
             row = result.fetchone()
             if row:
@@ -91,15 +193,11 @@ class DrawRepository:
     ) -> Optional[Dict[str, Any]]:
         """获取最新开奖记录"""
         async with self._session_factory() as session:
-            query = text("""
-                SELECT * FROM draw_history
-                WHERE game_type = :game_type AND chat_id = :chat_id
-                ORDER BY timestamp DESC
-                LIMIT 1
-            """)
+            # 注意: 开奖为全局序列，chat_id 仅为兼容保留
+            query = text(LATEST_DRAW_SQL)
             result = await session.execute(query, {
                 "game_type": game_type,
-                "chat_id": chat_id
+                "chat_id": GLOBAL_CHAT_ID
             })
             row = result.fetchone()
             if row:
@@ -116,12 +214,7 @@ class DrawRepository:
         """获取开奖历史"""
         async with self._session_factory() as session:
             # 注意: 不过滤chat_id,返回所有聊天群的开奖记录
-            query = text("""
-                SELECT * FROM draw_history
-                WHERE game_type = :game_type
-                ORDER BY timestamp DESC
-                LIMIT :limit OFFSET :skip
-            """)
+            query = text(DRAW_HISTORY_SQL)
             result = await session.execute(query, {
                 "game_type": game_type,
                 "skip": skip,
@@ -141,15 +234,9 @@ class DrawRepository:
         """按日期过滤获取开奖历史 (YYYY-MM-DD)"""
         async with self._session_factory() as session:
             # 注意: 不过滤chat_id,返回所有聊天群的开奖记录
-            query = text(
-                """
-                SELECT * FROM draw_history
-                WHERE game_type = :game_type
-                  AND DATE(timestamp) = :lottery_date
-                ORDER BY timestamp DESC
-                LIMIT :limit OFFSET :skip
-                """
-            )
+            # 使用时间范围而非 DATE(timestamp)，以便命中 idx_draw_game_ts
+            # 日期早于归档分界线时合并冷表
+            query = text(DRAW_HISTORY_BY_DATE_SQL.format(source=table_source("draw_history", "d", date)))
             result = await session.execute(query, {
                 "game_type": game_type,
                 "lottery_date": date,
@@ -159,28 +246,6 @@ class DrawRepository:
             rows = result.fetchall()
             return [dict(row._mapping) for row in rows]
 
-    async def get_recent_draws(
-        self,
-        game_type: str = "lucky8",
-        chat_id: str = "system",
-        count: int = 10
-    ) -> List[Dict[str, Any]]:
-        """获取最近N期开奖记录"""
-        async with self._session_factory() as session:
-            query = text("""
-                SELECT * FROM draw_history
-                WHERE game_type = :game_type AND chat_id = :chat_id
-                ORDER BY timestamp DESC
-                LIMIT :count
-            """)
-            result = await session.execute(query, {
-                "game_type": game_type,
-                "chat_id": chat_id,
-                "count": count
-            })
-            rows = result.fetchall()
-            return [dict(row._mapping) for row in rows]
-
     async def count_draws(
         self,
         game_type: str = "lucky8",
@@ -209,10 +274,11 @@ class DrawRepository:
         async with self._session_factory() as session:
             # 注意: 不过滤chat_id,统计所有聊天群的开奖记录
             query = text(
-                """
-                SELECT COUNT(*) as count FROM draw_history
+                f"""
+                SELECT COUNT(*) as count FROM {table_source("draw_history", "d", date)}
                 WHERE game_type = :game_type
-                  AND DATE(timestamp) = :lottery_date
+                  AND timestamp >= :lottery_date
+                  AND timestamp < DATE_ADD(:lottery_date, INTERVAL 1 DAY)
                 """
             )
             result = await session.execute(query, {
@@ -230,18 +296,116 @@ class DrawRepository:
     ) -> bool:
         """检查期号是否已存在"""
         async with self._session_factory() as session:
-            query = text("""
-                SELECT 1 FROM draw_history
-                WHERE issue = :issue AND game_type = :game_type AND chat_id = :chat_id
-                LIMIT 1
-            """)
+            # 注意: 开奖为全局序列，chat_id 仅为兼容保留
+            query = text(ISSUE_EXISTS_SQL)
             result = await session.execute(query, {
                 "issue": issue,
                 "game_type": game_type,
-                "chat_id": chat_id
+                "chat_id": GLOBAL_CHAT_ID
             })
             return result.fetchone() is not None
 
+    async def upsert_many(
+        self,
+        draws: List[Dict[str, Any]],
+        chunk_size: int = 500
+    ) -> int:
+        """
+        批量写入开奖记录（INSERT IGNORE，依赖唯一键 (game_type, chat_id, issue) 幂等）
+
+        每批一条多行 INSERT 语句，适用于历史同步与大批量回填
+
+        Args:
+            draws: 开奖数据列表，字段同 create()
+            chunk_size: 每条语句的最大行数
+
+        Returns:
+            int: 实际新增的行数（已存在的期号不计）
+        """
+        if not draws:
+            return 0
+
+        inserted = 0
+        async with self._session_factory() as session:
+            for start in range(0, len(draws), chunk_size):
+                chunk = draws[start:start + chunk_size]
+                values = []
+                params: Dict[str, Any] = {}
+                for i, draw in enumerate(chunk):
+                    values.append(
+                        f"(:draw_number_{i}, :issue_{i}, :draw_code_{i}, :game_type_{i}, :is_random_{i}, "
+                        f":chat_id_{i}, :bet_count_{i}, :timestamp_{i}, :special_number_{i}, "
+                        f":numbers_packed_{i}, :champion_sum_{i}, :champion_size_{i}, :champion_parity_{i}, "
+                        f":dragon_tiger_{i}, NOW())"
+                    )
+                    params.update({
+                        f"draw_number_{i}": draw.get("draw_number"),
+                        f"issue_{i}": draw["issue"],
+                        f"draw_code_{i}": draw["draw_code"],
+                        f"game_type_{i}": draw.get("game_type", "lucky8"),
+                        f"is_random_{i}": draw.get("is_random", False),
+                        f"chat_id_{i}": draw.get("chat_id", "system"),
+                        f"bet_count_{i}": draw.get("bet_count", 0),
+                        f"timestamp_{i}": draw.get("draw_time") or datetime.now(),
+                        f"special_number_{i}": draw.get("special_number"),
+                    })
+                    params.update({
+                        f"{column}_{i}": value
+                        for column, value in metric_columns(draw["draw_code"]).items()
+                    })
+
+                query = text(f"""
+                    INSERT IGNORE INTO draw_history (
+                        draw_number, issue, draw_code, game_type, is_random,
+                        chat_id, bet_count, timestamp, special_number,
+                        numbers_packed, champion_sum, champion_size, champion_parity, dragon_tiger,
+                        created_at
+                    ) VALUES {", ".join(values)}
+                """)
+                result = await session.execute(query, params)
+                inserted += result.rowcount
+
+            await session.commit()
+
+        return inserted
+
+    async def backfill_metrics(self, after_id: int = 0, batch_size: int = 500) -> int:
+        """
+        为一批缺少指标列的旧记录回填 numbers_packed / 冠亚和 / 龙虎（按 id 递增分批）
+
+        Args:
+            after_id: 从该 id 之后开始（上一批返回的最大 id）
+            batch_size: 每批行数
+
+        Returns:
+            int: 本批最后一条记录的 id，没有待回填记录时返回 0
+        """
+        async with self._session_factory() as session:
+            result = await session.execute(text("""
+                SELECT id, draw_code FROM draw_history
+                WHERE id > :after_id AND numbers_packed IS NULL
+                ORDER BY id
+                LIMIT :limit
+            """), {"after_id": after_id, "limit": batch_size})
+            rows = result.fetchall()
+            if not rows:
+                return 0
+
+            update = text("""
+                UPDATE draw_history
+                SET numbers_packed = :numbers_packed,
+                    champion_sum = :champion_sum,
+                    champion_size = :champion_size,
+                    champion_parity = :champion_parity,
+                    dragon_tiger = :dragon_tiger
+                WHERE id = :id
+            """)
+            await session.execute(update, [
+                {"id": row[0], **metric_columns(row[1])} for row in rows
+            ])
+            await session.commit()
+            return rows[-1][0]
+
     async def update_bet_count(
         self,
         draw_id: int,
@@ -270,7 +434,7 @@ class DrawRepository:
             await session.commit()
             return result.rowcount > 0
 
-    async def create(self, draw_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def create(self, draw_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         创建开奖记录（通用方法，兼容GameService）
 
@@ -284,53 +448,210 @@ class DrawRepository:
                 - special_number: 特码（1-49）
                 - draw_time: 开奖时间
 
+        每期开奖在 draw_history 中只存一条全局记录（chat_id='system'），
+        同一期已存在时（历史同步或其他群已写入）沿用已有记录；
+        群聊开奖另在 draw_chat_results 写入一条关联记录：新记录为 claimed 的结算运行（记录开奖号码），
+        已存在时（结算流程已认领）只补充 draw_id，不改变结算状态。
+        随机开奖（期号 random）各群号码不同，不写入全局序列，只记录关联
+
         Returns:
-            Dict: 创建的开奖记录
+            Dict: 本期的全局开奖记录（随机开奖返回 None）
         """
-        async with self._session_factory() as session:
-            query = text("""
-                INSERT INTO draw_history (
-                    draw_number, issue, draw_code, game_type, is_random,
-                    chat_id, bet_count, timestamp, special_number, created_at
-                ) VALUES (
-                    :draw_number, :issue, :draw_code, :game_type, :is_random,
-                    :chat_id, :bet_count, :timestamp, :special_number, NOW()
-                )
-            """)
+        game_type = draw_data.get("game_type", "lucky8")
+        issue = draw_data["issue"]
+        chat_id = draw_data.get("chat_id", GLOBAL_CHAT_ID)
 
-            params = {
-                "draw_number": draw_data.get("draw_number"),
-                "issue": draw_data["issue"],
-                "draw_code": draw_data["draw_code"],
-                "game_type": draw_data.get("game_type", "lucky8"),
-                "is_random": draw_data.get("is_random", False),
-                "chat_id": draw_data["chat_id"],
-                "bet_count": draw_data.get("bet_count", 0),
-                "timestamp": draw_data.get("draw_time", datetime.now()),
-                "special_number": draw_data.get("special_number")
-            }
+        async with self._session_factory() as session:
+            draw_id = None
+            if issue != "random":
+                query = text("""
+                    INSERT INTO draw_history (
+                        draw_number, issue, draw_code, game_type, is_random,
+                        chat_id, bet_count, timestamp, special_number,
+                        numbers_packed, champion_sum, champion_size, champion_parity, dragon_tiger,
+                        created_at
+                    ) VALUES (
+                        :draw_number, :issue, :draw_code, :game_type, :is_random,
+                        :chat_id, 0, :timestamp, :special_number,
+                        :numbers_packed, :champion_sum, :champion_size, :champion_parity, :dragon_tiger,
+                        NOW()
+                    )
+                    ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id)
+                """)
+                await session.execute(query, {
+                    "draw_number": draw_data.get("draw_number"),
+                    "issue": issue,
+                    "draw_code": draw_data["draw_code"],
+                    "game_type": game_type,
+                    "is_random": draw_data.get("is_random", False),
+                    "chat_id": GLOBAL_CHAT_ID,
+                    "timestamp": draw_data.get("draw_time", datetime.now()),
+                    "special_number": draw_data.get("special_number"),
+                    **metric_columns(draw_data["draw_code"])
+                })
+                result = await session.execute(text("SELECT LAST_INSERT_ID() as id"))
+                row = result.fetchone()
+                draw_id = row[0] if row else None
+
+            if chat_id != GLOBAL_CHAT_ID:
+                await session.execute(text("""
+                    INSERT INTO draw_chat_results (
+                        draw_id, chat_id, game_type, issue, bet_count, status,
+                        draw_number, draw_code, special_number, created_at, updated_at
+                    ) VALUES (
+                        :draw_id, :chat_id, :game_type, :issue, :bet_count, :status,
+                        :draw_number, :draw_code, :special_number, NOW(), NOW()
+                    )
+                    ON DUPLICATE KEY UPDATE draw_id = VALUES(draw_id), updated_at = NOW()
+                """), {
+                    "draw_id": draw_id,
+                    "chat_id": chat_id,
+                    "game_type": game_type,
+                    "issue": issue,
+                    "bet_count": draw_data.get("bet_count", 0),
+                    "status": RUN_CLAIMED,
+                    "draw_number": draw_data.get("draw_number"),
+                    "draw_code": draw_data["draw_code"],
+                    "special_number": draw_data.get("special_number"),
+                })
 
-            await session.execute(query, params)
             await session.commit()
 
-            # 获取最后插入的ID
-            result = await session.execute(text("SELECT LAST_INSERT_ID() as id"))
+        if draw_id is None:
+            return None
+        return await self.get_draw(draw_id)
+
+    async def claim_settlement_run(
+        self,
+        chat_id: str,
+        game_type: str,
+        draw_result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        认领群聊本期的结算运行（draw_chat_results 一行即一次运行）
+
+        不存在时以 claimed 状态创建并记录开奖号码；已存在时原样返回，由调用方按状态继续或跳过。
+        随机开奖（期号 random）各次号码不同，已完成的运行重新认领；旧版本遗留的 drawn 记录视为未认领
+
+        Args:
+            chat_id: 群聊ID
+            game_type: 游戏类型
+            draw_result: 开奖结果（issue/draw_number/draw_code/special_number）
+
+        Returns:
+            Dict: 结算运行记录（bet_ids 已解析为列表）
+        """
+        issue = draw_result["issue"]
+        draw_params = {
+            "chat_id": chat_id,
+            "game_type": game_type,
+            "issue": issue,
+            "draw_number": draw_result.get("draw_number"),
+            "draw_code": draw_result.get("draw_code"),
+            "special_number": draw_result.get("special_number"),
+        }
+        select_query = text(SETTLEMENT_RUN_SQL)
+
+        async with self._session_factory() as session:
+            result = await session.execute(select_query, draw_params)
             row = result.fetchone()
-            draw_id = row[0] if row else None
+            run = dict(row._mapping) if row else None
+
+            if run is None:
+                await session.execute(text("""
+                    INSERT INTO draw_chat_results (
+                        chat_id, game_type, issue, bet_count, status,
+                        draw_number, draw_code, special_number, created_at, updated_at
+                    ) VALUES (
+                        :chat_id, :game_type, :issue, 0, :status,
+                        :draw_number, :draw_code, :special_number, NOW(), NOW()
+                    )
+                    ON DUPLICATE KEY UPDATE id = id
+                """), {**draw_params, "status": RUN_CLAIMED})
+            elif run["status"] == LEGACY_DRAWN or (issue == "random" and run["status"] in RUN_FINISHED):
+                await session.execute(text("""
+                    UPDATE draw_chat_results
+                    SET status = :status, bet_count = 0, bet_ids = NULL,
+                        draw_number = :draw_number, draw_code = :draw_code,
+                        special_number = :special_number, updated_at = NOW()
+                    WHERE id = :id
+                """), {**draw_params, "id": run["id"], "status": RUN_CLAIMED})
+            else:
+                await session.commit()
+                return _parse_run(run)
 
-            return await self.get_draw(draw_id)
+            result = await session.execute(select_query, draw_params)
+            run = dict(result.fetchone()._mapping)
+            await session.commit()
+            return _parse_run(run)
+
+    async def mark_run_computed(self, run_id: int, bet_ids: List[str]) -> bool:
+        """
+        结算运行 claimed → computed：记录本次结算的注单ID（恢复时只结算这些注单）
+
+        Returns:
+            bool: 是否由本次调用推进（已被推进过返回 False）
+        """
+        async with self._session_factory() as session:
+            result = await session.execute(text("""
+                UPDATE draw_chat_results
+                SET status = :status, bet_ids = :bet_ids, updated_at = NOW()
+                WHERE id = :id AND status = :expected
+            """), {
+                "id": run_id,
+                "status": RUN_COMPUTED,
+                "expected": RUN_CLAIMED,
+                "bet_ids": json.dumps(sorted(bet_ids))
+            })
+            await session.commit()
+            return result.rowcount > 0
+
+    async def mark_run_announced(self, run_id: int) -> bool:
+        """结算运行 committed → announced（开奖消息已发送）"""
+        async with self._session_factory() as session:
+            result = await session.execute(text("""
+                UPDATE draw_chat_results
+                SET status = :status, updated_at = NOW()
+                WHERE id = :id AND status = :expected
+            """), {"id": run_id, "status": RUN_ANNOUNCED, "expected": RUN_COMMITTED})
+            await session.commit()
+            return result.rowcount > 0
+
+    async def get_unfinished_runs(self, chat_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        未完成的结算运行（claimed/computed/committed），按创建顺序
+
+        走 idx_draw_chat_status 索引，只扫描未完成的少量记录
+
+        Args:
+            chat_id: 群聊ID（可选，不传则查询全部群聊）
+        """
+        query = UNFINISHED_RUNS_SQL
+        params: Dict[str, Any] = {"statuses": list(RUN_UNFINISHED)}
+        if chat_id is not None:
+            query = CHAT_UNFINISHED_RUNS_SQL
+            params["chat_id"] = chat_id
+
+        async with self._session_factory() as session:
+            result = await session.execute(
+                text(query).bindparams(bindparam("statuses", expanding=True)),
+                params
+            )
+            return [_parse_run(dict(row._mapping)) for row in result.fetchall()]
 
     async def get_recent_draws(
         self,
-        chat_id: str,
+        chat_id: str = GLOBAL_CHAT_ID,
         limit: int = 15,
         game_type: str = None
     ) -> List[Dict[str, Any]]:
         """
         获取最近N期开奖记录（兼容GameService）
 
+        开奖为全局序列，所有群读取同一份记录；chat_id 仅为兼容保留
+
         Args:
-            chat_id: 群聊ID
+            chat_id: 群聊ID（不参与过滤）
             limit: 数量限制
             game_type: 游戏类型(可选,不传则查询所有类型)
 
@@ -340,27 +661,17 @@ class DrawRepository:
         async with self._session_factory() as session:
             if game_type:
                 # 按游戏类型筛选
-                query = text("""
-                    SELECT * FROM draw_history
-                    WHERE chat_id = :chat_id AND game_type = :game_type
-                    ORDER BY timestamp DESC
-                    LIMIT :limit
-                """)
+                query = text(RECENT_DRAWS_BY_GAME_SQL)
                 result = await session.execute(query, {
-                    "chat_id": chat_id,
+                    "chat_id": GLOBAL_CHAT_ID,
                     "game_type": game_type,
                     "limit": limit
                 })
             else:
                 # 查询所有类型
-                query = text("""
-                    SELECT * FROM draw_history
-                    WHERE chat_id = :chat_id
-                    ORDER BY timestamp DESC
-                    LIMIT :limit
-                """)
+                query = text(RECENT_DRAWS_SQL)
                 result = await session.execute(query, {
-                    "chat_id": chat_id,
+                    "chat_id": GLOBAL_CHAT_ID,
                     "limit": limit
                 })
             rows = result.fetchall()
@@ -382,12 +693,7 @@ class DrawRepository:
             Dict: 开奖记录
         """
         async with self._session_factory() as session:
-            query = text("""
-                SELECT * FROM draw_history
-                WHERE issue LIKE :pattern AND game_type = :game_type
-                ORDER BY issue DESC
-                LIMIT 1
-            """)
+            query = text(LATEST_DRAW_BY_DATE_SQL)
             result = await session.execute(query, {
                 "pattern": f"{date_str}%",
                 "game_type": game_type
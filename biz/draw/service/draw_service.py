@@ -122,7 +122,7 @@ class DrawService:
         count: int = 10
     ) -> List[Dict[str, Any]]:
         """获取最近N期开奖记录"""
-        return await self.draw_repo.get_recent_draws(game_type, chat_id, count)
+        return await self.draw_repo.get_recent_draws(chat_id, limit=count, game_type=game_type)
 
     async def update_bet_count(
         self,
@@ -15,10 +15,13 @@
 """
 
 import re
+import json
 import logging
 from decimal import Decimal
 from typing import List, Dict, Any, Optional, Tuple
 
+from biz.game.logic import money
+
 logger = logging.getLogger(__name__)
 
 # 正玩法的对立号配置 (1↔3, 2↔4)
@@ -108,7 +111,7 @@ async def parse_bets(
         game_type: 游戏类型 ('lucky8' 或 'liuhecai')
 
     Returns:
-        List[Dict]: 下注列表
+        List[Dict]: 下注列表（金额为整数分 amount_cents，赔率另附基点 odds_bp）
     """
     bets = []
 
@@ -121,7 +124,7 @@ async def parse_bets(
         bets.append({
             'type': 'fan',
             'number': int(match.group(1)),
-            'amount': Decimal(match.group(2)),
+            'amount_cents': money.parse_cents(match.group(2)),
             'odds': odds,
             'player': player,
             'raw': match.group(0)
@@ -132,7 +135,7 @@ async def parse_bets(
         bets.append({
             'type': 'fan',
             'number': int(match.group(1)),
-            'amount': Decimal(match.group(2)),
+            'amount_cents': money.parse_cents(match.group(2)),
             'odds': odds,
             'player': player,
             'raw': match.group(0)
@@ -147,7 +150,7 @@ async def parse_bets(
         bets.append({
             'type': 'zheng',
             'number': int(match.group(1)),
-            'amount': Decimal(match.group(2)),
+            'amount_cents': money.parse_cents(match.group(2)),
             'odds': odds,
             'player': player,
             'raw': match.group(0)
@@ -160,7 +163,7 @@ async def parse_bets(
             bets.append({
                 'type': 'zheng',
                 'number': int(match.group(1)),
-                'amount': Decimal(match.group(2)),
+                'amount_cents': money.parse_cents(match.group(2)),
                 'odds': odds,
                 'player': player,
                 'raw': match.group(0)
@@ -179,7 +182,7 @@ async def parse_bets(
                 'type': 'nian',
                 'first': num1,    # 首位
                 'second': num2,   # 次位
-                'amount': Decimal(match.group(3)),
+                'amount_cents': money.parse_cents(match.group(3)),
                 'odds': odds,
                 'player': player,
                 'raw': match.group(0)
@@ -193,7 +196,7 @@ async def parse_bets(
                 'type': 'nian',
                 'first': numbers[0],
                 'second': numbers[1],
-                'amount': Decimal(match.group(2)),
+                'amount_cents': money.parse_cents(match.group(2)),
                 'odds': odds,
                 'player': player,
                 'raw': match.group(0)
@@ -214,7 +217,7 @@ async def parse_bets(
             bets.append({
                 'type': 'jiao',
                 'numbers': sorted(numbers),
-                'amount': Decimal(match.group(2)),
+                'amount_cents': money.parse_cents(match.group(2)),
                 'odds': odds,
                 'player': player,
                 'raw': match.group(0)
@@ -227,7 +230,7 @@ async def parse_bets(
             bets.append({
                 'type': 'jiao',
                 'numbers': sorted(numbers),
-                'amount': Decimal(match.group(2)),
+                'amount_cents': money.parse_cents(match.group(2)),
                 'odds': odds,
                 'player': player,
                 'raw': match.group(0)
@@ -241,7 +244,7 @@ async def parse_bets(
             bets.append({
                 'type': 'jiao',
                 'numbers': sorted(numbers),
-                'amount': Decimal(match.group(2)),
+                'amount_cents': money.parse_cents(match.group(2)),
                 'odds': odds,
                 'player': player,
                 'raw': match.group(0)
@@ -261,7 +264,7 @@ async def parse_bets(
             'type': 'tong',
             'first': first,    # 首位赢
             'second': second,  # 末位输
-            'amount': Decimal(match.group(2)),
+            'amount_cents': money.parse_cents(match.group(2)),
             'odds': odds,
             'player': player,
             'raw': match.group(0)
@@ -275,7 +278,7 @@ async def parse_bets(
             'type': 'tong',
             'first': first,    # 首位赢
             'second': second,  # 末位输
-            'amount': Decimal(match.group(3)),
+            'amount_cents': money.parse_cents(match.group(3)),
             'odds': odds,
             'player': player,
             'raw': match.group(0)
@@ -290,7 +293,7 @@ async def parse_bets(
             'type': 'zheng_jin',
             'number': int(match.group(1)),      # 赢号
             'jin_number': int(match.group(2)),  # 禁号
-            'amount': Decimal(match.group(3)),
+            'amount_cents': money.parse_cents(match.group(3)),
             'odds': odds,
             'player': player,
             'raw': match.group(0)
@@ -309,7 +312,7 @@ async def parse_bets(
             bets.append({
                 'type': 'zhong',
                 'numbers': sorted(unique_numbers),
-                'amount': Decimal(match.group(2)),
+                'amount_cents': money.parse_cents(match.group(2)),
                 'odds': odds,
                 'player': player,
                 'raw': match.group(0)
@@ -323,7 +326,7 @@ async def parse_bets(
             bets.append({
                 'type': 'zhong',
                 'numbers': sorted(unique_numbers),
-                'amount': Decimal(match.group(2)),
+                'amount_cents': money.parse_cents(match.group(2)),
                 'odds': odds,
                 'player': player,
                 'raw': match.group(0)
@@ -337,7 +340,7 @@ async def parse_bets(
         odds = await get_odds_from_backend(odds_service, bet_type, game_type=game_type)
         bets.append({
             'type': bet_type,
-            'amount': Decimal(match.group(2)),
+            'amount_cents': money.parse_cents(match.group(2)),
             'odds': odds,
             'player': player,
             'raw': match.group(0)
@@ -356,7 +359,7 @@ async def parse_bets(
         bets.append({
             'type': 'tema',
             'number': number,
-            'amount': Decimal(match.group(2)),
+            'amount_cents': money.parse_cents(match.group(2)),
             'odds': odds,
             'player': player,
             'raw': match.group(0)
@@ -371,7 +374,7 @@ async def parse_bets(
         # 至少需要2个元素（号码.金额）
         if len(parts) >= 2:
             # 最后一个是金额
-            amount = Decimal(parts[-1])
+            amount_cents = money.parse_cents(parts[-1])
 
             # 前面的都是特码号
             for i in range(len(parts) - 1):
@@ -379,15 +382,15 @@ async def parse_bets(
 
                 # 注意：这里只做基础范围验证（1-49），具体的澳8（1-20）vs 六合彩（1-49）验证
                 # 会在validate_bet函数中根据游戏类型进行
-                if 1 <= number <= 49 and amount > 0:
+                if 1 <= number <= 49 and amount_cents > 0:
                     odds = await get_odds_from_backend(odds_service, 'tema', number, game_type)
                     bets.append({
                         'type': 'tema',
                         'number': number,
-                        'amount': amount,
+                        'amount_cents': amount_cents,
                         'odds': odds,
                         'player': player,
-                        'raw': f"{number}.{amount}"  # 只记录当前号码和金额
+                        'raw': f"{number}.{money.format_cents(amount_cents)}"  # 只记录当前号码和金额
                     })
 
     # 处理 "特码5/20" 格式
@@ -397,15 +400,105 @@ async def parse_bets(
         bets.append({
             'type': 'tema',
             'number': number,
-            'amount': Decimal(match.group(2)),
+            'amount_cents': money.parse_cents(match.group(2)),
             'odds': odds,
             'player': player,
             'raw': match.group(0)
         })
 
+    # 赔率转为基点，结算/敞口按整数计算（超过四位小数时为 None，结算回退到 Decimal）
+    for bet in bets:
+        bet['odds_bp'] = money.exact_basis_points(bet['odds'])
+
     return bets
 
 
+# 各下注类型的必填形状列：该列有值说明注单已写入类型化列（否则为仅有 bet_details 的旧记录）
+SHAPE_KEY_COLUMNS = {
+    'fan': 'bet_number',
+    'zheng': 'bet_number',
+    'tema': 'bet_number',
+    'zheng_jin': 'bet_jin_number',
+    'nian': 'bet_first',
+    'tong': 'bet_first',
+    'jiao': 'bet_numbers_mask',
+    'zhong': 'bet_numbers_mask',
+}
+
+
+def numbers_to_mask(numbers: Optional[List[int]]) -> Optional[int]:
+    """号码组合（角/中）编码为位掩码：号码 n 对应第 n 位"""
+    if not numbers:
+        return None
+    mask = 0
+    for number in numbers:
+        mask |= 1 << int(number)
+    return mask
+
+
+def mask_to_numbers(mask: Optional[int]) -> Optional[List[int]]:
+    """位掩码解码为升序号码列表"""
+    if not mask:
+        return None
+    mask = int(mask)
+    return [number for number in range(mask.bit_length()) if mask >> number & 1]
+
+
+def bet_shape_columns(bet: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    解析后的下注对象（parse_bets 的结果）转换为 bets 表的形状列
+
+    Returns:
+        Dict: bet_number / bet_first / bet_second / bet_numbers_mask / bet_jin_number
+    """
+    return {
+        'bet_number': bet.get('number'),
+        'bet_first': bet.get('first'),
+        'bet_second': bet.get('second'),
+        'bet_numbers_mask': numbers_to_mask(bet.get('numbers')),
+        'bet_jin_number': bet.get('jin_number'),
+    }
+
+
+def bet_for_settlement(bet: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    将 bets 表记录转换为 calculate_result 需要的下注对象
+
+    按形状列（bet_number/bet_first/bet_second/bet_numbers_mask/bet_jin_number）组装；
+    未回填形状列的旧记录解析 bet_details
+    """
+    bet_type = bet.get('lottery_type')
+    key_column = SHAPE_KEY_COLUMNS.get(bet_type)
+    if key_column and bet.get(key_column) is None and bet.get('bet_details'):
+        bet_details = bet['bet_details']
+        if isinstance(bet_details, str):
+            try:
+                bet_details = json.loads(bet_details)
+            except ValueError:
+                bet_details = None
+        if bet_details:
+            return bet_details
+
+    return {
+        'type': bet_type,
+        'bet_amount': bet.get('bet_amount'),
+        'odds': bet.get('odds'),
+        'number': bet.get('bet_number'),
+        'first': bet.get('bet_first'),
+        'second': bet.get('bet_second'),
+        'numbers': mask_to_numbers(bet.get('bet_numbers_mask')),
+        'jin_number': bet.get('bet_jin_number'),
+    }
+
+
+def get_bet_amount(bet: Dict[str, Any]) -> Decimal:
+    """下注金额：兼容 bet_amount（数据库）、amount（旧版解析结果）和 amount_cents（解析下注文本）"""
+    amount = bet.get('bet_amount') or bet.get('amount')
+    if amount is None and bet.get('amount_cents') is not None:
+        amount = money.from_cents(bet['amount_cents'])
+    return amount
+
+
 def calculate_result(
     bet: Dict[str, Any],
     draw_code: str,
@@ -427,8 +520,7 @@ def calculate_result(
             - payout: 派彩金额
             - profit: 盈亏金额
     """
-    # 兼容两种字段名：bet_amount（数据库）和 amount（解析下注文本）
-    amount = bet.get('bet_amount') or bet.get('amount')
+    amount = get_bet_amount(bet)
 
     status = 'lose'
     payout = Decimal('0')
@@ -571,6 +663,13 @@ def calculate_result(
     return status, payout, profit
 
 
+def odds_bet_type(bet_type: str, game_type: str = 'lucky8') -> str:
+    """赔率配置中的 bet_type：特码需要按游戏类型区分"""
+    if bet_type == 'tema':
+        return 'tema_lucky8' if game_type == 'lucky8' else 'tema_liuhecai'
+    return bet_type
+
+
 async def validate_bet(
     bet: Dict[str, Any],
     odds_service,
@@ -588,7 +687,7 @@ async def validate_bet(
         Tuple[bool, Optional[str]]: (is_valid, error_message)
     """
     bet_type = bet['type']
-    amount = bet['amount']
+    amount_cents = bet['amount_cents']
 
     # 1. 游戏类型验证：liuhecai只支持tema（特码）
     if game_type == 'liuhecai' and bet_type != 'tema':
@@ -607,16 +706,13 @@ async def validate_bet(
                 return False, f"❌ 六合彩特码号码必须在1-49之间，当前号码：{number}"
 
     # 3. 金额验证
-    if amount <= 0:
+    if amount_cents <= 0:
         return False, "❌ 投注金额必须大于0"
 
-    # 4. 赔率配置验证（检查投注限额）
-    # 对于特码，需要根据游戏类型使用正确的 bet_type
-    query_bet_type = bet_type
-    if bet_type == 'tema':
-        query_bet_type = 'tema_lucky8' if game_type == 'lucky8' else 'tema_liuhecai'
+    # 4. 赔率配置验证（检查投注限额，限额来自数据库，在此转为 Decimal 比较）
+    query_bet_type = odds_bet_type(bet_type, game_type)
 
-    validation = await odds_service.validate_bet_amount(query_bet_type, amount, game_type)
+    validation = await odds_service.validate_bet_amount(query_bet_type, money.from_cents(amount_cents), game_type)
     if not validation['valid']:
         return False, f"❌ {validation['error']}"
 
@@ -636,13 +732,13 @@ def format_bet_summary(bets: List[Dict[str, Any]]) -> str:
     if not bets:
         return "未识别到有效投注"
 
-    total_amount = sum(bet['amount'] for bet in bets)
+    total_amount = money.format_cents(sum(bet['amount_cents'] for bet in bets))
 
     lines = [f"📝 共识别到 {len(bets)} 笔投注，总金额 {total_amount}"]
 
     for i, bet in enumerate(bets, 1):
         bet_type = format_bet_type(bet['type'])
-        amount = bet['amount']
+        amount = money.format_cents(bet['amount_cents'])
         odds = bet['odds']
 
         if bet['type'] == 'fan':
@@ -794,8 +890,7 @@ def settle_tema_bet(bet: Dict[str, Any], tema_number: int) -> Dict[str, Any]:
     Returns:
         Dict: 结算结果
     """
-    # 兼容两种字段名：bet_amount（数据库）和 amount（解析下注文本）
-    amount = bet.get('bet_amount') or bet.get('amount')
+    amount = get_bet_amount(bet)
 
     result = {
         **bet,
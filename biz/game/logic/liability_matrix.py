@@ -0,0 +1,151 @@
+"""
+实时盈亏矩阵
+按开奖的每一种可能结果汇总全部待结算投注的庄家盈亏（下注额 - 派彩）：
+- lucky8：4 个番数 × 20 个特码
+- liuhecai：49 个特码
+
+所有待结算投注都在下一次开奖时结算（不限期号），因此矩阵即下一期的盈亏分布。
+矩阵随 PendingBetBook 增量维护：每笔投注入账/结算/取消时计算它在各结果下的盈亏并累加/扣减
+（按 outcome_table 的结果编码以整数分计算，无法按分表示的投注走 game_logic.calculate_result），查询时不扫描投注
+"""
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from biz.bet.repo.pending_bet_book import get_pending_bet_book
+from biz.game.logic import game_logic, money, outcome_table
+
+logger = logging.getLogger(__name__)
+
+# 各游戏的结果维度：(番数列表, 特码范围)
+OUTCOMES = {
+    'lucky8': ([1, 2, 3, 4], 20),
+    'liuhecai': ([None], 49),
+}
+
+
+def _outcomes(game_type: str) -> List[Tuple[int, int]]:
+    """结果列表 [(draw_number, special_number)]，按行（番数）优先排列"""
+    fans, specials = OUTCOMES[game_type]
+    outcomes = []
+    for fan in fans:
+        for special in range(1, specials + 1):
+            # 六合彩的 draw_number 即特码
+            outcomes.append((fan if fan is not None else special, special))
+    return outcomes
+
+
+_OUTCOMES = {game_type: _outcomes(game_type) for game_type in OUTCOMES}
+
+
+class LiabilityMatrix:
+    """待结算投注盈亏矩阵（PendingBetBook 订阅者）"""
+
+    def __init__(self):
+        # 金额单位：分
+        self._totals: Dict[str, List[int]] = {}
+        self._counts: Dict[str, int] = {}
+        self._stakes: Dict[str, int] = {}
+        self.clear()
+
+    def clear(self):
+        for game_type, outcomes in _OUTCOMES.items():
+            self._totals[game_type] = [0] * len(outcomes)
+            self._counts[game_type] = 0
+            self._stakes[game_type] = 0
+
+    def _vector(self, bet: Dict[str, Any]) -> Optional[Tuple[str, List[int], int]]:
+        """单笔投注在各结果下的庄家盈亏（分）"""
+        game_type = bet.get('game_type') or 'lucky8'
+        outcomes = _OUTCOMES.get(game_type)
+        if outcomes is None:
+            return None
+        settle_bet = game_logic.bet_for_settlement(bet)
+        try:
+            cents = outcome_table.amounts_cents(settle_bet)
+            codes = None
+            if cents is not None:
+                if game_type == 'lucky8':
+                    codes = outcome_table.compile_signature(settle_bet)
+                else:
+                    codes = [outcome_table.liuhecai_code(settle_bet, special) for _, special in outcomes]
+                    if None in codes:
+                        codes = None
+            if codes is not None:
+                # 每个结果的庄家盈亏即对应编码的 -盈亏
+                pnl = [-profit for _, profit in cents]
+                vector = [pnl[code] for code in codes]
+            else:
+                vector = [
+                    -money.to_cents(game_logic.calculate_result(settle_bet, '', draw_number, special)[2])
+                    for draw_number, special in outcomes
+                ]
+        except Exception as e:
+            logger.warning(f"⚠️ 盈亏矩阵跳过无法计算的投注 {bet.get('id')}: {str(e)}")
+            return None
+        return game_type, vector, money.to_cents(bet['bet_amount'])
+
+    def _apply(self, bet: Dict[str, Any], sign: int):
+        computed = self._vector(bet)
+        if computed is None:
+            return
+        game_type, vector, stake = computed
+        totals = self._totals[game_type]
+        for i, pnl in enumerate(vector):
+            totals[i] += sign * pnl
+        self._counts[game_type] += sign
+        self._stakes[game_type] += sign * stake
+
+    def add_bet(self, bet: Dict[str, Any]):
+        self._apply(bet, 1)
+
+    def remove_bet(self, bet: Dict[str, Any]):
+        self._apply(bet, -1)
+
+    def snapshot(self, game_type: str) -> Dict[str, Any]:
+        """
+        当前盈亏矩阵
+
+        Returns:
+            Dict: matrix 为 [番数行][特码列] 的庄家盈亏（六合彩只有一行），
+                  worst/best 为庄家盈亏最低/最高的结果
+        """
+        fans, specials = OUTCOMES[game_type]
+        totals = self._totals[game_type]
+        matrix = [
+            [pnl / money.CENTS for pnl in totals[row * specials:(row + 1) * specials]]
+            for row in range(len(fans))
+        ]
+
+        def _outcome(index: int) -> Dict[str, Any]:
+            draw_number, special = _OUTCOMES[game_type][index]
+            return {
+                'fan': draw_number if fans[0] is not None else None,
+                'special': special,
+                'pnl': totals[index] / money.CENTS,
+            }
+
+        worst = min(range(len(totals)), key=lambda i: totals[i])
+        best = max(range(len(totals)), key=lambda i: totals[i])
+        return {
+            'gameType': game_type,
+            'pendingBets': self._counts[game_type],
+            'totalStake': self._stakes[game_type] / money.CENTS,
+            'fans': fans if fans[0] is not None else None,
+            'specials': list(range(1, specials + 1)),
+            'matrix': matrix,
+            'worst': _outcome(worst),
+            'best': _outcome(best),
+        }
+
+
+# 全局单例（首次获取时注册到待结算账本）
+_matrix: Optional[LiabilityMatrix] = None
+
+
+def get_liability_matrix() -> LiabilityMatrix:
+    """获取盈亏矩阵单例"""
+    global _matrix
+    if _matrix is None:
+        _matrix = LiabilityMatrix()
+        get_pending_bet_book().add_listener(_matrix)
+    return _matrix
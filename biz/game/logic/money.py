@@ -0,0 +1,84 @@
+"""
+定点整数金额
+下注解析 → 校验 → 下注入库 → 结算，以及盈亏矩阵、风险敞口等逐笔循环中，
+金额以整数“分”、赔率与回水比例以整数“基点”（万分之一）运算，只在数据库/接口边界与 Decimal 互转。
+
+舍入与 Decimal 路径一致：round(Decimal, 2) 为银行家舍入（ROUND_HALF_EVEN），
+本金 × 赔率 的结果为 分×基点，除以 10000 时同样按银行家舍入
+"""
+from decimal import ROUND_HALF_EVEN, Decimal
+from typing import Any, Optional
+
+CENTS = 100
+BASIS_POINTS = 10000
+
+
+def _decimal(value: Any) -> Decimal:
+    # 旧记录的 bet_details 经 JSON 往返后为 float，按字面值转换
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _exact(value: Any, scale: int) -> Optional[int]:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value * scale
+    scaled = _decimal(value) * scale
+    integral = scaled.to_integral_value()
+    return int(integral) if scaled == integral else None
+
+
+def exact_cents(value: Any) -> Optional[int]:
+    """金额转为分；超过两位小数（无法精确表示）时返回 None，调用方应回退到 Decimal 计算"""
+    return _exact(value, CENTS)
+
+
+def exact_basis_points(value: Any) -> Optional[int]:
+    """赔率转为基点；超过四位小数时返回 None"""
+    return _exact(value, BASIS_POINTS)
+
+
+def to_cents(value: Any) -> int:
+    """金额转为分（超过两位小数时按银行家舍入）"""
+    cents = exact_cents(value)
+    if cents is not None:
+        return cents
+    return int((_decimal(value) * CENTS).to_integral_value(ROUND_HALF_EVEN))
+
+
+def parse_cents(digits: str) -> int:
+    """下注指令中的整数金额（元）转为分"""
+    return int(digits) * CENTS
+
+
+def percent_basis_points(percent: Any) -> int:
+    """百分比（如回水配置 1.5 表示 1.5%）转为基点，换算与金额转分相同"""
+    return to_cents(percent)
+
+
+def from_cents(cents: int) -> Decimal:
+    """分转为两位小数的 Decimal（数据库/接口边界）"""
+    return Decimal(cents).scaleb(-2)
+
+
+def from_cents_bp(value: int) -> Decimal:
+    """分 × 基点 的乘积转为 Decimal，不舍入（如回水金额，数据库边界）"""
+    return Decimal(value).scaleb(-6)
+
+
+def format_cents(cents: int) -> str:
+    """金额文本：整数元不带小数（与按下注原文解析的金额显示一致）"""
+    yuan, remainder = divmod(cents, CENTS)
+    return str(yuan) if remainder == 0 else str(from_cents(cents))
+
+
+def div_half_even(numerator: int, denominator: int) -> int:
+    """整数除法，按银行家舍入"""
+    quotient, remainder = divmod(numerator, denominator)
+    twice = remainder * 2
+    if twice > denominator or (twice == denominator and quotient % 2 == 1):
+        quotient += 1
+    return quotient
+
+
+def payout_cents(amount_cents: int, odds_bp: int) -> int:
+    """派彩（本金 × 赔率），舍入到分"""
+    return div_half_even(amount_cents * odds_bp, BASIS_POINTS)
@@ -0,0 +1,133 @@
+"""
+澳洲幸运8 结算结果表
+幸运8 每笔投注的结果只取决于投注内容（类型+号码）与开奖的 (番数, 特码)：共 4 × 20 种结果。
+每种投注内容首次出现时用 game_logic.calculate_result 逐个结果编译一次，
+得到各结果下的 赢/和/输 编码，之后结算、盈亏矩阵都按下标查表，不再逐笔走 calculate_result 的分支判断
+
+结果下标：(番数 - 1) × 20 + (特码 - 1)，与盈亏矩阵的行列顺序一致
+六合彩只有特码玩法，结果编码直接比较投注号码与特码，金额同样按整数分计算
+"""
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from biz.game.logic import game_logic, money
+
+FANS = 4
+SPECIALS = 20
+OUTCOME_COUNT = FANS * SPECIALS
+
+# 结果编码：输（派彩0）/ 和（退本金）/ 赢（本金×赔率）
+LOSE, TIE, WIN = 0, 1, 2
+STATUS = {LOSE: 'lose', TIE: 'tie', WIN: 'win'}
+_CODES = {status: code for code, status in STATUS.items()}
+
+# 投注内容：(类型, 号码, 首位, 次位, 号码组合, 禁号)
+Signature = Tuple[Any, ...]
+
+# {投注内容: 各结果的编码}
+_tables: Dict[Signature, bytes] = {}
+
+
+def signature(bet: Dict[str, Any]) -> Signature:
+    """投注内容（game_logic.bet_for_settlement 的结果）"""
+    numbers = bet.get('numbers')
+    return (
+        bet.get('type'),
+        bet.get('number'),
+        bet.get('first'),
+        bet.get('second'),
+        tuple(numbers) if numbers else None,
+        bet.get('jin_number'),
+    )
+
+
+def outcome_index(draw_number: Any, special_number: Any) -> Optional[int]:
+    """开奖结果对应的下标；不在 4 × 20 范围内（如缺少特码）时返回 None"""
+    if not isinstance(draw_number, int) or not isinstance(special_number, int):
+        return None
+    if not (1 <= draw_number <= FANS and 1 <= special_number <= SPECIALS):
+        return None
+    return (draw_number - 1) * SPECIALS + (special_number - 1)
+
+
+def outcome(index: int) -> Tuple[int, int]:
+    """下标对应的 (番数, 特码)"""
+    return index // SPECIALS + 1, index % SPECIALS + 1
+
+
+def compile_signature(bet: Dict[str, Any]) -> bytes:
+    """投注内容在全部结果下的编码（按内容缓存，同一内容只编译一次）"""
+    sig = signature(bet)
+    table = _tables.get(sig)
+    if table is None:
+        probe = {
+            'type': bet.get('type'), 'number': bet.get('number'),
+            'first': bet.get('first'), 'second': bet.get('second'),
+            'numbers': list(sig[4]) if sig[4] else bet.get('numbers'),
+            'jin_number': bet.get('jin_number'),
+            'amount': Decimal('1'), 'odds': Decimal('2'),
+        }
+        table = bytes(
+            _CODES[game_logic.calculate_result(probe, '', fan, special)[0]]
+            for fan, special in map(outcome, range(OUTCOME_COUNT))
+        )
+        _tables[sig] = table
+    return table
+
+
+def amounts_cents(bet: Dict[str, Any]) -> Optional[List[Tuple[int, int]]]:
+    """
+    各编码对应的 (派彩, 盈亏)，单位为分，舍入与 calculate_result 一致
+
+    Returns:
+        List: 按 LOSE/TIE/WIN 下标排列；金额超过两位小数或赔率超过四位小数时返回 None
+    """
+    # 解析下注文本得到的投注已是整数分/基点，数据库记录在此转换
+    amount = bet.get('amount_cents')
+    if amount is None:
+        amount = money.exact_cents(bet.get('bet_amount') or bet.get('amount'))
+    odds = bet['odds_bp'] if 'odds_bp' in bet else money.exact_basis_points(bet['odds'])
+    if amount is None or odds is None:
+        return None
+    # calculate_result 对派彩与盈亏分别舍入（银行家舍入下 round(a×o - a) 不一定等于 round(a×o) - a）
+    win_payout = money.payout_cents(amount, odds)
+    win_profit = money.payout_cents(amount, odds - money.BASIS_POINTS)
+    return [(0, -amount), (amount, 0), (win_payout, win_profit)]
+
+
+def liuhecai_code(bet: Dict[str, Any], special_number: Any) -> Optional[int]:
+    """六合彩结果编码：只有特码玩法，投注号码为开奖特码则赢，否则输；无法判定时返回 None"""
+    if bet.get('type') != 'tema' or not isinstance(special_number, int) or special_number <= 0:
+        return None
+    return WIN if bet.get('number') == special_number else LOSE
+
+
+def settle(
+    bet: Dict[str, Any],
+    game_type: str,
+    draw_code: str,
+    draw_number: int,
+    special_number: Optional[int] = None
+) -> Tuple[str, Decimal, Decimal]:
+    """
+    计算单个下注的结算结果（返回值同 game_logic.calculate_result）
+
+    幸运8 且开奖结果在 4 × 20 范围内时查表、六合彩特码直接比较号码，并以整数分计算，金额在返回时转为 Decimal；
+    其余情况（缺少特码、金额无法按分表示）走 calculate_result
+    """
+    code = None
+    if game_type == 'lucky8':
+        index = outcome_index(draw_number, special_number)
+        if index is not None:
+            code = compile_signature(bet)[index]
+    elif game_type == 'liuhecai':
+        code = liuhecai_code(bet, special_number)
+    cents = amounts_cents(bet) if code is not None else None
+    if cents is None:
+        return game_logic.calculate_result(bet, draw_code, draw_number, special_number)
+    payout, profit = cents[code]
+    return STATUS[code], money.from_cents(payout), money.from_cents(profit)
+
+
+def get_stats() -> Dict[str, Any]:
+    return {"signatures": len(_tables)}
@@ -8,12 +8,54 @@
 """
 import asyncio
 import logging
+import os
 from typing import Dict, Set, Optional, Any
 from datetime import datetime
 
+from external.draw_api_client import get_draw_api_client
+from external.draw_providers import get_time_scale
+
 logger = logging.getLogger(__name__)
 
 
+def build_history_rows(game_type: str, draws: list) -> list:
+    """
+    将开奖API的记录转换为 draw_history 系统级记录（用于历史同步与回填）
+
+    Args:
+        game_type: 游戏类型
+        draws: DrawApiClient.get_recent_draws 返回的记录
+
+    Returns:
+        list: DrawRepository.upsert_many 的入参
+    """
+    rows = []
+    for item in draws:
+        issue = item.get('issue')
+        if not issue:
+            continue
+
+        # 优先使用上游开奖时间，回填时历史记录才能按时间正确排序
+        draw_time = None
+        if item.get('timestamp'):
+            try:
+                draw_time = datetime.strptime(str(item['timestamp']), '%Y-%m-%d %H:%M:%S')
+            except ValueError:
+                draw_time = None
+
+        rows.append({
+            'chat_id': 'system',
+            'game_type': game_type,
+            'issue': issue,
+            # lucky8: draw_number 是番数；liuhecai: draw_number 是特码
+            'draw_number': int(str(item.get('draw_number'))) if item.get('draw_number') is not None else None,
+            'draw_code': item.get('draw_code'),
+            'special_number': item.get('special_number'),
+            'draw_time': draw_time or datetime.now()
+        })
+    return rows
+
+
 class DrawScheduler:
     """
     自动开奖调度器
@@ -59,6 +101,9 @@ class DrawScheduler:
         # 群聊游戏类型映射
         self.chat_game_types: Dict[str, str] = {}
 
+        # 封盘后预结算（DRAW_PRESETTLE=false 关闭）
+        self.presettle_enabled = os.getenv('DRAW_PRESETTLE', 'true').lower() == 'true'
+
         # 历史开奖同步任务
         self._history_sync_task: Optional[asyncio.Task] = None
         self._history_sync_interval_minutes: int = 60
@@ -109,34 +154,14 @@ class DrawScheduler:
                     logger.warning(f"⚠️ 无{game_type}历史数据可同步")
                     continue
 
-                inserted = 0
-                for item in recent:
-                    issue = item.get('issue')
-                    if not issue:
-                        continue
-
-                    # 仅使用系统级别历史（避免为每个群重复写入）
-                    exists = await draw_repo.exists_issue(issue, game_type=game_type, chat_id='system')
-                    if exists:
-                        continue
-
-                    # 构造写入数据
-                    draw_data = {
-                        'chat_id': 'system',
-                        'game_type': game_type,
-                        'issue': issue,
-                        # lucky8: draw_number 是番数；liuhecai: draw_number 是特码
-                        'draw_number': int(str(item.get('draw_number'))) if item.get('draw_number') is not None else None,
-                        'draw_code': item.get('draw_code'),
-                        'special_number': item.get('special_number'),
-                        'draw_time': datetime.now()
-                    }
-
-                    try:
-                        await draw_repo.create(draw_data)
-                        inserted += 1
-                    except Exception as e:
-                        logger.warning(f"写入{game_type}历史失败(issue={issue}): {str(e)}")
+                # 最新一期已入库，说明没有新数据，跳过本次写入
+                newest_issue = recent[0].get('issue')
+                if newest_issue and await draw_repo.exists_issue(newest_issue, game_type=game_type, chat_id='system'):
+                    logger.info(f"📚 {game_type} 历史已是最新（期号 {newest_issue}），跳过同步")
+                    continue
+
+                # 仅使用系统级别历史（避免为每个群重复写入），已存在的期号由唯一键忽略
+                inserted = await draw_repo.upsert_many(build_history_rows(game_type, recent))
 
                 logger.info(f"📚 {game_type} 历史同步完成，本次新增 {inserted} 条")
 
@@ -155,9 +180,12 @@ class DrawScheduler:
             int: 间隔秒数
         """
         if game_type == 'liuhecai':
-            return 86400  # 24小时 = 86400秒
+            interval = 86400  # 24小时 = 86400秒
         else:  # lucky8
-            return 300  # 5分钟 = 300秒
+            interval = 300  # 5分钟 = 300秒
+
+        # 离线数据源加速回放时同步缩短开奖间隔（压测用，默认倍速为1）
+        return max(1, int(interval / get_time_scale()))
 
     def is_bet_locked(self, chat_id: str) -> bool:
         """
@@ -419,10 +447,49 @@ class DrawScheduler:
                 except Exception as error:
                     logger.error(f"  ❌ 发送锁定提示失败 {chat_id}: {str(error)}")
 
+            # 封盘后等待上游结果，到达即预结算（开奖时只需提交）
+            if self.presettle_enabled:
+                await self._pre_settle(game_type, registered_chats, timeout=60)
+
         except asyncio.CancelledError:
             logger.debug(f"锁定定时器已取消: {game_type}")
             raise
 
+    async def _pre_settle(self, game_type: str, registered_chats: list, timeout: float):
+        """
+        预结算：上游已出现未开过奖的新一期结果时，为已封盘的群聊提前计算结算并暂存
+
+        Args:
+            game_type: 游戏类型
+            registered_chats: 注册的群聊列表
+            timeout: 等待新结果的最长秒数（超过即到开奖时间，由开奖流程直接计算）
+        """
+        draw_client = get_draw_api_client()
+        served_issue = draw_client.get_served_issue(game_type)
+        if served_issue is None:
+            # 启动后尚未开过奖，无法判断最新结果是否属于本期
+            return
+
+        draw_result = draw_client.peek_new_result(game_type)
+        if draw_result is None:
+            if not await draw_client.wait_for_new_issue(game_type, served_issue, timeout):
+                return
+            draw_result = draw_client.peek_new_result(game_type)
+            if draw_result is None:
+                return
+
+        logger.info(f"⚡ {game_type} 第{draw_result['issue']}期结果已到达，开始预结算")
+        staged = 0
+        for chat_id in registered_chats:
+            if not self.is_bet_locked(chat_id) or self.chat_game_types.get(chat_id) != game_type:
+                continue
+            try:
+                await self.game_service.stage_settlement(chat_id, game_type, draw_result)
+                staged += 1
+            except Exception as error:
+                logger.error(f"  ❌ 群聊 {chat_id} 预结算失败: {str(error)}", exc_info=True)
+        logger.info(f"⚡ {game_type} 预结算完成: {staged}/{len(registered_chats)} 个群聊")
+
     def stop_global_game_timer(self, game_type: str):
         """
         停止按游戏类型的全局定时器
@@ -2,6 +2,7 @@
 游戏业务逻辑服务
 对应 bot-server.js 中的各个 handler 函数
 """
+import asyncio
 import logging
 from datetime import datetime, timedelta
 from decimal import Decimal
@@ -12,14 +13,20 @@ from biz.user.service.user_service import UserService
 from biz.user.repo.user_repo import UserRepository
 from biz.bet.repo.bet_repo import BetRepository
 from biz.chat.repo.chat_repo import ChatRepository
-from biz.draw.repo.draw_repo import DrawRepository
+from biz.draw.repo.draw_repo import RUN_CLAIMED, RUN_COMPUTED, RUN_FINISHED, DrawRepository
 from biz.odds.service.odds_service import OddsService
-from biz.game.logic import game_logic
+from biz.bet.repo.exposure_ledger import ExposureLedger, entry_for_new_bet
+from biz.bet.repo.pending_bet_book import get_pending_bet_book
+from biz.game.service.settlement_stage import get_settlement_stage
+from biz.game.logic import game_logic, money, outcome_table
 from external.bot_api_client import BotApiClient
 from external.draw_api_client import get_draw_api_client
 
 logger = logging.getLogger(__name__)
 
+# 正在本进程中推进的结算运行ID → 推进结束事件（开奖与启动恢复不会同时推进同一运行）
+_ADVANCING_RUNS: Dict[int, asyncio.Event] = {}
+
 
 class GameService:
     """游戏业务逻辑服务"""
@@ -33,6 +40,7 @@ class GameService:
         draw_repo: DrawRepository,
         odds_service: OddsService,
         bot_api_client: BotApiClient,
+        exposure_ledger: Optional[ExposureLedger] = None,
         **kwargs
     ):
         self.user_service = user_service
@@ -42,6 +50,7 @@ class GameService:
         self.draw_repo = draw_repo
         self.odds_service = odds_service
         self.bot_client = bot_api_client
+        self.exposure_ledger = exposure_ledger or get_pending_bet_book().exposure
 
     async def handle_bet_message(
         self,
@@ -119,119 +128,43 @@ class GameService:
                 )
                 return
 
-            # 计算总金额
-            total_amount = sum(bet['amount'] for bet in valid_bets)
-
-            # 检查用户余额
-            user = await self.user_repo.get_user_in_chat(sender_id, chat_id)
-            if not user:
-                # 创建用户
-                user = await self.user_service.get_or_create_user(
-                    user_id=sender_id,
-                    username=sender_name,
-                    chat_id=chat_id,
-                    balance=Decimal('1000')
-                )
-
-            if user['balance'] < total_amount:
-                await self.bot_client.send_message(
-                    chat_id,
-                    f"@{sender_name} ❌ 下注失败: 余额不足（当前余额: {user['balance']:.2f}，需要: {total_amount:.2f}）"
-                )
-                return
-
-            # 扣除余额
-            updated_user = await self.user_repo.subtract_balance(sender_id, chat_id, total_amount)
-            if updated_user is None:
-                await self.bot_client.send_message(
-                    chat_id,
-                    f"@{sender_name} ❌ 下注失败: 余额扣除失败"
-                )
-                return
-
-            # 获取新余额
-            new_balance = updated_user['balance']
+            # 计算总金额（分）
+            total_cents = sum(bet['amount_cents'] for bet in valid_bets)
 
             # 🔥 CRITICAL: 获取当前期号用于显示
             # 从第三方API获取最新期号，用于下注确认消息
             # 但结算时会结算所有pending的投注（不限期号）
+            # 只读取最新期号：不能等待新期号或标记期号已开奖，否则会抢占开奖流程
             try:
-                draw_result = await self._fetch_draw_result(game_type)
-                current_issue = draw_result.get('issue', 'unknown') if draw_result else 'unknown'
+                current_issue = await get_draw_api_client().peek_latest_issue(game_type) or 'unknown'
             except Exception as e:
                 logger.warning(f"⚠️ 获取期号失败，使用占位符: {str(e)}")
                 current_issue = "待开奖"
 
-            # 计算回水比例（优先级：用户单独配置 > 游戏配置 > 无退水）
-            rebate_ratio = Decimal('0.00')
-
-            # 1. 最高优先级：用户单独配置（earn_rebate > 0）
-            if user.get('earn_rebate') and Decimal(str(user.get('earn_rebate'))) > 0:
-                rebate_ratio = Decimal(str(user.get('earn_rebate'))) / Decimal('100')
-                logger.info(f"📊 使用用户退水配置: {float(rebate_ratio * 100):.2f}%")
-            # 2. 次优先级：游戏级别配置
-            elif user.get('rebate_game_settings'):
-                game_settings = user.get('rebate_game_settings', [])
-                game_name_map = {
-                    'lucky8': '168澳洲幸运8',
-                    'liuhecai': '新奥六合彩'
-                }
-                current_game_name = game_name_map.get(game_type, '168澳洲幸运8')
-
-                for setting in game_settings:
-                    if setting.get('gameName') == current_game_name:
-                        rebate_ratio = Decimal(str(setting.get('rebate', 0))) / Decimal('100')
-                        logger.info(f"📊 使用游戏退水配置: {current_game_name} = {float(rebate_ratio * 100):.2f}%")
-                        break
-
-            # 3. 默认：无退水
-            if rebate_ratio == Decimal('0.00'):
-                logger.info(f"📊 未配置退水，退水金额为0")
-
-            total_rebate = Decimal('0.00')
-
-            # 保存下注记录
-            bet_ids = []
-            for bet in valid_bets:
-                bet_amount = bet['amount']
-                bet_rebate = bet_amount * rebate_ratio
-                total_rebate += bet_rebate
-
-                bet_record = await self.bet_repo.create({
-                    'user_id': sender_id,
-                    'chat_id': chat_id,
-                    'game_type': game_type,
-                    'bet_type': bet['type'],
-                    'amount': bet_amount,
-                    'valid_amount': bet_amount,
-                    'rebate': bet_rebate,
-                    'odds': bet['odds'],
-                    'status': 'pending',
-                    'draw_issue': current_issue,
-                    'bet_details': bet
-                })
-                bet_ids.append(bet_record['id'])
-
-            # 立即发放回水到用户余额
-            if total_rebate > 0:
-                await self.user_repo.add_balance(sender_id, chat_id, total_rebate)
-                logger.info(f"💰 发放回水: 用户={sender_name}, 金额={float(total_rebate):.2f}")
-
-            # 生成确认消息
-            response = f"📝 下注成功！\n\n"
-            response += game_logic.format_bet_summary(valid_bets)
-            response += f"\n\n总金额: {float(total_amount):.2f}元"
-            if total_rebate > 0:
-                response += f"\n回水: {float(total_rebate):.2f}元 ({float(rebate_ratio * 100):.2f}%)"
-                final_balance = new_balance + total_rebate
-                response += f"\n余额: {float(final_balance):.2f}"
-            else:
-                response += f"\n余额: {float(new_balance):.2f}"
-            response += f"\n期号: {current_issue}"
-
-            await self.bot_client.send_message(chat_id, response)
+            # 单期限额（period_max）：校验并预占敞口，入库后释放预占
+            exposure_entries = [entry_for_new_bet(game_type, current_issue, bet) for bet in valid_bets]
+            period_limits = await self._get_period_limits(game_type, {bet['type'] for bet in valid_bets})
+            # 账本未就绪（加载中或加载失败）时已入库部分从数据库汇总
+            committed = None
+            if period_limits:
+                committed = await self.bet_repo.get_pending_exposure(current_issue, sorted(period_limits))
+            over_limit = self.exposure_ledger.reserve(exposure_entries, period_limits, committed)
+            if over_limit:
+                await self.bot_client.send_message(
+                    chat_id,
+                    f"@{sender_name} ❌ 下注失败: {game_logic.format_bet_type(over_limit[2])}"
+                    f"{over_limit[3]} 已超过单期限额 {period_limits[over_limit[2]]}"
+                )
+                return
 
-            logger.info(f"✅ 下注成功: 用户={sender_name}, 期号={current_issue}, 注单数={len(bet_ids)}")
+            try:
+                await self._place_bets(
+                    chat_id, game_type, sender_id, sender_name, valid_bets,
+                    total_cents, current_issue, exposure_entries
+                )
+            finally:
+                # 未入库的投注（余额不足、扣款失败、异常）释放预占
+                self.exposure_ledger.release(exposure_entries)
 
         except Exception as e:
             logger.error(f"❌ 处理下注失败: {str(e)}", exc_info=True)
@@ -240,6 +173,139 @@ class GameService:
                 f"@{sender.get('name')} ❌ 下注失败: 系统错误"
             )
 
+    async def _get_period_limits(self, game_type: str, bet_types) -> Dict[str, Decimal]:
+        """各下注类型的单期最大投注额 {bet_type: period_max}"""
+        limits = {}
+        for bet_type in bet_types:
+            odds_config = await self.odds_service.get_odds(game_logic.odds_bet_type(bet_type, game_type), game_type)
+            if odds_config and odds_config.get('period_max') is not None:
+                limits[bet_type] = Decimal(str(odds_config['period_max']))
+        return limits
+
+    async def _place_bets(
+        self,
+        chat_id: str,
+        game_type: str,
+        sender_id: str,
+        sender_name: str,
+        valid_bets: List[Dict[str, Any]],
+        total_cents: int,
+        current_issue: str,
+        exposure_entries: List
+    ) -> None:
+        """
+        扣款并保存下注记录
+
+        金额以整数分、回水比例以基点计算，只在读写用户余额/注单时与 Decimal 互转；
+        exposure_entries 为已预占的敞口条目（与 valid_bets 一一对应），每笔入库后从列表中移除并释放，
+        调用方在 finally 中释放剩余条目
+        """
+        # 检查用户余额
+        user = await self.user_repo.get_user_in_chat(sender_id, chat_id)
+        if not user:
+            # 创建用户
+            user = await self.user_service.get_or_create_user(
+                user_id=sender_id,
+                username=sender_name,
+                chat_id=chat_id,
+                balance=Decimal('1000')
+            )
+
+        total_amount = money.from_cents(total_cents)
+        if money.to_cents(user['balance']) < total_cents:
+            await self.bot_client.send_message(
+                chat_id,
+                f"@{sender_name} ❌ 下注失败: 余额不足（当前余额: {user['balance']:.2f}，需要: {total_amount:.2f}）"
+            )
+            return
+
+        # 扣除余额
+        updated_user = await self.user_repo.subtract_balance(sender_id, chat_id, total_amount)
+        if updated_user is None:
+            await self.bot_client.send_message(
+                chat_id,
+                f"@{sender_name} ❌ 下注失败: 余额扣除失败"
+            )
+            return
+
+        # 获取新余额
+        new_balance = updated_user['balance']
+
+        # 计算回水比例（基点，优先级：用户单独配置 > 游戏配置 > 无退水）
+        rebate_bp = 0
+
+        # 1. 最高优先级：用户单独配置（earn_rebate > 0）
+        if user.get('earn_rebate') and money.percent_basis_points(user.get('earn_rebate')) > 0:
+            rebate_bp = money.percent_basis_points(user.get('earn_rebate'))
+            logger.info(f"📊 使用用户退水配置: {rebate_bp / 100:.2f}%")
+        # 2. 次优先级：游戏级别配置
+        elif user.get('rebate_game_settings'):
+            game_settings = user.get('rebate_game_settings', [])
+            game_name_map = {
+                'lucky8': '168澳洲幸运8',
+                'liuhecai': '新奥六合彩'
+            }
+            current_game_name = game_name_map.get(game_type, '168澳洲幸运8')
+
+            for setting in game_settings:
+                if setting.get('gameName') == current_game_name:
+                    rebate_bp = money.percent_basis_points(setting.get('rebate', 0))
+                    logger.info(f"📊 使用游戏退水配置: {current_game_name} = {rebate_bp / 100:.2f}%")
+                    break
+
+        # 3. 默认：无退水
+        if rebate_bp == 0:
+            logger.info(f"📊 未配置退水，退水金额为0")
+
+        # 回水金额单位为 分×基点，不舍入，写库时转为 Decimal
+        total_rebate_units = 0
+
+        # 保存下注记录
+        bet_ids = []
+        for bet in valid_bets:
+            bet_amount = money.from_cents(bet['amount_cents'])
+            bet_rebate_units = bet['amount_cents'] * rebate_bp
+            total_rebate_units += bet_rebate_units
+
+            bet_record = await self.bet_repo.create({
+                'user_id': sender_id,
+                'chat_id': chat_id,
+                'game_type': game_type,
+                'bet_type': bet['type'],
+                'amount': bet_amount,
+                'valid_amount': bet_amount,
+                'rebate': money.from_cents_bp(bet_rebate_units),
+                'odds': bet['odds'],
+                'status': 'pending',
+                'draw_issue': current_issue,
+                'bet_details': bet
+            })
+            bet_ids.append(bet_record['id'])
+            # 已计入账本敞口，释放该笔预占（与入库之间没有 await）
+            self.exposure_ledger.release([exposure_entries.pop(0)])
+
+        # 立即发放回水到用户余额
+        total_rebate = money.from_cents_bp(total_rebate_units)
+        if total_rebate_units > 0:
+            await self.user_repo.add_balance(sender_id, chat_id, total_rebate)
+            logger.info(f"💰 发放回水: 用户={sender_name}, 金额={float(total_rebate):.2f}")
+
+        # 生成确认消息
+        response = f"📝 下注成功！\n\n"
+        response += game_logic.format_bet_summary(valid_bets)
+        response += f"\n\n总金额: {float(total_amount):.2f}元"
+        if total_rebate_units > 0:
+            response += f"\n回水: {float(total_rebate):.2f}元 ({rebate_bp / 100:.2f}%)"
+            final_balance = new_balance + total_rebate
+            response += f"\n余额: {float(final_balance):.2f}"
+        else:
+            response += f"\n余额: {float(new_balance):.2f}"
+        response += f"\n期号: {current_issue}"
+
+        await self.bot_client.send_message(chat_id, response)
+
+        logger.info(f"✅ 下注成功: 用户={sender_name}, 期号={current_issue}, 注单数={len(bet_ids)}")
+
     async def handle_query_balance(
         self,
         chat_id: str,
@@ -389,28 +455,15 @@ class GameService:
 
             # 🔥 CRITICAL: 取消用户所有pending的下注（不限期号）
             # 对应 Node.js: session.pendingBets.filter(b => b.playerId === senderId)
-            pending_bets = await self.bet_repo.get_user_all_pending_bets(
-                user_id=sender_id,
-                chat_id=chat_id
-            )
-
-            if not pending_bets:
+            # 取消与退款在同一事务中完成，只按实际取消的注单退款，避免与开奖结算并发时重复退还
+            refund_amount = await self.bet_repo.cancel_pending_for_user(sender_id, chat_id)
+            if not refund_amount:
                 await self.bot_client.send_message(
                     chat_id,
                     f"@{sender_name}\n当前没有下注"
                 )
                 return
 
-            # 计算退还金额
-            refund_amount = sum(bet['bet_amount'] for bet in pending_bets)
-
-            # 退还余额
-            await self.user_repo.add_balance(sender_id, chat_id, refund_amount)
-
-            # 取消所有下注
-            for bet in pending_bets:
-                await self.bet_repo.cancel_bet(bet['id'])
-
             # 对应 Node.js: "@sender.name\n取消成功"
             response = f"@{sender_name}\n取消成功"
 
@@ -448,6 +501,19 @@ class GameService:
 
             game_type = chat.get('game_type', 'lucky8') if isinstance(chat, dict) else chat.game_type
 
+            # 先完成本群遗留的未完成结算（进程中途退出），避免其注单被结算到本期
+            waited = False
+            for unfinished in await self.draw_repo.get_unfinished_runs(chat_id):
+                if await self._wait_for_run(unfinished['id']):
+                    waited = True
+                    continue
+                await self._advance_settlement_run(unfinished)
+
+            # 等待的运行由启动恢复推进，推进失败时不开新一期，注单留待下次开奖
+            if waited and await self.draw_repo.get_unfinished_runs(chat_id):
+                logger.error(f"❌ 遗留结算未完成，跳过本次开奖: 群={chat_id}")
+                return
+
             # 获取开奖号码（从第三方API）
             draw_result = await self._fetch_draw_result(game_type)
             if not draw_result:
@@ -455,222 +521,298 @@ class GameService:
                 await self.bot_client.send_message(chat_id, "❌ 开奖失败: 无法获取开奖号码")
                 return
 
-            draw_number = draw_result['draw_number']
-            draw_code = draw_result['draw_code']
-            special_number = draw_result.get('special_number')
-
             # 🔥 CRITICAL: 使用第三方API返回的期号，而不是自己生成
             # 对应 Node.js: drawInfo.issue (来自 latestLucky8Draw.preDrawIssue)
             issue = draw_result.get('issue', 'unknown')
 
             # 添加调试日志
-            logger.info(f"🎲 开奖数据: game_type={game_type}, draw_number={draw_number}, special_number={special_number}, draw_code={draw_code}")
+            logger.info(f"🎲 开奖数据: game_type={game_type}, draw_number={draw_result['draw_number']}, special_number={draw_result.get('special_number')}, draw_code={draw_result['draw_code']}")
 
-            # 计算大小单双（仅用于幸运8）- 对应 bot-server.js line 595-601
-            size_type = ''
-            parity_type = ''
-            if special_number and game_type == 'lucky8':
-                size_type = '大' if special_number > 24 else '小'
-                parity_type = '单' if special_number % 2 == 1 else '双'
+            # 认领本群本期的结算运行；同一期已结算过（上游尚未出新一期）时不再结算，注单留到下一期
+            run = await self.draw_repo.claim_settlement_run(chat_id, game_type, {**draw_result, 'issue': issue})
+            if run['status'] in RUN_FINISHED:
+                logger.warning(f"⚠️ 第{issue}期已结算，跳过: 群={chat_id}")
+                await self.bot_client.send_message(chat_id, f"第{issue}期已开奖，等待下一期开奖结果")
+                return
 
-            # 保存开奖记录
-            await self.draw_repo.create({
-                'chat_id': chat_id,
-                'game_type': game_type,
-                'issue': issue,
-                'draw_number': draw_number,
-                'draw_code': draw_code,
-                'special_number': special_number,
-                'draw_time': datetime.now()
-            })
+            await self._advance_settlement_run(run)
 
-            # 获取所有pending的投注
-            # 🔥 CRITICAL: 结算所有pending的投注（不管期号），与Node.js逻辑一致
-            # Node.js使用 session.pendingBets（不限期号）
-            pending_bets = await self.bet_repo.get_all_pending_bets(chat_id)
+        except Exception as e:
+            logger.error(f"❌ 开奖失败: {str(e)}", exc_info=True)
+            await self.bot_client.send_message(chat_id, "❌ 开奖失败: 系统错误")
 
-            # 结算所有投注 - 对应 bot-server.js line 604-658
-            results = []
-            if pending_bets:
-                for bet in pending_bets:
-                    # 解析 bet_details（如果是 JSON 字符串）
-                    import json
-                    bet_details = bet.get('bet_details')
-                    if bet_details and isinstance(bet_details, str):
-                        try:
-                            bet_details = json.loads(bet_details)
-                        except:
-                            bet_details = None
-
-                    # 如果没有 bet_details，使用 bet 本身，并映射字段
-                    if not bet_details:
-                        # 将数据库字段映射为 calculate_result 期望的字段
-                        bet_details = {
-                            'type': bet.get('lottery_type'),
-                            'bet_amount': bet.get('bet_amount'),  # 使用 bet_amount
-                            'odds': bet.get('odds'),
-                            'number': bet.get('bet_number')
-                        }
-
-                    # 计算结果
-                    status, payout, profit = game_logic.calculate_result(
-                        bet=bet_details,
-                        draw_code=draw_code,
-                        draw_number=draw_number,
-                        special_number=special_number
-                    )
-
-                    # 更新投注记录（包括期号）
-                    await self.bet_repo.settle_bet(
-                        bet_id=bet['id'],
-                        result=status,
-                        pnl=profit,
-                        draw_number=draw_number,
-                        draw_code=draw_code,
-                        issue=issue  # 更新为实际的期号
-                    )
-
-                    # 更新用户余额
-                    if payout > 0:
-                        await self.user_repo.add_balance(bet['user_id'], chat_id, payout)
-
-                    # 获取用户信息
-                    user = await self.user_repo.get_user_in_chat(bet['user_id'], chat_id)
-
-                    # 保存结果信息（用于后续消息生成）
-                    bet_type = bet_details.get('type') or bet_details.get('bet_type') or bet.get('lottery_type') or bet.get('bet_type')
-                    amount = bet.get('bet_amount') or bet.get('amount', 0)
-
-                    results.append({
-                        'playerId': bet['user_id'],
-                        'playerName': user['username'],
-                        'type': bet_type,
-                        'number': bet_details.get('number'),
-                        'first': bet_details.get('first'),
-                        'second': bet_details.get('second'),
-                        'numbers': bet_details.get('numbers'),
-                        'jinNumber': bet_details.get('jinNumber'),
-                        'amount': float(amount),
-                        'status': status,
-                        'profit': float(profit)
-                    })
-
-            # ==================== 消息1: 开奖信息 ====================
-            # 对应 bot-server.js line 660-673
-            from biz.game.templates.message_templates import GameMessageTemplates
-            game_name = GameMessageTemplates.get_game_name(game_type)
-            message = f"{game_name}\n\n第{issue}期\n\n开奖号码：\n{draw_code}\n\n"
-
-            if special_number:
-                message += f"开奖结果：{str(special_number).zfill(2)}({draw_number}){size_type}{parity_type}"
-            else:
-                if game_type == 'liuhecai':
-                    message += f"开奖结果：{draw_number}特"
-                else:
-                    message += f"开奖结果：{draw_number}番"
-
-            await self.bot_client.send_message(chat_id, message)
-
-            # ==================== 消息2: 中奖名单 ====================
-            # 对应 bot-server.js line 676-718
-            winning_list_message = f"{issue}期中奖名单"
-
-            if results:
-                has_winners = False
-
-                # 按玩家分组
-                player_results = {}
-                for result in results:
-                    player_name = result['playerName']
-                    if player_name not in player_results:
-                        player_results[player_name] = []
-                    player_results[player_name].append(result)
-
-                # 为每个玩家的每个获胜下注单独成行
-                for player_name, player_bets in player_results.items():
-                    for result in player_bets:
-                        if result['status'] == 'win':
-                            # 格式化下注描述
-                            bet_desc = self._format_bet_description(result)
-                            winning_list_message += f"\n@{player_name} {bet_desc}{result['amount']:.0f}={result['profit']:.2f}"
-                            has_winners = True
-
-                # 如果没有中奖者
-                if not has_winners:
-                    winning_list_message += '\n\n本期无中奖用户'
-
-            await self.bot_client.send_message(chat_id, winning_list_message)
-
-            # ==================== 消息3: 开奖图片 ====================
-            # 对应 bot-server.js line 720-768
+    async def recover_settlement_runs(self) -> int:
+        """
+        启动恢复：继续全部未完成的结算运行（进程在开奖中途退出时遗留）
+
+        Returns:
+            int: 完成的运行数量
+        """
+        recovered = 0
+        for run in await self.draw_repo.get_unfinished_runs():
             try:
-                # 获取历史开奖记录用于生成图片（按游戏类型筛选）
-                draw_history = await self.draw_repo.get_recent_draws(chat_id, limit=15, game_type=game_type)
+                if await self._advance_settlement_run(run):
+                    recovered += 1
+            except Exception as e:
+                logger.error(f"❌ 恢复结算失败: 群={run['chat_id']}, 期号={run['issue']}: {str(e)}", exc_info=True)
+        return recovered
 
-                if draw_history:
-                    from utils import get_draw_image_generator
-                    import os
+    async def _wait_for_run(self, run_id: int) -> bool:
+        """
+        等待本进程中正在推进的结算运行结束
 
-                    image_generator = get_draw_image_generator()
-                    image_path = image_generator.generate_image(game_type, draw_history)
+        Returns:
+            bool: 运行是否正在推进（已等待其结束）
+        """
+        event = _ADVANCING_RUNS.get(run_id)
+        if event is None:
+            return False
+        await event.wait()
+        return True
 
-                    if image_path:
-                        filename = os.path.basename(image_path)
-                        # 对应 Node.js: publicUrl = `/uploads/${filename}`
-                        public_url = f"/uploads/{filename}"
+    async def _advance_settlement_run(self, run: Dict[str, Any]) -> bool:
+        """
+        从当前状态推进一次结算运行直至 announced，每一步完成后写入检查点：
+        - claimed：写入开奖记录，计算全部待结算注单并记录注单ID → computed
+        - computed：在同一事务中结算注单、派彩入账 → committed
+        - committed：发送开奖消息 → announced
 
-                        # 对应 Node.js: buildImageUrl(result.publicUrl)
-                        image_host = os.getenv('IMAGE_HOST', 'myrepdemo.top')
-                        image_port = os.getenv('IMAGE_PORT', '65035')
-                        full_url = f"http://{image_host}:{image_port}{public_url}"
+        进程中途退出后从最后一个检查点继续：已记录的注单只按记录的开奖号码结算一次，
+        播报阶段退出时开奖消息可能重复发送
 
-                        await self.bot_client.send_image(chat_id, full_url, filename=filename)
-                        logger.info(f"✅ 已发送开奖图片: {full_url}")
-            except Exception as e:
-                logger.error(f"⚠️ 发送开奖图片失败: {str(e)}")
-
-            # ==================== 消息4: 历史宝路 (仅澳洲幸运8) ====================
-            # 对应 bot-server.js line 772-779
-            if game_type == 'lucky8':
-                try:
-                    # 获取最近30期开奖记录
-                    from external.draw_api_client import get_draw_api_client
-                    draw_client = get_draw_api_client()
-                    recent_draws = await draw_client.get_recent_draws(game_type, limit=30)
-
-                    if recent_draws:
-                        # 反向排列，最新的在前
-                        baolu_results = '-'.join([str(d['draw_number']) for d in reversed(recent_draws)])
-                        baolu_message = f"历史宝路\n{baolu_results}"
-                        await self.bot_client.send_message(chat_id, baolu_message)
-                        logger.info(f"✅ 已发送历史宝路")
-                except Exception as e:
-                    logger.error(f"⚠️ 发送历史宝路失败: {str(e)}")
-
-            # ==================== 消息5: 积分名单 ====================
-            # 对应 bot-server.js line 782-792
-            try:
-                # 获取群内所有用户
-                all_users = await self.user_repo.get_chat_users(chat_id)
+        Returns:
+            bool: 是否由本次调用完成（运行正在本进程中推进或已被其他流程推进时返回 False）
+        """
+        run_id = run['id']
+        if run_id in _ADVANCING_RUNS:
+            return False
+        _ADVANCING_RUNS[run_id] = asyncio.Event()
+
+        chat_id = run['chat_id']
+        game_type = run['game_type']
+        issue = run['issue']
+        draw_result = {
+            'issue': issue,
+            'draw_number': run['draw_number'],
+            'draw_code': run['draw_code'],
+            'special_number': run['special_number'],
+        }
+        status = run['status']
+        image_task = None
+        try:
+            settlement = None
+            if status == RUN_CLAIMED:
+                # 保存开奖记录（同一期已存在时沿用）
+                await self.draw_repo.create({
+                    **draw_result,
+                    'chat_id': chat_id,
+                    'game_type': game_type,
+                    'draw_time': datetime.now()
+                })
 
-                # 按余额降序排列
-                all_users.sort(key=lambda u: u['balance'], reverse=True)
+                # 开奖记录已写入，历史图片在渲染工作池中生成，与下面的结算、消息1/2并行
+                image_task = asyncio.create_task(self._render_draw_history_image(chat_id, game_type))
+
+                # 🔥 CRITICAL: 结算所有pending的投注（不管期号），与Node.js逻辑一致
+                # Node.js使用 session.pendingBets（不限期号）
+                pending_bets = await self.bet_repo.get_all_pending_bets(chat_id)
+
+                # 结算所有投注 - 对应 bot-server.js line 604-658
+                # 封盘后已按本期结果预结算时直接使用暂存结果
+                settlement = await self._prepare_settlement(chat_id, game_type, draw_result, pending_bets)
+                if not await self.draw_repo.mark_run_computed(run_id, list(settlement['bet_ids'])):
+                    return False
+                status = RUN_COMPUTED
+            elif status == RUN_COMPUTED:
+                # 恢复：只结算计算时记录的注单中仍未结算的部分
+                bets = await self.bet_repo.get_bets_by_ids(run['bet_ids'] or [])
+                pending_bets = [bet for bet in bets if bet.get('result') == 'pending']
+                settlement = await self._compute_settlement(chat_id, game_type, draw_result, pending_bets)
+
+            if status == RUN_COMPUTED:
+                # 注单、余额与运行状态在同一事务中更新
+                settled_ids = await self.bet_repo.commit_settlement(
+                    chat_id, issue, draw_result['draw_number'], draw_result['draw_code'],
+                    settlement['settlements'], run_id=run_id
+                )
+                if settled_ids is None:
+                    return False
+                settled = set(settled_ids)
+                results = [result for result in settlement['results'] if result['betId'] in settled]
+            else:
+                # 恢复：已入账未播报，按注单记录重建中奖名单
+                results = await self._settled_results(chat_id, run['bet_ids'] or [])
+
+            if image_task is None:
+                image_task = asyncio.create_task(self._render_draw_history_image(chat_id, game_type))
+            await self._announce_draw(chat_id, game_type, draw_result, results, image_task)
+            await self.draw_repo.mark_run_announced(run_id)
+            return True
+        except BaseException:
+            if image_task and not image_task.done():
+                image_task.cancel()
+            raise
+        finally:
+            _ADVANCING_RUNS.pop(run_id).set()
+
+    async def _settled_results(self, chat_id: str, bet_ids: List[str]) -> List[Dict[str, Any]]:
+        """按已结算注单记录重建中奖名单数据"""
+        results = []
+        users = {}
+        for bet in await self.bet_repo.get_bets_by_ids(bet_ids):
+            if bet.get('result') in ('pending', 'cancelled'):
+                continue
+            if bet['user_id'] not in users:
+                users[bet['user_id']] = await self.user_repo.get_user_in_chat(bet['user_id'], chat_id)
+            results.append(self._settlement_result(
+                bet, game_logic.bet_for_settlement(bet), bet['result'], bet.get('pnl') or 0, users[bet['user_id']]
+            ))
+        return results
+
+    async def _announce_draw(
+        self,
+        chat_id: str,
+        game_type: str,
+        draw_result: Dict[str, Any],
+        results: List[Dict[str, Any]],
+        image_task: asyncio.Task
+    ) -> None:
+        """
+        发送开奖消息（开奖信息、中奖名单、开奖图片、历史宝路、积分名单、下注速查指南）
 
-                score_message = f"{game_name}\n\n第{issue}期积分名单\n\n上下分请联系财务\n\n======积分排行======\n\n🔥玩家 💰积分\n\n"
+        Args:
+            chat_id: 群聊ID
+            game_type: 游戏类型
+            draw_result: 开奖结果
+            results: 本期结算结果（中奖名单数据）
+            image_task: 开奖历史图片渲染任务
+        """
+        issue = draw_result['issue']
+        draw_number = draw_result['draw_number']
+        draw_code = draw_result['draw_code']
+        special_number = draw_result.get('special_number')
+
+        # 计算大小单双（仅用于幸运8）- 对应 bot-server.js line 595-601
+        size_type = ''
+        parity_type = ''
+        if special_number and game_type == 'lucky8':
+            size_type = '大' if special_number > 24 else '小'
+            parity_type = '单' if special_number % 2 == 1 else '双'
+
+        # ==================== 消息1: 开奖信息 ====================
+        # 对应 bot-server.js line 660-673
+        from biz.game.templates.message_templates import GameMessageTemplates
+        game_name = GameMessageTemplates.get_game_name(game_type)
+        message = f"{game_name}\n\n第{issue}期\n\n开奖号码：\n{draw_code}\n\n"
+
+        if special_number:
+            message += f"开奖结果：{str(special_number).zfill(2)}({draw_number}){size_type}{parity_type}"
+        else:
+            if game_type == 'liuhecai':
+                message += f"开奖结果：{draw_number}特"
+            else:
+                message += f"开奖结果：{draw_number}番"
+
+        await self.bot_client.send_message(chat_id, message)
+
+        # ==================== 消息2: 中奖名单 ====================
+        # 对应 bot-server.js line 676-718
+        winning_list_message = f"{issue}期中奖名单"
+
+        if results:
+            has_winners = False
+
+            # 按玩家分组
+            player_results = {}
+            for result in results:
+                player_name = result['playerName']
+                if player_name not in player_results:
+                    player_results[player_name] = []
+                player_results[player_name].append(result)
+
+            # 为每个玩家的每个获胜下注单独成行
+            for player_name, player_bets in player_results.items():
+                for result in player_bets:
+                    if result['status'] == 'win':
+                        # 格式化下注描述
+                        bet_desc = self._format_bet_description(result)
+                        winning_list_message += f"\n@{player_name} {bet_desc}{result['amount']:.0f}={result['profit']:.2f}"
+                        has_winners = True
+
+            # 如果没有中奖者
+            if not has_winners:
+                winning_list_message += '\n\n本期无中奖用户'
+
+        await self.bot_client.send_message(chat_id, winning_list_message)
+
+        # ==================== 消息3: 开奖图片 ====================
+        # 对应 bot-server.js line 720-768
+        try:
+            # 等待开奖前已提交的渲染任务完成后发送
+            image_path = await image_task
 
-                for user in all_users:
-                    score_message += f"{user['username']}:{user['balance']:.2f}\n"
+            if image_path:
+                import os
+
+                from utils import get_draw_image_generator, get_upload_storage
+
+                filename = os.path.basename(image_path)
+                # 对应 Node.js: publicUrl = `/uploads/${filename}`（图片按哈希分目录存放）
+                storage = get_upload_storage(get_draw_image_generator().uploads_dir)
+                public_url = f"/uploads/{storage.public_path(image_path)}"
 
-                await self.bot_client.send_message(chat_id, score_message)
-                logger.info(f"✅ 已发送积分名单")
+                # 对应 Node.js: buildImageUrl(result.publicUrl)
+                image_host = os.getenv('IMAGE_HOST', 'myrepdemo.top')
+                image_port = os.getenv('IMAGE_PORT', '65035')
+                full_url = f"http://{image_host}:{image_port}{public_url}"
+
+                await self.bot_client.send_image(chat_id, full_url, filename=filename)
+                logger.info(f"✅ 已发送开奖图片: {full_url}")
+        except Exception as e:
+            logger.error(f"⚠️ 发送开奖图片失败: {str(e)}")
+
+        # ==================== 消息4: 历史宝路 (仅澳洲幸运8) ====================
+        # 对应 bot-server.js line 772-779
+        if game_type == 'lucky8':
+            try:
+                # 获取最近30期开奖记录
+                from external.draw_api_client import get_draw_api_client
+                draw_client = get_draw_api_client()
+                recent_draws = await draw_client.get_recent_draws(game_type, limit=30)
+
+                if recent_draws:
+                    # 反向排列，最新的在前
+                    baolu_results = '-'.join([str(d['draw_number']) for d in reversed(recent_draws)])
+                    baolu_message = f"历史宝路\n{baolu_results}"
+                    await self.bot_client.send_message(chat_id, baolu_message)
+                    logger.info(f"✅ 已发送历史宝路")
             except Exception as e:
-                logger.error(f"⚠️ 发送积分名单失败: {str(e)}")
+                logger.error(f"⚠️ 发送历史宝路失败: {str(e)}")
+
+        # ==================== 消息5: 积分名单 ====================
+        # 对应 bot-server.js line 782-792
+        try:
+            # 获取群内所有用户
+            all_users = await self.user_repo.get_chat_users(chat_id)
+
+            # 按余额降序排列
+            all_users.sort(key=lambda u: u['balance'], reverse=True)
 
-            # ==================== 消息6: 下注速查指南 ====================
-            # 根据游戏类型发送对应的玩法指南
-            if game_type == 'lucky8':
-                # 澳洲幸运8玩法指南 - 对应 bot-server.js line 795-813
-                bet_guide_message = """番：3番300 → 命中结果号
+            score_message = f"{game_name}\n\n第{issue}期积分名单\n\n上下分请联系财务\n\n======积分排行======\n\n🔥玩家 💰积分\n\n"
+
+            for user in all_users:
+                score_message += f"{user['username']}:{user['balance']:.2f}\n"
+
+            await self.bot_client.send_message(chat_id, score_message)
+            logger.info(f"✅ 已发送积分名单")
+        except Exception as e:
+            logger.error(f"⚠️ 发送积分名单失败: {str(e)}")
+
+        # ==================== 消息6: 下注速查指南 ====================
+        # 根据游戏类型发送对应的玩法指南
+        if game_type == 'lucky8':
+            # 澳洲幸运8玩法指南 - 对应 bot-server.js line 795-813
+            bet_guide_message = """番：3番300 → 命中结果号
 
 念：1念2/300 → 首位赢、次位和局退本金
 
@@ -687,22 +829,18 @@ class GameService:
 特码：5特20或5.6/60 → 命中开奖号码1-20
 
 关键词：查(积分+流水)、流水(今日+累计盈亏)、取消(封盘前撤单)"""
-            else:  # liuhecai
-                # 六合彩玩法指南 - 只支持特码1-49
-                bet_guide_message = """特码：5特100或5/100 → 命中开奖号码1-49
+        else:  # liuhecai
+            # 六合彩玩法指南 - 只支持特码1-49
+            bet_guide_message = """特码：5特100或5/100 → 命中开奖号码1-49
 
 赔率：40倍
 
 关键词：查(积分+流水)、流水(今日+累计盈亏)、取消(封盘前撤单)"""
 
-            await self.bot_client.send_message(chat_id, bet_guide_message)
-            logger.info(f"✅ 已发送下注速查指南 (game_type={game_type})")
+        await self.bot_client.send_message(chat_id, bet_guide_message)
+        logger.info(f"✅ 已发送下注速查指南 (game_type={game_type})")
 
-            logger.info(f"✅ 开奖完成: 期号={issue}, 中奖={len([r for r in results if r['status'] == 'win'])}, 所有6条消息已发送")
-
-        except Exception as e:
-            logger.error(f"❌ 开奖失败: {str(e)}", exc_info=True)
-            await self.bot_client.send_message(chat_id, "❌ 开奖失败: 系统错误")
+        logger.info(f"✅ 开奖完成: 期号={issue}, 中奖={len([r for r in results if r['status'] == 'win'])}, 所有6条消息已发送")
 
     def _format_bet_description(self, result: Dict[str, Any]) -> str:
         """
@@ -742,6 +880,20 @@ class GameService:
         else:
             return game_logic.format_bet_type(bet_type)
 
+    async def _render_draw_history_image(self, chat_id: str, game_type: str) -> Optional[str]:
+        """
+        获取最近15期开奖记录并生成历史图片（渲染在工作池中执行）
+
+        Returns:
+            str: 图片路径，无开奖记录或生成失败返回 None
+        """
+        draw_history = await self.draw_repo.get_recent_draws(chat_id, limit=15, game_type=game_type)
+        if not draw_history:
+            return None
+
+        from utils import get_draw_image_generator
+        return await get_draw_image_generator().generate_image_cached(game_type, draw_history)
+
     async def handle_draw_history(self, chat_id: str) -> None:
         """
         处理开奖历史查询
@@ -765,16 +917,16 @@ class GameService:
                 return
 
             # 生成开奖历史图片
-            from utils import get_draw_image_generator
+            from utils import get_draw_image_generator, get_upload_storage
             import os
 
             image_generator = get_draw_image_generator()
-            image_path = image_generator.generate_image(game_type, draws)
+            image_path = await image_generator.generate_image_cached(game_type, draws)
 
             if image_path:
                 # 构建图片URL（与Node.js版本一致）
                 filename = os.path.basename(image_path)
-                public_url = f"/uploads/{filename}"
+                public_url = f"/uploads/{get_upload_storage(image_generator.uploads_dir).public_path(image_path)}"
 
                 # 构建完整URL
                 image_host = os.getenv('IMAGE_HOST', 'myrepdemo.top')
@@ -824,6 +976,143 @@ class GameService:
             # 六合彩: YYYYMMDD
             return now.strftime('%Y%m%d')
 
+    async def stage_settlement(
+        self,
+        chat_id: str,
+        game_type: str,
+        draw_result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        预结算：封盘后上游结果已到达时，提前计算本群本期结算并暂存（按群聊+期号幂等）
+
+        Args:
+            chat_id: 群聊ID
+            game_type: 游戏类型
+            draw_result: 开奖结果（issue/draw_number/draw_code/special_number）
+        """
+        return await get_settlement_stage().stage(
+            (chat_id, draw_result.get('issue')),
+            lambda: self._compute_settlement(chat_id, game_type, draw_result)
+        )
+
+    async def _prepare_settlement(
+        self,
+        chat_id: str,
+        game_type: str,
+        draw_result: Dict[str, Any],
+        pending_bets: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        开奖时获取结算结果：暂存结果与当前开奖号码、待结算注单一致时直接使用，否则重新计算
+        """
+        stage = get_settlement_stage()
+        key = (chat_id, draw_result.get('issue'))
+        staged = None
+        if stage.has(key):
+            staged = await self.stage_settlement(chat_id, game_type, draw_result)
+            stage.take(key)
+
+        if (
+            staged is not None
+            and staged['draw'] == self._settlement_draw(draw_result)
+            and staged['bet_ids'] == frozenset(bet['id'] for bet in pending_bets)
+        ):
+            stage.record(hit=True)
+            return staged
+
+        stage.record(hit=False)
+        return await self._compute_settlement(chat_id, game_type, draw_result, pending_bets)
+
+    @staticmethod
+    def _settlement_draw(draw_result: Dict[str, Any]) -> Tuple:
+        return (
+            draw_result.get('issue'),
+            draw_result.get('draw_number'),
+            draw_result.get('draw_code'),
+            draw_result.get('special_number'),
+        )
+
+    async def _compute_settlement(
+        self,
+        chat_id: str,
+        game_type: str,
+        draw_result: Dict[str, Any],
+        pending_bets: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        按开奖结果计算群聊全部待结算注单的结算（只计算，不写库）
+
+        Returns:
+            Dict: draw（开奖号码）、bet_ids、settlements（commit_settlement 入参）、results（中奖名单数据）
+        """
+        if pending_bets is None:
+            pending_bets = await self.bet_repo.get_all_pending_bets(chat_id)
+
+        settlements = []
+        results = []
+        users = {}
+        for bet in pending_bets:
+            # 按形状列组装下注对象（旧记录解析 bet_details）
+            bet_details = game_logic.bet_for_settlement(bet)
+
+            # 计算结果（幸运8按投注内容查结果表）
+            status, payout, profit = outcome_table.settle(
+                bet_details,
+                game_type,
+                draw_code=draw_result.get('draw_code'),
+                draw_number=draw_result.get('draw_number'),
+                special_number=draw_result.get('special_number')
+            )
+            settlements.append({
+                'bet_id': bet['id'],
+                'user_id': bet['user_id'],
+                'result': status,
+                'pnl': Decimal(str(profit)),
+                'payout': Decimal(str(payout))
+            })
+
+            # 获取用户信息
+            if bet['user_id'] not in users:
+                users[bet['user_id']] = await self.user_repo.get_user_in_chat(bet['user_id'], chat_id)
+
+            # 保存结果信息（用于后续消息生成）
+            results.append(self._settlement_result(bet, bet_details, status, profit, users[bet['user_id']]))
+
+        return {
+            'chat_id': chat_id,
+            'game_type': game_type,
+            'draw': self._settlement_draw(draw_result),
+            'bet_ids': frozenset(bet['id'] for bet in pending_bets),
+            'settlements': settlements,
+            'results': results
+        }
+
+    @staticmethod
+    def _settlement_result(
+        bet: Dict[str, Any],
+        bet_details: Dict[str, Any],
+        status: str,
+        profit: Any,
+        user: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """单笔注单的中奖名单数据"""
+        bet_type = bet_details.get('type') or bet_details.get('bet_type') or bet.get('lottery_type') or bet.get('bet_type')
+        amount = bet.get('bet_amount') or bet.get('amount', 0)
+        return {
+            'betId': bet['id'],
+            'playerId': bet['user_id'],
+            'playerName': user['username'] if user else bet.get('username'),
+            'type': bet_type,
+            'number': bet_details.get('number'),
+            'first': bet_details.get('first'),
+            'second': bet_details.get('second'),
+            'numbers': bet_details.get('numbers'),
+            'jinNumber': bet_details.get('jin_number'),
+            'amount': float(amount),
+            'status': status,
+            'profit': float(profit)
+        }
+
     async def _fetch_draw_result(self, game_type: str) -> Optional[Dict[str, Any]]:
         """
         从第三方API获取开奖结果
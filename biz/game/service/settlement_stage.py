@@ -0,0 +1,77 @@
+"""
+预结算暂存区
+上游开奖结果常在调度器开奖前到达：封盘后即可按该结果计算每个群聊的结算并暂存，
+开奖时只需校验并提交，无需再逐笔计算
+
+暂存按 (chat_id, issue) 幂等：同一键的计算只进行一次（并发请求共享同一任务），
+每个群聊只保留最新一期的暂存结果
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+StageKey = Tuple[str, str]
+
+
+class SettlementStage:
+    """预结算暂存区（单进程内共享）"""
+
+    def __init__(self):
+        self._staged: Dict[StageKey, Dict[str, Any]] = {}
+        self._inflight: Dict[StageKey, asyncio.Task] = {}
+        self._stats = {"staged": 0, "hits": 0, "misses": 0}
+
+    async def stage(self, key: StageKey, compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        计算并暂存结算（已暂存或计算中则复用）
+
+        Args:
+            key: (chat_id, issue)
+            compute: 计算结算的协程函数
+        """
+        staged = self._staged.get(key)
+        if staged is not None:
+            return staged
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._compute_and_store(key, compute))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # 调用方被取消（如封盘任务被重新调度）时不中断计算，其它等待方仍可复用结果
+        return await asyncio.shield(task)
+
+    async def _compute_and_store(self, key: StageKey, compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        staged = await compute()
+        # 同一群聊只保留最新一期
+        for other in [k for k in self._staged if k[0] == key[0]]:
+            del self._staged[other]
+        self._staged[key] = staged
+        self._stats["staged"] += 1
+        return staged
+
+    def has(self, key: StageKey) -> bool:
+        """是否已暂存或正在计算"""
+        return key in self._staged or key in self._inflight
+
+    def take(self, key: StageKey) -> Optional[Dict[str, Any]]:
+        """取出暂存结果（开奖提交时调用，取出后不再复用）"""
+        return self._staged.pop(key, None)
+
+    def record(self, hit: bool):
+        """记录开奖时是否命中暂存结果"""
+        self._stats["hits" if hit else "misses"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "pending": len(self._staged), "inflight": len(self._inflight)}
+
+
+# 全局单例
+_stage = SettlementStage()
+
+
+def get_settlement_stage() -> SettlementStage:
+    """获取预结算暂存区单例"""
+    return _stage
@@ -12,6 +12,8 @@ from base.game_name_mapper import validate_game_name, VALID_GAMES_CN
 
 from biz.reports.service.report_service import ReportService
 from biz.reports.models.report_models import RecalculateRequest
+from biz.bet.repo.pending_bet_book import get_pending_bet_book
+from biz.game.logic.liability_matrix import get_liability_matrix
 from biz.auth.dependencies import get_current_admin
 from dependency_injector.wiring import inject, Provide
 from biz.containers import Container
@@ -354,3 +356,28 @@ async def export_report(
             message=f"导出失败: {str(e)}",
             data=None
         )
+
+
+# ===== 10. 实时盈亏矩阵 =====
+
+@router.get("/liability-matrix")
+async def get_liability_matrix_report(
+    gameType: str = Query("lucky8", pattern="^(lucky8|liuhecai)$", description="游戏类型"),
+    current_admin: dict = Depends(get_current_admin)
+):
+    """
+    实时盈亏矩阵
+
+    返回下一期每种开奖结果下的庄家盈亏（lucky8: 4番×20特码，liuhecai: 49特码），
+    由内存账本增量维护，可高频轮询；ready=false 表示账本尚未加载完成
+    """
+    try:
+        result = get_liability_matrix().snapshot(gameType)
+        result["ready"] = get_pending_bet_book().ready
+        return success_response(data=result, message="查询成功")
+    except Exception as e:
+        return error_response(
+            code=ErrorCode.INTERNAL_ERROR,
+            message=f"查询失败: {str(e)}",
+            data=None
+        )
@@ -9,6 +9,44 @@ from decimal import Decimal
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from base.game_name_mapper import game_code_to_name, GAME_CODE_TO_NAME
+from biz.archive.repo.archive_repo import table_source
+
+# 热点查询（migrations/check_query_plans.py 直接引用，校验执行计划）
+# {source} 为 table_source() 选择的数据源（早于归档分界线时合并冷表），{where} 为拼接后的过滤条件
+DEPOSIT_SUMMARY_SQL = """
+    SELECT
+        COALESCE(SUM(CASE WHEN transaction_type = 'deposit' THEN amount ELSE 0 END), 0) as total_deposit,
+        COALESCE(SUM(CASE WHEN transaction_type = 'withdrawal' THEN amount ELSE 0 END), 0) as total_withdrawal,
+        COALESCE(SUM(fee), 0) as total_fee
+    FROM transactions
+    WHERE transaction_time BETWEEN :start_dt AND :end_dt
+        AND status = 'success'
+"""
+BET_ORDER_SUMMARY_SQL = """
+    SELECT
+        COALESCE(SUM(bet_amount), 0) as total_bet,
+        COALESCE(SUM(valid_amount), 0) as total_valid,
+        COALESCE(SUM(rebate), 0) as total_rebate,
+        COALESCE(SUM(bet_result), 0) as total_win_loss
+    FROM {source}
+    WHERE bet_time BETWEEN :start_dt AND :end_dt
+        AND status = 'settled'
+"""
+WIN_LOSS_REPORT_SQL = """
+    SELECT
+        m.account,
+        COALESCE(m.name, m.account) as account_name,
+        b.bet_type as game_type,
+        COALESCE(SUM(b.bet_amount), 0) as bet_amount,
+        COALESCE(SUM(b.valid_amount), 0) as valid_amount,
+        COALESCE(SUM(b.rebate), 0) as rebate,
+        COALESCE(SUM(b.bet_result), 0) as win_loss
+    FROM {source}
+    LEFT JOIN member_profiles m ON CAST(b.user_id AS CHAR) = CAST(m.user_id AS CHAR)
+    {where}
+    GROUP BY m.account, m.name, b.bet_type
+    LIMIT :page_size OFFSET :offset
+"""
 
 
 class ReportRepository:
@@ -40,15 +78,7 @@ class ReportRepository:
             end_dt = f"{date_end} 23:59:59"
 
             # 查询存取款数据
-            deposit_query = text("""
-                SELECT
-                    COALESCE(SUM(CASE WHEN transaction_type = 'deposit' THEN amount ELSE 0 END), 0) as total_deposit,
-                    COALESCE(SUM(CASE WHEN transaction_type = 'withdrawal' THEN amount ELSE 0 END), 0) as total_withdrawal,
-                    COALESCE(SUM(fee), 0) as total_fee
-                FROM transactions
-                WHERE transaction_time BETWEEN :start_dt AND :end_dt
-                    AND status = 'success'
-            """)
+            deposit_query = text(DEPOSIT_SUMMARY_SQL)
 
             result = await session.execute(deposit_query, {"start_dt": start_dt, "end_dt": end_dt})
             row = result.fetchone()
@@ -58,16 +88,8 @@ class ReportRepository:
             total_fee = Decimal(str(row[2])) if row and row[2] else Decimal("0.00")
 
             # 查询注单数据
-            bet_query = text("""
-                SELECT
-                    COALESCE(SUM(bet_amount), 0) as total_bet,
-                    COALESCE(SUM(valid_amount), 0) as total_valid,
-                    COALESCE(SUM(rebate), 0) as total_rebate,
-                    COALESCE(SUM(bet_result), 0) as total_win_loss
-                FROM bet_orders
-                WHERE bet_time BETWEEN :start_dt AND :end_dt
-                    AND status = 'settled'
-            """)
+            # 查询范围早于归档分界线时合并冷表
+            bet_query = text(BET_ORDER_SUMMARY_SQL.format(source=table_source("bet_orders", "b", start_dt)))
 
             result = await session.execute(bet_query, {"start_dt": start_dt, "end_dt": end_dt})
             row = result.fetchone()
@@ -122,6 +144,7 @@ class ReportRepository:
             # 构建WHERE条件
             where_clause = "WHERE b.bet_time BETWEEN :start_dt AND :end_dt AND b.status = 'settled'"
             params = {"start_dt": start_dt, "end_dt": end_dt}
+            bet_orders_source = table_source("bet_orders", "b", start_dt)
 
             if account:
                 where_clause += " AND m.account = :account"
@@ -138,7 +161,7 @@ class ReportRepository:
                     COALESCE(SUM(b.valid_amount), 0) as valid_amount,
                     COALESCE(SUM(b.rebate), 0) as rebate,
                     COALESCE(SUM(b.bet_result), 0) as win_loss
-                FROM bet_orders b
+                FROM {bet_orders_source}
                 LEFT JOIN member_profiles m ON CAST(b.user_id AS CHAR) = CAST(m.user_id AS CHAR)
                 {where_clause}
                 GROUP BY m.account, m.name, b.bet_type
@@ -170,7 +193,7 @@ class ReportRepository:
             # 查询总数
             count_query = text(f"""
                 SELECT COUNT(DISTINCT CONCAT(m.account, '-', b.bet_type))
-                FROM bet_orders b
+                FROM {bet_orders_source}
                 LEFT JOIN member_profiles m ON CAST(b.user_id AS CHAR) = CAST(m.user_id AS CHAR)
                 {where_clause}
             """)
@@ -189,7 +212,7 @@ class ReportRepository:
                     COALESCE(SUM(b.valid_amount), 0) as total_valid,
                     COALESCE(SUM(b.rebate), 0) as total_rebate,
                     COALESCE(SUM(b.bet_result), 0) as total_win_loss
-                FROM bet_orders b
+                FROM {bet_orders_source}
                 LEFT JOIN member_profiles m ON CAST(b.user_id AS CHAR) = CAST(m.user_id AS CHAR)
                 {where_clause}
             """)
@@ -228,6 +251,7 @@ class ReportRepository:
 
             where_clause = "WHERE b.bet_time BETWEEN :start_dt AND :end_dt AND b.status = 'settled'"
             params = {"start_dt": start_dt, "end_dt": end_dt}
+            bet_orders_source = table_source("bet_orders", "b", start_dt)
 
             if account:
                 where_clause += " AND m.account = :account"
@@ -241,21 +265,7 @@ class ReportRepository:
                     params[f"game_type_{i}"] = gt
 
             offset = (page - 1) * page_size
-            query = text(f"""
-                SELECT
-                    m.account,
-                    COALESCE(m.name, m.account) as account_name,
-                    b.bet_type as game_type,
-                    COALESCE(SUM(b.bet_amount), 0) as bet_amount,
-                    COALESCE(SUM(b.valid_amount), 0) as valid_amount,
-                    COALESCE(SUM(b.rebate), 0) as rebate,
-                    COALESCE(SUM(b.bet_result), 0) as win_loss
-                FROM bet_orders b
-                LEFT JOIN member_profiles m ON CAST(b.user_id AS CHAR) = CAST(m.user_id AS CHAR)
-                {where_clause}
-                GROUP BY m.account, m.name, b.bet_type
-                LIMIT :page_size OFFSET :offset
-            """)
+            query = text(WIN_LOSS_REPORT_SQL.format(source=bet_orders_source, where=where_clause))
 
             params["page_size"] = page_size
             params["offset"] = offset
@@ -285,7 +295,7 @@ class ReportRepository:
 
             count_query = text(f"""
                 SELECT COUNT(DISTINCT CONCAT(m.account, '-', b.bet_type))
-                FROM bet_orders b
+                FROM {bet_orders_source}
                 LEFT JOIN member_profiles m ON CAST(b.user_id AS CHAR) = CAST(m.user_id AS CHAR)
                 {where_clause}
             """)
@@ -8,6 +8,26 @@ from typing import Optional, List, Dict, Any
 from sqlalchemy import text, and_, desc
 from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
 
+# 热点查询（migrations/check_query_plans.py 直接引用，校验执行计划）
+CHAT_USERS_SQL = """
+    SELECT * FROM users
+    WHERE chat_id = :chat_id
+    ORDER BY created_at DESC
+    LIMIT :limit OFFSET :skip
+"""
+LEADERBOARD_SQL = """
+    SELECT id, username, balance, score
+    FROM users
+    WHERE chat_id = :chat_id AND status = '活跃'
+    ORDER BY balance DESC
+    LIMIT :limit
+"""
+CHAT_NEW_USERS_SQL = """
+    SELECT * FROM users
+    WHERE chat_id = :chat_id AND is_new = 1
+    ORDER BY created_at DESC
+"""
+
 
 class UserRepository:
     """用户Repository - 使用复合主键(id, chat_id)"""
@@ -103,12 +123,7 @@ class UserRepository:
     async def get_chat_users(self, chat_id: str, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
         """获取特定群的所有用户"""
         async with self._session_factory() as session:
-            query = text("""
-                SELECT * FROM users
-                WHERE chat_id = :chat_id
-                ORDER BY created_at DESC
-                LIMIT :limit OFFSET :skip
-            """)
+            query = text(CHAT_USERS_SQL)
             result = await session.execute(query, {"chat_id": chat_id, "skip": skip, "limit": limit})
             rows = result.fetchall()
             users = []
@@ -346,13 +361,7 @@ class UserRepository:
     ) -> List[Dict[str, Any]]:
         """获取排行榜（按余额排序）"""
         async with self._session_factory() as session:
-            query = text("""
-                SELECT id, username, balance, score
-                FROM users
-                WHERE chat_id = :chat_id AND status = '活跃'
-                ORDER BY balance DESC
-                LIMIT :limit
-            """)
+            query = text(LEADERBOARD_SQL)
             result = await session.execute(query, {"chat_id": chat_id, "limit": limit})
             rows = result.fetchall()
             return [dict(row._mapping) for row in rows]
@@ -364,11 +373,7 @@ class UserRepository:
         """获取新用户列表"""
         async with self._session_factory() as session:
             if chat_id:
-                query = text("""
-                    SELECT * FROM users
-                    WHERE chat_id = :chat_id AND is_new = 1
-                    ORDER BY created_at DESC
-                """)
+                query = text(CHAT_NEW_USERS_SQL)
                 result = await session.execute(query, {"chat_id": chat_id})
             else:
                 query = text("""
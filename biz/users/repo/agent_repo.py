@@ -6,6 +6,19 @@ import bcrypt
 import random
 import string
 import json
+from biz.archive.repo.archive_repo import table_source
+
+# 代理报表查询（migrations/check_query_plans.py 直接引用，校验执行计划）
+# {source} 为 table_source() 选择的数据源（早于归档分界线时合并冷表），{where} 为拼接后的过滤条件
+AGENT_ACCOUNT_CHANGES_SQL = """
+    SELECT ac.id, ac.type, ac.amount, ac.balance_before,
+           ac.balance_after, ac.created_at, ac.note
+    FROM {source}
+    JOIN agent_profiles ap ON CAST(ap.user_id AS CHAR) = CAST(ac.user_id AS CHAR)
+    WHERE {where}
+    ORDER BY ac.created_at DESC
+    LIMIT :limit OFFSET :offset
+"""
 
 
 class AgentRepository:
@@ -563,19 +576,12 @@ class AgentRepository:
             where.append("ac.created_at <= :end_date")
             params["end_date"] = end_date + " 23:59:59"
 
+        # 起始日期早于归档分界线时合并冷表
+        source = table_source("account_changes", "ac", params.get("start_date"))
+
         async with self._session_factory() as session:
             # Get list
-            list_query = text(
-                f"""
-                SELECT ac.id, ac.type, ac.amount, ac.balance_before,
-                       ac.balance_after, ac.created_at, ac.note
-                FROM account_changes ac
-                JOIN agent_profiles ap ON CAST(ap.user_id AS CHAR) = CAST(ac.user_id AS CHAR)
-                WHERE {' AND '.join(where)}
-                ORDER BY ac.created_at DESC
-                LIMIT :limit OFFSET :offset
-                """
-            )
+            list_query = text(AGENT_ACCOUNT_CHANGES_SQL.format(source=source, where=' AND '.join(where)))
             result = await session.execute(list_query, params)
             rows = result.fetchall()
 
@@ -596,7 +602,7 @@ class AgentRepository:
             count_query = text(
                 f"""
                 SELECT COUNT(*) AS cnt
-                FROM account_changes ac
+                FROM {source}
                 JOIN agent_profiles ap ON CAST(ap.user_id AS CHAR) = CAST(ac.user_id AS CHAR)
                 WHERE {' AND '.join(where)}
                 """
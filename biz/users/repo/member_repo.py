@@ -3,6 +3,28 @@ from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
 from sqlalchemy import text
 from decimal import Decimal
 import bcrypt
+from biz.archive.repo.archive_repo import table_source
+
+# 会员报表查询（migrations/check_query_plans.py 直接引用，校验执行计划）
+# {source} 为 table_source() 选择的数据源（早于归档分界线时合并冷表），{where} 为拼接后的过滤条件
+MEMBER_BET_ORDERS_SQL = """
+    SELECT bo.id, bo.order_no, bo.bet_type, bo.bet_amount, bo.bet_result,
+           bo.status, bo.bet_time, bo.settle_time
+    FROM {source}
+    JOIN member_profiles mp ON CAST(mp.user_id AS CHAR) = CAST(bo.user_id AS CHAR)
+    WHERE {where}
+    ORDER BY bo.bet_time DESC
+    LIMIT :limit OFFSET :offset
+"""
+MEMBER_ACCOUNT_CHANGES_SQL = """
+    SELECT ac.id, ac.type, ac.amount, ac.balance_before,
+           ac.balance_after, ac.created_at, ac.note
+    FROM {source}
+    JOIN member_profiles mp ON CAST(mp.user_id AS CHAR) = CAST(ac.user_id AS CHAR)
+    WHERE {where}
+    ORDER BY ac.created_at DESC
+    LIMIT :limit OFFSET :offset
+"""
 
 
 class MemberRepository:
@@ -350,19 +372,12 @@ class MemberRepository:
             where.append("bo.bet_time <= :end_date")
             params["end_date"] = end_date + " 23:59:59"
 
+        # 起始日期早于归档分界线时合并冷表
+        source = table_source("bet_orders", "bo", params.get("start_date"))
+
         async with self._session_factory() as session:
             # Get list
-            list_query = text(
-                f"""
-                SELECT bo.id, bo.order_no, bo.bet_type, bo.bet_amount, bo.bet_result,
-                       bo.status, bo.bet_time, bo.settle_time
-                FROM bet_orders bo
-                JOIN member_profiles mp ON CAST(mp.user_id AS CHAR) = CAST(bo.user_id AS CHAR)
-                WHERE {' AND '.join(where)}
-                ORDER BY bo.bet_time DESC
-                LIMIT :limit OFFSET :offset
-                """
-            )
+            list_query = text(MEMBER_BET_ORDERS_SQL.format(source=source, where=' AND '.join(where)))
             result = await session.execute(list_query, params)
             rows = result.fetchall()
 
@@ -384,7 +399,7 @@ class MemberRepository:
             count_query = text(
                 f"""
                 SELECT COUNT(*) AS cnt
-                FROM bet_orders bo
+                FROM {source}
                 JOIN member_profiles mp ON CAST(mp.user_id AS CHAR) = CAST(bo.user_id AS CHAR)
                 WHERE {' AND '.join(where)}
                 """
@@ -398,7 +413,7 @@ class MemberRepository:
                 SELECT
                     COALESCE(SUM(bo.bet_amount), 0) AS total_bet,
                     COALESCE(SUM(bo.bet_result), 0) AS total_win
-                FROM bet_orders bo
+                FROM {source}
                 JOIN member_profiles mp ON CAST(mp.user_id AS CHAR) = CAST(bo.user_id AS CHAR)
                 WHERE {' AND '.join(where)}
                 LIMIT :limit OFFSET :offset
@@ -532,19 +547,12 @@ class MemberRepository:
             where.append("ac.created_at <= :end_date")
             params["end_date"] = end_date + " 23:59:59"
 
+        # 起始日期早于归档分界线时合并冷表
+        source = table_source("account_changes", "ac", params.get("start_date"))
+
         async with self._session_factory() as session:
             # Get list
-            list_query = text(
-                f"""
-                SELECT ac.id, ac.type, ac.amount, ac.balance_before,
-                       ac.balance_after, ac.created_at, ac.note
-                FROM account_changes ac
-                JOIN member_profiles mp ON CAST(mp.user_id AS CHAR) = CAST(ac.user_id AS CHAR)
-                WHERE {' AND '.join(where)}
-                ORDER BY ac.created_at DESC
-                LIMIT :limit OFFSET :offset
-                """
-            )
+            list_query = text(MEMBER_ACCOUNT_CHANGES_SQL.format(source=source, where=' AND '.join(where)))
             result = await session.execute(list_query, params)
             rows = result.fetchall()
 
@@ -565,7 +573,7 @@ class MemberRepository:
             count_query = text(
                 f"""
                 SELECT COUNT(*) AS cnt
-                FROM account_changes ac
+                FROM {source}
                 JOIN member_profiles mp ON CAST(mp.user_id AS CHAR) = CAST(ac.user_id AS CHAR)
                 WHERE {' AND '.join(where)}
                 """
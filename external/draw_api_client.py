@@ -6,13 +6,24 @@
 import logging
 import aiohttp
 import asyncio
+import json
 import os
+import tempfile
 from typing import Optional, Dict, Any, List
-from datetime import datetime
+from datetime import datetime, timedelta
 from decimal import Decimal
 
+from external.draw_history_store import DrawHistoryStore
+from external.draw_providers import PERIODS, DrawProvider, create_draw_provider
+
 logger = logging.getLogger(__name__)
 
+# 上游内容未变化（HTTP 304）时 _request 的返回值
+NOT_MODIFIED = object()
+
+# 各游戏的开奖周期（秒），与 DrawScheduler.get_draw_interval 一致
+DRAW_PERIODS = PERIODS
+
 
 class DrawApiClient:
     """
@@ -37,26 +48,221 @@ class DrawApiClient:
             'https://history.macaumarksix.com'
         )
 
-        # 数据缓存 (与Node.js版本相同)
-        self._lucky8_results: List[Dict] = []
+        # 备用地址（可选）：主地址超过 hedge_delay_seconds 未响应时并发请求备用地址，取先返回者
+        self.lucky8_api_base_secondary = os.getenv('LUCKY8_API_BASE_SECONDARY') or None
+        self.liuhecai_api_base_secondary = os.getenv('LIUHECAI_API_BASE_SECONDARY') or None
+        self.hedge_delay_seconds = float(os.getenv('DRAW_HEDGE_DELAY_SECONDS', '1.5'))
+
+        # 复用的HTTP会话（连接池）
+        self._session: Optional[aiohttp.ClientSession] = None
+        # 条件请求缓存：{url: {'etag': str, 'last_modified': str}}
+        self._validators: Dict[str, Dict[str, str]] = {}
+        # 各上游地址的请求统计
+        self._provider_stats: Dict[str, Dict[str, Any]] = {}
+
+        # 数据缓存：历史记录写入时解析一次存入定长数组，最新一期保留上游原始数据
+        self._lucky8_history = DrawHistoryStore(width=8)
         self._latest_lucky8_draw: Optional[Dict] = None
-        self._draw_results: List[Dict] = []
+        self._marksix_history = DrawHistoryStore(width=7)
         self._latest_draw: Optional[Dict] = None
         self._last_refresh: Optional[datetime] = None
 
         # 自动刷新任务
         self._refresh_task: Optional[asyncio.Task] = None
 
+        # 自适应轮询：两期之间低频，预计开奖时间附近高频直到出现新期号
+        self.poll_fast_seconds = float(os.getenv('DRAW_POLL_FAST_SECONDS', '3'))
+        self.poll_idle_seconds = float(os.getenv('DRAW_POLL_IDLE_SECONDS', '60'))
+        self.poll_window_before_seconds = float(os.getenv('DRAW_POLL_WINDOW_BEFORE_SECONDS', '15'))
+        self.poll_window_after_seconds = float(os.getenv('DRAW_POLL_WINDOW_AFTER_SECONDS', '120'))
+        self.poll_max_sleep_seconds = float(os.getenv('DRAW_POLL_MAX_SLEEP_SECONDS', '1800'))
+        # 开奖时最新期号已在上一轮使用过时，等待新期号的最长时间
+        self.wait_new_issue_seconds = float(os.getenv('DRAW_WAIT_NEW_ISSUE_SECONDS', '30'))
+        self._poll_tasks: Dict[str, asyncio.Task] = {}
+        self._new_issue_events: Dict[str, asyncio.Event] = {}
+        # 每个游戏最近一次开奖使用的期号及首次使用时间
+        self._served_issues: Dict[str, tuple] = {}
+
+        # 可替换的数据源（DRAW_PROVIDER=offline 时为离线数据源，默认 None 直接请求真实API）
+        self.provider: Optional[DrawProvider] = create_draw_provider()
+
+        # 本地快照：刷新后内容有变化时原子写入，启动时先加载，重启后无需等待上游即可使用真实数据
+        # DRAW_CACHE_SNAPSHOT 置空则关闭快照；离线数据源不读写快照
+        self.snapshot_path = os.getenv('DRAW_CACHE_SNAPSHOT', 'data/draw_cache.json') if self.provider is None else None
+        self.snapshot_max_age_hours = float(os.getenv('DRAW_CACHE_SNAPSHOT_MAX_AGE_HOURS', '24'))
+        self._snapshot_saved_at: Optional[datetime] = None
+        # 最近一次写入（或加载）的快照内容标识，内容未变化时不重复写入
+        self._snapshot_written_state: Optional[tuple] = None
+        self._snapshot_lock = asyncio.Lock()
+        self.load_snapshot()
+
+    def load_snapshot(self) -> bool:
+        """
+        从本地快照恢复开奖缓存（启动时、任何网络请求之前调用）
+
+        Returns:
+            bool: 是否加载成功
+        """
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+
+            saved_at = datetime.fromisoformat(snapshot['saved_at'])
+            age_hours = (datetime.now() - saved_at).total_seconds() / 3600
+            if age_hours > self.snapshot_max_age_hours:
+                logger.info(f"ℹ️ 开奖缓存快照已过期（{age_hours:.1f} 小时），忽略")
+                return False
+
+            lucky8_results = snapshot.get('lucky8') or []
+            draw_results = snapshot.get('liuhecai') or []
+            if lucky8_results:
+                self._ingest_lucky8(lucky8_results)
+            if draw_results:
+                self._ingest_marksix(draw_results)
+
+            self._snapshot_saved_at = saved_at
+            self._snapshot_written_state = self._snapshot_state()
+            self._last_refresh = saved_at
+            logger.info(
+                f"✅ 已从快照恢复开奖缓存（{age_hours * 60:.0f} 分钟前）："
+                f"快乐十分 {len(lucky8_results)} 条，六合彩 {len(draw_results)} 条"
+            )
+            return True
+
+        except Exception as e:
+            logger.warning(f"⚠️ 开奖缓存快照加载失败: {str(e)}")
+            return False
+
+    def _snapshot_state(self) -> tuple:
+        """快照内容标识：两个游戏的最新期号与历史条数"""
+        return (
+            self._latest_issue('lucky8'), len(self._lucky8_history),
+            self._latest_issue('liuhecai'), len(self._marksix_history),
+        )
+
+    async def _save_snapshot(self):
+        """
+        最新期号或历史有变化时写入快照（文件写入在线程中执行，不阻塞事件循环）
+
+        轮询在开奖时间附近约每秒一次，多数刷新内容不变，直接跳过
+        """
+        if not self.snapshot_path:
+            return
+
+        async with self._snapshot_lock:
+            state = self._snapshot_state()
+            if state == self._snapshot_written_state:
+                return
+
+            saved_at = datetime.now()
+            # 快照沿用上游字段格式，加载时走同一套解析
+            snapshot = {
+                'saved_at': saved_at.isoformat(),
+                'lucky8': [
+                    {'preDrawIssue': r['issue'], 'preDrawCode': r['draw_code'], 'preDrawTime': r['timestamp']}
+                    for r in self._lucky8_history.recent(len(self._lucky8_history))
+                ],
+                'liuhecai': [
+                    {'expect': r['issue'], 'openCode': r['draw_code'], 'drawTime': r['timestamp']}
+                    for r in self._marksix_history.recent(len(self._marksix_history))
+                ],
+            }
+
+            try:
+                await asyncio.to_thread(self._write_snapshot, snapshot)
+                self._snapshot_written_state = state
+                self._snapshot_saved_at = saved_at
+            except Exception as e:
+                logger.warning(f"⚠️ 开奖缓存快照写入失败: {str(e)}")
+
+    def _write_snapshot(self, snapshot: Dict[str, Any]):
+        """原子写入快照文件（临时文件 + os.replace）"""
+        directory = os.path.dirname(os.path.abspath(self.snapshot_path))
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.draw_cache_', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+            os.replace(tmp_path, self.snapshot_path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """获取复用的HTTP会话（首次调用时创建）"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=10, keepalive_timeout=60),
+                headers={
+                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+                    'Accept': 'application/json, text/plain, */*',
+                    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8'
+                }
+            )
+        return self._session
+
+    async def close(self):
+        """关闭HTTP会话"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self.provider:
+            await self.provider.close()
+
+    @property
+    def time_scale(self) -> float:
+        """时间倍速（离线数据源加速回放时大于1）"""
+        return self.provider.time_scale if self.provider else 1.0
+
+    def _now(self) -> datetime:
+        """数据源时间（与开奖记录中的开奖时间可比较）"""
+        return self.provider.now() if self.provider else datetime.now()
+
+    def _record_stat(self, provider: str, outcome: str, latency_ms: float):
+        """
+        记录上游请求统计
+
+        Args:
+            provider: 上游名称，如 lucky8:primary
+            outcome: ok / not_modified / error
+            latency_ms: 耗时（毫秒）
+        """
+        stats = self._provider_stats.setdefault(provider, {
+            'requests': 0,
+            'errors': 0,
+            'not_modified': 0,
+            'avg_latency_ms': 0.0,
+            'last_latency_ms': 0.0,
+        })
+        stats['requests'] += 1
+        if outcome == 'error':
+            stats['errors'] += 1
+        elif outcome == 'not_modified':
+            stats['not_modified'] += 1
+        stats['last_latency_ms'] = round(latency_ms, 1)
+        # 滑动平均，避免保存全部样本
+        stats['avg_latency_ms'] = round(stats['avg_latency_ms'] * 0.8 + latency_ms * 0.2, 1) \
+            if stats['requests'] > 1 else round(latency_ms, 1)
+
+    def get_provider_stats(self) -> Dict[str, Dict[str, Any]]:
+        """获取各上游地址的请求统计"""
+        return {name: dict(stats) for name, stats in self._provider_stats.items()}
+
     async def _request(
         self,
         url: str,
         method: str = "GET",
         params: Optional[Dict] = None,
         timeout: int = 10,
-        retries: int = 2
-    ) -> Optional[Dict[str, Any]]:
+        retries: int = 2,
+        provider: Optional[str] = None
+    ) -> Any:
         """
-        发送HTTP请求（带重试）
+        发送HTTP请求（带重试，复用连接池，GET 自动携带 ETag / Last-Modified 条件头）
 
         Args:
             url: 请求URL
@@ -64,67 +270,128 @@ class DrawApiClient:
             params: 查询参数
             timeout: 超时时间（秒）
             retries: 重试次数
+            provider: 上游名称（用于统计），默认取 url
 
         Returns:
-            Dict: 响应数据，失败返回None
+            Dict: 响应数据；内容未变化返回 NOT_MODIFIED；失败返回None
         """
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'application/json, text/plain, */*',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8'
-        }
-
+        provider = provider or url
+        validators = self._validators.get(url, {}) if method == "GET" else {}
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
+        loop = asyncio.get_running_loop()
         for attempt in range(retries + 1):
+            started = loop.time()
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.request(
-                        method=method,
-                        url=url,
-                        params=params,
-                        headers=headers,
-                        timeout=aiohttp.ClientTimeout(total=timeout)
-                    ) as response:
-                        if response.status == 200:
-                            # 检查 Content-Type 是否为 JSON
-                            content_type = response.headers.get('Content-Type', '')
-                            if 'application/json' in content_type or 'text/plain' in content_type:
-                                try:
-                                    return await response.json()
-                                except Exception:
-                                    # 尝试手动解析JSON
-                                    text = await response.text()
-                                    import json
-                                    try:
-                                        return json.loads(text)
-                                    except:
-                                        logger.warning(f"⚠️ 无法解析JSON响应: {url}")
-                                        return None
-                            else:
-                                # 如果不是JSON，降低日志级别（不是错误，只是警告）
-                                if attempt == retries:  # 只在最后一次失败时记录
-                                    text = await response.text()
-                                    logger.warning(f"⚠️ API返回非JSON响应: {url}")
-                                    logger.debug(f"   Content-Type: {content_type}")
-                                    logger.debug(f"   响应内容（前200字符）: {text[:200]}")
+                session = await self._get_session()
+                async with session.request(
+                    method=method,
+                    url=url,
+                    params=params,
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=timeout)
+                ) as response:
+                    latency_ms = (loop.time() - started) * 1000
+
+                    if response.status == 304:
+                        self._record_stat(provider, 'not_modified', latency_ms)
+                        return NOT_MODIFIED
+
+                    if response.status == 200:
+                        # 检查 Content-Type 是否为 JSON
+                        content_type = response.headers.get('Content-Type', '')
+                        if 'application/json' in content_type or 'text/plain' in content_type:
+                            try:
+                                data = await response.json(content_type=None)
+                            except Exception:
+                                logger.warning(f"⚠️ 无法解析JSON响应: {url}")
+                                self._record_stat(provider, 'error', latency_ms)
                                 return None
+
+                            self._record_stat(provider, 'ok', latency_ms)
+                            etag = response.headers.get('ETag')
+                            last_modified = response.headers.get('Last-Modified')
+                            if method == "GET" and (etag or last_modified):
+                                self._validators[url] = {'etag': etag, 'last_modified': last_modified}
+                            return data
                         else:
-                            if attempt == retries:
-                                logger.warning(f"⚠️ API请求失败: {url}, 状态码={response.status}")
+                            # 如果不是JSON，降低日志级别（不是错误，只是警告）
+                            self._record_stat(provider, 'error', latency_ms)
+                            if attempt == retries:  # 只在最后一次失败时记录
+                                text = await response.text()
+                                logger.warning(f"⚠️ API返回非JSON响应: {url}")
+                                logger.debug(f"   Content-Type: {content_type}")
+                                logger.debug(f"   响应内容（前200字符）: {text[:200]}")
                             return None
-
-            except aiohttp.ClientError as e:
+                    else:
+                        self._record_stat(provider, 'error', latency_ms)
+                        if attempt == retries:
+                            logger.warning(f"⚠️ API请求失败: {url}, 状态码={response.status}")
+                        return None
+
+            except asyncio.CancelledError:
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self._record_stat(provider, 'error', (loop.time() - started) * 1000)
                 if attempt == retries:
-                    logger.warning(f"⚠️ API网络错误: {url} - {str(e)}")
+                    logger.warning(f"⚠️ API网络错误: {url} - {str(e) or type(e).__name__}")
                 else:
                     await asyncio.sleep(1)  # 重试前等待1秒
                 continue
             except Exception as e:
+                self._record_stat(provider, 'error', (loop.time() - started) * 1000)
                 if attempt == retries:
                     logger.warning(f"⚠️ API请求异常: {url} - {str(e)}")
                 continue
 
         return None
 
+    async def _hedged_request(
+        self,
+        game_type: str,
+        primary_base: str,
+        secondary_base: Optional[str],
+        path: str,
+        params: Optional[Dict] = None
+    ) -> Any:
+        """
+        请求主地址，若超过 hedge_delay_seconds 仍未返回且配置了备用地址，则并发请求备用地址，
+        采用先返回的有效结果并取消另一个
+
+        Returns:
+            同 _request
+        """
+        primary = asyncio.create_task(
+            self._request(f"{primary_base}{path}", params=params, provider=f"{game_type}:primary")
+        )
+        if not secondary_base:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay_seconds)
+        if done and primary.result() is not None:
+            return primary.result()
+
+        secondary = asyncio.create_task(
+            self._request(f"{secondary_base}{path}", params=params, provider=f"{game_type}:secondary")
+        )
+        pending = {secondary} if done else {primary, secondary}
+        result = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.result() is not None:
+                        result = task.result()
+                        return result
+            return result
+        finally:
+            for task in pending:
+                task.cancel()
+
     def _parse_draw_numbers(self, open_code: str) -> List[int]:
         """
         解析开奖号码字符串（逗号分隔）
@@ -183,6 +450,137 @@ class DrawApiClient:
 
         return None
 
+    def _parse_lucky8_record(self, draw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """解析一条幸运8上游记录，番数无效时返回 None"""
+        numbers = self._parse_draw_numbers(draw.get('preDrawCode', ''))
+        draw_number = self._calculate_lucky8_result(numbers)
+        if draw_number is None:
+            return None
+
+        # 计算特码（第8位，如果没有则用最后一位）
+        special_number = numbers[7] if len(numbers) >= 8 else numbers[-1]
+
+        return {
+            'issue': draw.get('preDrawIssue'),
+            'timestamp': draw.get('preDrawTime'),
+            'draw_code': draw.get('preDrawCode'),
+            'numbers': numbers,
+            'draw_number': draw_number,
+            'special_number': special_number
+        }
+
+    def _parse_marksix_record(self, draw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """解析一条六合彩上游记录，号码不是7个时返回 None"""
+        numbers = self._parse_draw_numbers(draw.get('openCode', ''))
+        if len(numbers) != 7:
+            return None
+
+        # 第7位（索引6）是特码
+        return {
+            'issue': draw.get('expect', ''),
+            'timestamp': draw.get('drawTime'),
+            'draw_code': draw.get('openCode'),
+            'numbers': numbers,
+            'draw_number': numbers[6],
+            'special_number': numbers[6]
+        }
+
+    def _ingest_lucky8(self, results: List[Dict[str, Any]]):
+        """写入幸运8历史（上游顺序，第一条为最新）"""
+        previous_issue = self._latest_issue('lucky8')
+        parsed = (self._parse_lucky8_record(draw) for draw in results)
+        self._lucky8_history.replace([r for r in parsed if r is not None])
+        self._latest_lucky8_draw = results[0]
+        if self._latest_issue('lucky8') != previous_issue:
+            self._notify_new_issue('lucky8')
+
+    def _ingest_marksix(self, results: List[Dict[str, Any]]):
+        """写入六合彩历史（上游顺序，第一条为最新）"""
+        previous_issue = self._latest_issue('liuhecai')
+        parsed = (self._parse_marksix_record(draw) for draw in results)
+        self._marksix_history.replace([r for r in parsed if r is not None])
+        self._latest_draw = results[0]
+        if self._latest_issue('liuhecai') != previous_issue:
+            self._notify_new_issue('liuhecai')
+
+    def _latest_issue(self, game_type: str) -> Optional[str]:
+        """上游最新一期的原始期号"""
+        if game_type == 'lucky8':
+            return self._latest_lucky8_draw.get('preDrawIssue') if self._latest_lucky8_draw else None
+        return self._latest_draw.get('expect') if self._latest_draw else None
+
+    def _notify_new_issue(self, game_type: str):
+        """唤醒等待新期号的开奖流程"""
+        event = self._new_issue_events.pop(game_type, None)
+        if event:
+            event.set()
+
+    async def wait_for_new_issue(self, game_type: str, known_issue: Optional[str], timeout: float) -> bool:
+        """
+        等待上游出现不同于 known_issue 的新期号
+
+        Args:
+            game_type: 游戏类型
+            known_issue: 已知的最新期号
+            timeout: 最长等待秒数
+
+        Returns:
+            bool: 是否等到新期号
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self._latest_issue(game_type) == known_issue:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            event = self._new_issue_events.setdefault(game_type, asyncio.Event())
+            try:
+                await asyncio.wait_for(event.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    def _next_expected_draw_time(self, game_type: str) -> Optional[datetime]:
+        """根据最新一期开奖时间推算下一期的预计开奖时间"""
+        history = self._lucky8_history if game_type == 'lucky8' else self._marksix_history
+        latest = history.latest()
+        if not latest or not latest['timestamp']:
+            return None
+        try:
+            latest_time = datetime.strptime(str(latest['timestamp']), '%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            return None
+        return latest_time + timedelta(seconds=DRAW_PERIODS[game_type])
+
+    def _next_poll_delay(self, game_type: str, now: Optional[datetime] = None) -> float:
+        """
+        计算下一次轮询的等待秒数
+
+        - 距预计开奖时间窗口还早：睡到窗口开始（不超过 poll_max_sleep_seconds）
+        - 处于窗口内（预计时间前 window_before 到后 window_after）：高频轮询
+        - 开奖时间未知或已超出窗口仍无新期号：按 poll_idle_seconds 低频轮询
+        """
+        now = now or self._now()
+        expected = self._next_expected_draw_time(game_type)
+        if expected is None:
+            return self.poll_idle_seconds
+
+        window_start = expected - timedelta(seconds=self.poll_window_before_seconds)
+        window_end = expected + timedelta(seconds=self.poll_window_after_seconds)
+
+        if now < window_start:
+            return min((window_start - now).total_seconds(), self.poll_max_sleep_seconds)
+        if now <= window_end:
+            return self.poll_fast_seconds
+        return self.poll_idle_seconds
+
+    @staticmethod
+    def _format_marksix_issue(issue: str) -> str:
+        """处理期号：将最后一个逗号换成“特”"""
+        if issue and ',' in issue:
+            issue = issue[:issue.rfind(',')] + '特' + issue[issue.rfind(',') + 1:]
+        return issue
+
     async def fetch_lucky8_results(self) -> bool:
         """
         获取澳门快乐十分开奖数据
@@ -195,27 +593,38 @@ class DrawApiClient:
             bool: 是否成功获取数据
         """
         try:
-            url = f"{self.lucky8_api_base}/klsf/getHistoryLotteryInfo.do"
+            path = "/klsf/getHistoryLotteryInfo.do"
             params = {
                 'date': '',
                 'lotCode': '10011'
             }
 
-            logger.info("📡 正在获取澳门快乐十分开奖数据...")
-            data = await self._request(url, params=params)
+            logger.debug("📡 正在获取澳门快乐十分开奖数据...")
+            if self.provider:
+                data = await self.provider.fetch('lucky8')
+            else:
+                data = await self._hedged_request(
+                    'lucky8', self.lucky8_api_base, self.lucky8_api_base_secondary, path, params=params
+                )
+            if data is NOT_MODIFIED:
+                # 上游内容未变化，沿用已解析的数据
+                return len(self._lucky8_history) > 0
 
             if data and data.get('errorCode') == 0:
                 result = data.get('result', {})
                 result_data = result.get('data', [])
 
                 if result_data and len(result_data) > 0:
-                    self._lucky8_results = result_data
-                    self._latest_lucky8_draw = result_data[0]  # 最新的开奖结果
-
-                    logger.info(
-                        f"✅ 获取到 {len(self._lucky8_results)} 条快乐十分开奖记录，"
-                        f"最新期号: {self._latest_lucky8_draw.get('preDrawIssue')}"
+                    previous_issue = (self._latest_lucky8_draw or {}).get('preDrawIssue')
+                    self._ingest_lucky8(result_data)
+
+                    # 每次轮询都会执行：只在最新期号变化时按 INFO 记录
+                    latest_issue = self._latest_lucky8_draw.get('preDrawIssue')
+                    logger.log(
+                        logging.INFO if latest_issue != previous_issue else logging.DEBUG,
+                        f"✅ 获取到 {len(result_data)} 条快乐十分开奖记录，最新期号: {latest_issue}"
                     )
+                    await self._save_snapshot()
                     return True
 
             return False
@@ -236,22 +645,33 @@ class DrawApiClient:
         """
         try:
             current_year = datetime.now().year
-            url = f"{self.liuhecai_api_base}/history/macaujc2/y/{current_year}"
-
-            logger.info("📡 正在获取澳门六合彩开奖数据...")
-            data = await self._request(url)
+            path = f"/history/macaujc2/y/{current_year}"
+
+            logger.debug("📡 正在获取澳门六合彩开奖数据...")
+            if self.provider:
+                data = await self.provider.fetch('liuhecai')
+            else:
+                data = await self._hedged_request(
+                    'liuhecai', self.liuhecai_api_base, self.liuhecai_api_base_secondary, path
+                )
+            if data is NOT_MODIFIED:
+                # 上游内容未变化（整年历史无需重新下载解析）
+                return len(self._marksix_history) > 0
 
             if data and data.get('result') and data.get('data'):
                 draw_data = data.get('data', [])
 
                 if draw_data and len(draw_data) > 0:
-                    self._draw_results = draw_data
-                    self._latest_draw = draw_data[0]  # 最新的开奖结果
-
-                    logger.info(
-                        f"✅ 获取到 {len(self._draw_results)} 条澳门六合彩开奖记录，"
-                        f"最新期号: {self._latest_draw.get('expect')}"
+                    previous_issue = (self._latest_draw or {}).get('expect')
+                    self._ingest_marksix(draw_data)
+
+                    # 每次轮询都会执行：只在最新期号变化时按 INFO 记录
+                    latest_issue = self._latest_draw.get('expect')
+                    logger.log(
+                        logging.INFO if latest_issue != previous_issue else logging.DEBUG,
+                        f"✅ 获取到 {len(draw_data)} 条澳门六合彩开奖记录，最新期号: {latest_issue}"
                     )
+                    await self._save_snapshot()
                     return True
 
             return False
@@ -270,8 +690,11 @@ class DrawApiClient:
         """
         logger.info("🔄 开始获取开奖数据...")
 
-        lucky8_success = await self.fetch_lucky8_results()
-        draw_success = await self.fetch_draw_results()
+        # 两个数据源互不依赖，并发获取，启动耗时取决于较慢的一个
+        lucky8_success, draw_success = await asyncio.gather(
+            self.fetch_lucky8_results(),
+            self.fetch_draw_results()
+        )
 
         if lucky8_success:
             logger.info("✅ 快乐十分开奖数据初始化成功")
@@ -390,10 +813,7 @@ class DrawApiClient:
         # 第7位（索引6）是特码号码（1-49）
         special_number = numbers[6]
 
-        # 处理期号：将最后一个逗号换成"特"
-        issue = self._latest_draw.get('expect', '')
-        if issue and ',' in issue:
-            issue = issue[:issue.rfind(',')] + '特' + issue[issue.rfind(',') + 1:]
+        issue = self._format_marksix_issue(self._latest_draw.get('expect', ''))
 
         return {
             'draw_number': special_number,
@@ -415,37 +835,17 @@ class DrawApiClient:
         Returns:
             List[Dict]: 开奖记录数组
         """
-        if not self._lucky8_results:
-            return []
-
-        valid_draws = []
-
-        for draw in self._lucky8_results:
-            if len(valid_draws) >= limit:
-                break
-
-            numbers = self._parse_draw_numbers(draw.get('preDrawCode', ''))
-            draw_number = self._calculate_lucky8_result(numbers)
-
-            # 只添加有效的记录（draw_number 不为 None）
-            if draw_number is not None:
-                # 计算特码（第8位，如果没有则用最后一位）
-                special_number = None
-                if len(numbers) >= 8:
-                    special_number = numbers[7]
-                elif len(numbers) > 0:
-                    special_number = numbers[-1]
-
-                valid_draws.append({
-                    'issue': draw.get('preDrawIssue'),
-                    'draw_number': str(draw_number),  # 番数
-                    'draw_code': draw.get('preDrawCode'),
-                    'special_number': special_number,
-                    'timestamp': draw.get('preDrawTime'),
-                    'numbers': numbers
-                })
-
-        return valid_draws
+        return [
+            {
+                'issue': draw['issue'],
+                'draw_number': str(draw['draw_number']),  # 番数
+                'draw_code': draw['draw_code'],
+                'special_number': draw['special_number'],
+                'timestamp': draw['timestamp'],
+                'numbers': draw['numbers']
+            }
+            for draw in self._lucky8_history.recent(limit)
+        ]
 
     def get_recent_marksix_draws(self, limit: int = 15) -> List[Dict[str, Any]]:
         """
@@ -458,39 +858,17 @@ class DrawApiClient:
         Returns:
             List[Dict]: 开奖记录数组
         """
-        if not self._draw_results:
-            return []
-
-        valid_draws = []
-
-        for draw in self._draw_results:
-            if len(valid_draws) >= limit:
-                break
-
-            numbers = self._parse_draw_numbers(draw.get('openCode', ''))
-
-            # 六合彩需要7个号码
-            if len(numbers) != 7:
-                continue
-
-            # 第7位（索引6）是特码
-            special_number = numbers[6]
-
-            # 处理期号：将最后一个逗号换成"特"
-            issue = draw.get('expect', '')
-            if issue and ',' in issue:
-                issue = issue[:issue.rfind(',')] + '特' + issue[issue.rfind(',') + 1:]
-
-            valid_draws.append({
-                'issue': issue,
-                'draw_number': str(special_number),  # 特码
-                'draw_code': draw.get('openCode'),
-                'special_number': special_number,
-                'timestamp': draw.get('drawTime'),
-                'numbers': numbers
-            })
-
-        return valid_draws
+        return [
+            {
+                'issue': self._format_marksix_issue(draw['issue']),
+                'draw_number': str(draw['special_number']),  # 特码
+                'draw_code': draw['draw_code'],
+                'special_number': draw['special_number'],
+                'timestamp': draw['timestamp'],
+                'numbers': draw['numbers']
+            }
+            for draw in self._marksix_history.recent(limit)
+        ]
 
     async def start_auto_refresh(self, interval_minutes: int = 5):
         """
@@ -516,11 +894,48 @@ class DrawApiClient:
         # 创建后台任务
         self._refresh_task = asyncio.create_task(refresh_loop())
 
+    def start_adaptive_polling(self):
+        """
+        按游戏分别启动自适应轮询（替代固定间隔的 start_auto_refresh）
+        """
+        for game_type in DRAW_PERIODS:
+            if game_type in self._poll_tasks:
+                continue
+            self._poll_tasks[game_type] = asyncio.create_task(self._adaptive_poll_loop(game_type))
+        logger.info(
+            f"🔄 开启自适应轮询开奖数据（窗口内每 {self.poll_fast_seconds:g} 秒，"
+            f"窗口外最长 {self.poll_max_sleep_seconds:g} 秒）"
+        )
+
+    async def _adaptive_poll_loop(self, game_type: str):
+        """单个游戏的自适应轮询循环"""
+        fetch = self.fetch_lucky8_results if game_type == 'lucky8' else self.fetch_draw_results
+        while True:
+            try:
+                # 延迟按数据源时间计算，加速回放时按倍速缩短
+                await asyncio.sleep(max(self._next_poll_delay(game_type) / self.time_scale, 0.05))
+                if await fetch():
+                    self._last_refresh = datetime.now()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ {game_type} 自适应轮询失败: {str(e)}")
+
+    @property
+    def is_polling(self) -> bool:
+        """是否正在自适应轮询"""
+        return bool(self._poll_tasks)
+
     def stop_auto_refresh(self):
-        """停止自动刷新"""
+        """停止自动刷新（含自适应轮询）"""
         if self._refresh_task:
             self._refresh_task.cancel()
             logger.info("⏹️ 已停止自动刷新开奖数据")
+        for task in self._poll_tasks.values():
+            task.cancel()
+        if self._poll_tasks:
+            self._poll_tasks = {}
+            logger.info("⏹️ 已停止自适应轮询开奖数据")
 
     async def get_latest_lucky8_draw(self) -> Optional[Dict[str, Any]]:
         """
@@ -556,6 +971,64 @@ class DrawApiClient:
             'draw_time': datetime.now()
         }
 
+    def peek_new_result(self, game_type: str) -> Optional[Dict[str, Any]]:
+        """
+        已到达但尚未用于开奖的新一期结果（不刷新、不标记为已使用，供预结算使用）
+
+        Returns:
+            Dict: 与 get_draw_result 相同结构；最新期号已开过奖、尚无上一轮记录或为随机兜底时返回 None
+        """
+        if game_type not in DRAW_PERIODS:
+            return None
+        served = self._served_issues.get(game_type)
+        latest_issue = self._latest_issue(game_type)
+        if not served or not latest_issue or served[0] == latest_issue:
+            return None
+
+        if game_type == 'lucky8':
+            result = self.get_latest_lucky8_draw_number()
+        else:
+            result = self.get_latest_marksix_tema()
+        if result.get('is_random'):
+            return None
+        return {
+            'issue': result['issue'],
+            'draw_number': result['draw_number'],
+            'draw_code': result['draw_code'],
+            'special_number': result['special_number'],
+        }
+
+    async def peek_latest_issue(self, game_type: str) -> Optional[str]:
+        """
+        当前最新期号（供下注确认消息展示）
+
+        不等待新期号、不标记为已使用，开奖流程仍只通过 get_draw_result 推进；
+        未启用轮询时先刷新一次数据，与之前下注时的行为一致
+
+        Returns:
+            str: 期号；不支持的游戏类型或无真实数据时返回 None
+        """
+        if game_type not in DRAW_PERIODS:
+            return None
+        if not self.is_polling:
+            if game_type == 'lucky8':
+                await self.fetch_lucky8_results()
+            else:
+                await self.fetch_draw_results()
+
+        if game_type == 'lucky8':
+            result = self.get_latest_lucky8_draw_number()
+        else:
+            result = self.get_latest_marksix_tema()
+        if result.get('is_random'):
+            return None
+        return result.get('issue')
+
+    def get_served_issue(self, game_type: str) -> Optional[str]:
+        """最近一次开奖使用的上游原始期号"""
+        served = self._served_issues.get(game_type)
+        return served[0] if served else None
+
     async def get_draw_result(self, game_type: str, force_refresh: bool = True) -> Optional[Dict[str, Any]]:
         """
         根据游戏类型获取最新开奖结果（统一接口）
@@ -567,13 +1040,33 @@ class DrawApiClient:
         Returns:
             Dict: 开奖数据
         """
-        # 在获取结果前先刷新数据，确保拿到最新的开奖号码
-        if force_refresh:
+        if self.is_polling and game_type in DRAW_PERIODS:
+            # 轮询已保持数据新鲜，无需每个群聊各请求一次上游；
+            # 若最新期号已在上一轮开奖用过，说明上游结果尚未到达，等待轮询拿到新期号
+            latest_issue = self._latest_issue(game_type)
+            served = self._served_issues.get(game_type)
+            if served and served[0] == latest_issue:
+                served_age = (datetime.now() - served[1]).total_seconds() * self.time_scale
+                if served_age > DRAW_PERIODS[game_type] / 2:
+                    logger.info(f"⏳ {game_type} 期号 {latest_issue} 已开过奖，等待新期号...")
+                    wait_seconds = self.wait_new_issue_seconds / self.time_scale
+                    if not await self.wait_for_new_issue(game_type, latest_issue, wait_seconds):
+                        logger.warning(f"⚠️ {game_type} 等待新期号超时，使用当前最新数据")
+                        # 本轮其余群聊不再重复等待
+                        self._served_issues[game_type] = (latest_issue, datetime.now())
+        elif force_refresh:
+            # 在获取结果前先刷新数据，确保拿到最新的开奖号码
             if game_type == 'lucky8':
                 await self.fetch_lucky8_results()
             elif game_type == 'liuhecai':
                 await self.fetch_draw_results()
 
+        if game_type in DRAW_PERIODS:
+            latest_issue = self._latest_issue(game_type)
+            served = self._served_issues.get(game_type)
+            if latest_issue and (not served or served[0] != latest_issue):
+                self._served_issues[game_type] = (latest_issue, datetime.now())
+
         if game_type == 'lucky8':
             return await self.get_latest_lucky8_draw()
         elif game_type == 'liuhecai':
@@ -613,15 +1106,21 @@ class DrawApiClient:
         lucky8_info = self.get_latest_lucky8_draw_number()
         marksix_info = self.get_latest_marksix_tema()
 
+        snapshot_age = None
+        if self._snapshot_saved_at:
+            snapshot_age = int((datetime.now() - self._snapshot_saved_at).total_seconds())
+
         return {
+            'snapshot_age_seconds': snapshot_age,
+            'providers': self.get_provider_stats(),
             'lucky8': {
-                'total_records': len(self._lucky8_results),
+                'total_records': len(self._lucky8_history),
                 'latest_issue': lucky8_info.get('issue'),
                 'latest_draw_number': lucky8_info.get('draw_number'),
                 'last_refresh': self._last_refresh.isoformat() if self._last_refresh else None
             },
             'markSix': {
-                'total_records': len(self._draw_results),
+                'total_records': len(self._marksix_history),
                 'latest_issue': marksix_info.get('issue'),
                 'latest_tema': marksix_info.get('special_number'),
                 'last_refresh': self._last_refresh.isoformat() if self._last_refresh else None
@@ -0,0 +1,77 @@
+"""
+开奖历史存储
+每条记录在写入时只解析一次，号码/番数/特码按定长数组存放，
+最新一期与最近N期均可直接按下标读取
+"""
+from array import array
+from typing import Dict, Any, List, Optional, Sequence
+
+
+class DrawHistoryStore:
+    """
+    定长数组形式的开奖历史（按上游顺序，下标0为最新一期）
+
+    - issues / timestamps / draw_codes: 原始字符串
+    - numbers: 每行 width 个号码（不足补0，实际个数见 counts）
+    - draw_numbers: 番数（幸运8）或特码（六合彩）
+    - specials: 特码
+    """
+
+    def __init__(self, width: int):
+        self.width = width
+        self._issues: List[str] = []
+        self._timestamps: List[Optional[str]] = []
+        self._draw_codes: List[str] = []
+        self._numbers = array('B')
+        self._counts = array('B')
+        self._draw_numbers = array('B')
+        self._specials = array('B')
+
+    def __len__(self) -> int:
+        return len(self._issues)
+
+    def replace(self, rows: Sequence[Dict[str, Any]]):
+        """
+        整体替换历史数据（上游每次返回完整列表）
+
+        Args:
+            rows: 已解析的记录，包含 issue/timestamp/draw_code/numbers/draw_number/special_number
+        """
+        store = DrawHistoryStore(self.width)
+        for row in rows:
+            store._append(row)
+        # 构建完成后一次性替换，读取方不会看到半成品
+        self.__dict__.update(store.__dict__)
+
+    def _append(self, row: Dict[str, Any]):
+        numbers = list(row['numbers'])[:self.width]
+        self._issues.append(row['issue'])
+        self._timestamps.append(row.get('timestamp'))
+        self._draw_codes.append(row['draw_code'])
+        self._numbers.extend(numbers + [0] * (self.width - len(numbers)))
+        self._counts.append(len(numbers))
+        self._draw_numbers.append(row['draw_number'])
+        self._specials.append(row['special_number'] or 0)
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """读取第 index 行（0为最新一期）"""
+        start = index * self.width
+        count = self._counts[index]
+        return {
+            'issue': self._issues[index],
+            'timestamp': self._timestamps[index],
+            'draw_code': self._draw_codes[index],
+            'numbers': self._numbers[start:start + count].tolist(),
+            'draw_number': self._draw_numbers[index],
+            'special_number': self._specials[index],
+        }
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """最新一期，无数据返回 None"""
+        if not self._issues:
+            return None
+        return self.row(0)
+
+    def recent(self, limit: int) -> List[Dict[str, Any]]:
+        """最近 limit 期（新到旧）"""
+        return [self.row(i) for i in range(min(limit, len(self._issues)))]
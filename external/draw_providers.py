@@ -0,0 +1,176 @@
+"""
+开奖数据源
+DrawApiClient 默认直接请求真实开奖API；配置 DRAW_PROVIDER=offline 时改用离线数据源，
+用于无网络环境和压测（可按 DRAW_OFFLINE_SPEED 倍速推进开奖）
+
+离线数据源两种模式：
+- 回放：DRAW_OFFLINE_REPLAY_FILE 指向录制的开奖数据（与开奖缓存快照格式相同，
+  {"lucky8": [...], "liuhecai": [...]}，新到旧），按录制的开奖时间依次放出
+- 合成：未配置回放文件时，按 DRAW_OFFLINE_SEED 生成确定性的开奖号码
+"""
+import abc
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+
+# 各游戏开奖周期（秒）
+PERIODS = {
+    'lucky8': 300,
+    'liuhecai': 86400,
+}
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class DrawProvider(abc.ABC):
+    """开奖数据源接口：返回与真实API相同格式的响应"""
+
+    # 时间倍速（1 = 真实速度）
+    time_scale: float = 1.0
+
+    def now(self) -> datetime:
+        """数据源的当前时间（离线数据源为虚拟时间）"""
+        return datetime.now()
+
+    @abc.abstractmethod
+    async def fetch(self, game_type: str) -> Optional[Dict[str, Any]]:
+        """
+        获取开奖数据
+
+        Args:
+            game_type: lucky8 / liuhecai
+
+        Returns:
+            Dict: lucky8 为 {'errorCode': 0, 'result': {'data': [...]}}，
+                  liuhecai 为 {'result': True, 'data': [...]}；失败返回 None
+        """
+
+    async def close(self):
+        pass
+
+
+def wrap_payload(game_type: str, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """按真实API的响应结构包装开奖记录"""
+    if game_type == 'lucky8':
+        return {'errorCode': 0, 'result': {'data': rows}}
+    return {'result': True, 'data': rows}
+
+
+class OfflineDrawProvider(DrawProvider):
+    """离线开奖数据源（回放录制数据或确定性合成）"""
+
+    def __init__(
+        self,
+        replay_file: Optional[str] = None,
+        speed: float = 1.0,
+        seed: int = 0,
+        history_size: int = 100,
+        start_time: Optional[datetime] = None
+    ):
+        self.time_scale = max(speed, 0.001)
+        self.seed = seed
+        self.history_size = history_size
+        self._real_start = datetime.now()
+        self._virtual_start = start_time or self._real_start
+
+        # 回放数据：{game_type: [(开奖时间, 原始记录)]}，旧到新
+        self._replay: Optional[Dict[str, List[tuple]]] = None
+        if replay_file:
+            self._load_replay(replay_file)
+
+    def _load_replay(self, replay_file: str):
+        with open(replay_file, 'r', encoding='utf-8') as f:
+            recorded = json.load(f)
+
+        time_keys = {'lucky8': 'preDrawTime', 'liuhecai': 'drawTime'}
+        self._replay = {}
+        for game_type, time_key in time_keys.items():
+            rows = []
+            for row in recorded.get(game_type) or []:
+                try:
+                    rows.append((datetime.strptime(str(row.get(time_key)), TIME_FORMAT), row))
+                except ValueError:
+                    continue
+            rows.sort(key=lambda item: item[0])
+            self._replay[game_type] = rows
+
+        # 虚拟时钟从录制数据中间开始：启动时已有一半历史，其余按录制时间依次放出
+        lucky8_rows = self._replay.get('lucky8') or []
+        if lucky8_rows:
+            self._virtual_start = lucky8_rows[len(lucky8_rows) // 2][0]
+
+    def now(self) -> datetime:
+        elapsed = (datetime.now() - self._real_start).total_seconds()
+        return self._virtual_start + timedelta(seconds=elapsed * self.time_scale)
+
+    async def fetch(self, game_type: str) -> Optional[Dict[str, Any]]:
+        if game_type not in PERIODS:
+            return None
+        if self._replay is not None:
+            rows = self._replayed_rows(game_type)
+        else:
+            rows = self.synthetic_rows(game_type, self.now())
+        if not rows:
+            return None
+        return wrap_payload(game_type, rows)
+
+    def _replayed_rows(self, game_type: str) -> List[Dict[str, Any]]:
+        """截至虚拟当前时间已开出的录制记录（新到旧）"""
+        now = self.now()
+        visible = [row for draw_time, row in self._replay.get(game_type, []) if draw_time <= now]
+        return list(reversed(visible[-self.history_size:]))
+
+    def synthetic_rows(self, game_type: str, now: datetime) -> List[Dict[str, Any]]:
+        """生成截至 now 的最近 history_size 期合成开奖记录（新到旧，同一期号号码固定）"""
+        period = PERIODS[game_type]
+        latest_slot = int(now.timestamp()) // period
+        rows = []
+        for slot in range(latest_slot, latest_slot - self.history_size, -1):
+            draw_time = datetime.fromtimestamp(slot * period)
+            rng = random.Random(f"{self.seed}:{game_type}:{slot}")
+            if game_type == 'lucky8':
+                issue = f"{draw_time:%Y%m%d}{(draw_time.hour * 3600 + draw_time.minute * 60) // period + 1:03d}"
+                numbers = rng.sample(range(1, 21), 8)
+                rows.append({
+                    'preDrawIssue': issue,
+                    'preDrawCode': ','.join(str(n) for n in numbers),
+                    'preDrawTime': draw_time.strftime(TIME_FORMAT),
+                })
+            else:
+                issue = f"{draw_time:%Y}{draw_time.timetuple().tm_yday:03d}"
+                numbers = rng.sample(range(1, 50), 7)
+                rows.append({
+                    'expect': issue,
+                    'openCode': ','.join(str(n) for n in numbers),
+                    'drawTime': draw_time.strftime(TIME_FORMAT),
+                })
+        return rows
+
+
+def get_time_scale() -> float:
+    """当前配置的时间倍速（仅离线数据源生效）"""
+    if os.getenv('DRAW_PROVIDER', 'http') != 'offline':
+        return 1.0
+    return max(float(os.getenv('DRAW_OFFLINE_SPEED', '1')), 0.001)
+
+
+def create_draw_provider() -> Optional[DrawProvider]:
+    """
+    按配置创建数据源
+
+    Returns:
+        DrawProvider: DRAW_PROVIDER=offline 时返回离线数据源；默认返回 None（直接请求真实API）
+    """
+    provider = os.getenv('DRAW_PROVIDER', 'http')
+    if provider == 'offline':
+        return OfflineDrawProvider(
+            replay_file=os.getenv('DRAW_OFFLINE_REPLAY_FILE') or None,
+            speed=get_time_scale(),
+            seed=int(os.getenv('DRAW_OFFLINE_SEED', '0')),
+        )
+    if provider != 'http':
+        raise ValueError(f"不支持的开奖数据源: {provider}")
+    return None
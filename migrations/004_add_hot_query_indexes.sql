@@ -0,0 +1,333 @@
+-- ============================================
+-- 004: 热点查询复合索引（安全版本 - 可重复执行）
+-- 执行方式：mysql -u root -p game_bot < migrations/004_add_hot_query_indexes.sql
+-- 执行后校验：python migrations/check_query_plans.py
+-- 日期：2026-10-19
+-- ============================================
+--
+-- 单列索引（user_id / chat_id / issue / created_at）无法同时覆盖
+-- 等值过滤 + 排序，MySQL 只能选其一，再回表过滤并 filesort。
+-- 以下复合索引按“等值列在前、排序/范围列在后”的顺序建立，
+-- 与 biz/all_tables.py 中的 __table_args__ 保持一致。
+
+USE game_bot;
+
+-- ============================================
+-- 1. bets
+-- ============================================
+
+-- 群聊待结算投注（get_all_pending_bets）
+SET @idx_exists = 0;
+SELECT COUNT(*) INTO @idx_exists
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'bets'
+  AND INDEX_NAME = 'idx_bets_chat_pending';
+
+SET @sql = IF(@idx_exists = 0,
+  'CREATE INDEX idx_bets_chat_pending ON bets (chat_id, status, result, created_at)',
+  'SELECT ''✓ Index idx_bets_chat_pending already exists on bets'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- 用户待结算投注（get_user_all_pending_bets / 取消下注）
+SET @idx_exists = 0;
+SELECT COUNT(*) INTO @idx_exists
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'bets'
+  AND INDEX_NAME = 'idx_bets_user_chat_pending';
+
+SET @sql = IF(@idx_exists = 0,
+  'CREATE INDEX idx_bets_user_chat_pending ON bets (user_id, chat_id, status, result, created_at)',
+  'SELECT ''✓ Index idx_bets_user_chat_pending already exists on bets'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- 某期待结算投注（get_pending_bets_by_issue）
+SET @idx_exists = 0;
+SELECT COUNT(*) INTO @idx_exists
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'bets'
+  AND INDEX_NAME = 'idx_bets_chat_issue_pending';
+
+SET @sql = IF(@idx_exists = 0,
+  'CREATE INDEX idx_bets_chat_issue_pending ON bets (chat_id, issue, status, result, created_at)',
+  'SELECT ''✓ Index idx_bets_chat_issue_pending already exists on bets'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- 全局待结算投注（get_pending_bets）
+SET @idx_exists = 0;
+SELECT COUNT(*) INTO @idx_exists
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'bets'
+  AND INDEX_NAME = 'idx_bets_pending_created';
+
+SET @sql = IF(@idx_exists = 0,
+  'CREATE INDEX idx_bets_pending_created ON bets (status, result, created_at)',
+  'SELECT ''✓ Index idx_bets_pending_created already exists on bets'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- 流水/投注记录（get_user_bets_since / get_user_bets）
+SET @idx_exists = 0;
+SELECT COUNT(*) INTO @idx_exists
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'bets'
+  AND INDEX_NAME = 'idx_bets_user_chat_created';
+
+SET @sql = IF(@idx_exists = 0,
+  'CREATE INDEX idx_bets_user_chat_created ON bets (user_id, chat_id, created_at)',
+  'SELECT ''✓ Index idx_bets_user_chat_created already exists on bets'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- 群聊投注记录（get_chat_bets）
+SET @idx_exists = 0;
+SELECT COUNT(*) INTO @idx_exists
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'bets'
+  AND INDEX_NAME = 'idx_bets_chat_created';
+
+SET @sql = IF(@idx_exists = 0,
+  'CREATE INDEX idx_bets_chat_created ON bets (chat_id, created_at)',
+  'SELECT ''✓ Index idx_bets_chat_created already exists on bets'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- ============================================
+-- 2. draw_history
+-- ============================================
+
+-- 期号查重（get_draw_by_issue / exists_issue）
+SET @idx_exists = 0;
+SELECT COUNT(*) INTO @idx_exists
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'draw_history'
+  AND INDEX_NAME = 'idx_draw_issue_game_chat';
+
+SET @sql = IF(@idx_exists = 0,
+  'CREATE INDEX idx_draw_issue_game_chat ON draw_history (issue, game_type, chat_id)',
+  'SELECT ''✓ Index idx_draw_issue_game_chat already exists on draw_history'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- 最新/最近开奖（get_latest_draw / get_recent_draws）
+SET @idx_exists = 0;
+SELECT COUNT(*) INTO @idx_exists
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'draw_history'
+  AND INDEX_NAME = 'idx_draw_game_chat_ts';
+
+SET @sql = IF(@idx_exists = 0,
+  'CREATE INDEX idx_draw_game_chat_ts ON draw_history (game_type, chat_id, timestamp)',
+  'SELECT ''✓ Index idx_draw_game_chat_ts already exists on draw_history'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- 最近开奖（不限游戏类型）
+SET @idx_exists = 0;
+SELECT COUNT(*) INTO @idx_exists
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'draw_history'
+  AND INDEX_NAME = 'idx_draw_chat_ts';
+
+SET @sql = IF(@idx_exists = 0,
+  'CREATE INDEX idx_draw_chat_ts ON draw_history (chat_id, timestamp)',
+  'SELECT ''✓ Index idx_draw_chat_ts already exists on draw_history'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- 开奖列表/按日期查询（get_draw_history / get_draw_history_by_date）
+SET @idx_exists = 0;
+SELECT COUNT(*) INTO @idx_exists
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'draw_history'
+  AND INDEX_NAME = 'idx_draw_game_ts';
+
+SET @sql = IF(@idx_exists = 0,
+  'CREATE INDEX idx_draw_game_ts ON draw_history (game_type, timestamp)',
+  'SELECT ''✓ Index idx_draw_game_ts already exists on draw_history'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- 当日最新期号（get_latest_draw_by_date）
+SET @idx_exists = 0;
+SELECT COUNT(*) INTO @idx_exists
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'draw_history'
+  AND INDEX_NAME = 'idx_draw_game_issue';
+
+SET @sql = IF(@idx_exists = 0,
+  'CREATE INDEX idx_draw_game_issue ON draw_history (game_type, issue)',
+  'SELECT ''✓ Index idx_draw_game_issue already exists on draw_history'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- ============================================
+-- 3. users
+-- ============================================
+
+-- 群内用户列表（get_chat_users）
+SET @idx_exists = 0;
+SELECT COUNT(*) INTO @idx_exists
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'users'
+  AND INDEX_NAME = 'idx_users_chat_created';
+
+SET @sql = IF(@idx_exists = 0,
+  'CREATE INDEX idx_users_chat_created ON users (chat_id, created_at)',
+  'SELECT ''✓ Index idx_users_chat_created already exists on users'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- 排行榜（get_leaderboard）
+SET @idx_exists = 0;
+SELECT COUNT(*) INTO @idx_exists
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'users'
+  AND INDEX_NAME = 'idx_users_chat_status_balance';
+
+SET @sql = IF(@idx_exists = 0,
+  'CREATE INDEX idx_users_chat_status_balance ON users (chat_id, status, balance)',
+  'SELECT ''✓ Index idx_users_chat_status_balance already exists on users'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- 新用户列表（get_new_users）
+SET @idx_exists = 0;
+SELECT COUNT(*) INTO @idx_exists
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'users'
+  AND INDEX_NAME = 'idx_users_chat_new_created';
+
+SET @sql = IF(@idx_exists = 0,
+  'CREATE INDEX idx_users_chat_new_created ON users (chat_id, is_new, created_at)',
+  'SELECT ''✓ Index idx_users_chat_new_created already exists on users'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- ============================================
+-- 4. bet_orders
+-- ============================================
+
+-- 报表：按时间段汇总已结算注单
+SET @idx_exists = 0;
+SELECT COUNT(*) INTO @idx_exists
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'bet_orders'
+  AND INDEX_NAME = 'idx_bet_orders_status_time';
+
+SET @sql = IF(@idx_exists = 0,
+  'CREATE INDEX idx_bet_orders_status_time ON bet_orders (status, bet_time)',
+  'SELECT ''✓ Index idx_bet_orders_status_time already exists on bet_orders'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- 会员注单列表
+SET @idx_exists = 0;
+SELECT COUNT(*) INTO @idx_exists
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'bet_orders'
+  AND INDEX_NAME = 'idx_bet_orders_user_time';
+
+SET @sql = IF(@idx_exists = 0,
+  'CREATE INDEX idx_bet_orders_user_time ON bet_orders (user_id, bet_time)',
+  'SELECT ''✓ Index idx_bet_orders_user_time already exists on bet_orders'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- ============================================
+-- 5. transactions
+-- ============================================
+
+-- 财务总报表
+SET @idx_exists = 0;
+SELECT COUNT(*) INTO @idx_exists
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'transactions'
+  AND INDEX_NAME = 'idx_transactions_status_time';
+
+SET @sql = IF(@idx_exists = 0,
+  'CREATE INDEX idx_transactions_status_time ON transactions (status, transaction_time)',
+  'SELECT ''✓ Index idx_transactions_status_time already exists on transactions'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- 存取款报表
+SET @idx_exists = 0;
+SELECT COUNT(*) INTO @idx_exists
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'transactions'
+  AND INDEX_NAME = 'idx_transactions_type_time';
+
+SET @sql = IF(@idx_exists = 0,
+  'CREATE INDEX idx_transactions_type_time ON transactions (transaction_type, transaction_time)',
+  'SELECT ''✓ Index idx_transactions_type_time already exists on transactions'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- ============================================
+-- 6. account_changes
+-- ============================================
+
+-- 会员/代理账变列表
+SET @idx_exists = 0;
+SELECT COUNT(*) INTO @idx_exists
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'account_changes'
+  AND INDEX_NAME = 'idx_account_changes_user_created';
+
+SET @sql = IF(@idx_exists = 0,
+  'CREATE INDEX idx_account_changes_user_created ON account_changes (user_id, created_at)',
+  'SELECT ''✓ Index idx_account_changes_user_created already exists on account_changes'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- ============================================
+-- 验证
+-- ============================================
+SELECT TABLE_NAME, INDEX_NAME, GROUP_CONCAT(COLUMN_NAME ORDER BY SEQ_IN_INDEX) AS columns
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND INDEX_NAME LIKE 'idx\_%'
+  AND TABLE_NAME IN ('bets', 'draw_history', 'users', 'bet_orders', 'transactions', 'account_changes')
+GROUP BY TABLE_NAME, INDEX_NAME
+ORDER BY TABLE_NAME, INDEX_NAME;
@@ -0,0 +1,22 @@
+-- ============================================
+-- 冷热数据归档：创建冷表（可重复执行）
+-- 执行方式：mysql -u root -p game_bot < migrations/005_create_archive_tables.sql
+-- 冷表结构与热表一致（含 004 的复合索引），由 ArchiveService 定期迁移已结算的历史数据
+-- 应用启动后 ArchiveService 也会自动执行同样的 CREATE TABLE IF NOT EXISTS
+-- ============================================
+
+USE game_bot;
+
+CREATE TABLE IF NOT EXISTS bets_archive LIKE bets;
+CREATE TABLE IF NOT EXISTS bet_orders_archive LIKE bet_orders;
+CREATE TABLE IF NOT EXISTS draw_history_archive LIKE draw_history;
+CREATE TABLE IF NOT EXISTS account_changes_archive LIKE account_changes;
+
+-- ============================================
+-- 迁移完成验证
+-- ============================================
+SELECT '✅ 归档冷表创建完成！' AS status;
+SELECT 'bets_archive' AS check_item, COUNT(*) AS archived_rows FROM bets_archive;
+SELECT 'bet_orders_archive' AS check_item, COUNT(*) AS archived_rows FROM bet_orders_archive;
+SELECT 'draw_history_archive' AS check_item, COUNT(*) AS archived_rows FROM draw_history_archive;
+SELECT 'account_changes_archive' AS check_item, COUNT(*) AS archived_rows FROM account_changes_archive;
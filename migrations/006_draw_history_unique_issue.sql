@@ -0,0 +1,73 @@
+-- ============================================
+-- 006: draw_history 唯一键 (game_type, chat_id, issue)（安全版本 - 可重复执行）
+-- 执行方式：mysql -u root -p game_bot < migrations/006_draw_history_unique_issue.sql
+-- 日期：2026-10-19
+-- ============================================
+--
+-- 历史开奖同步改为批量 INSERT IGNORE（DrawRepository.upsert_many），
+-- 开奖记录写入改为 ON DUPLICATE KEY UPDATE，均依赖该唯一键去重。
+-- 唯一键同时覆盖 exists_issue / get_draw_by_issue 的等值查询，
+-- 因此删除 004 中的 idx_draw_issue_game_chat。
+
+USE game_bot;
+
+-- ============================================
+-- 1. 清理重复记录（同一群同一期只保留最早一条）
+-- ============================================
+-- 随机开奖的期号均为 random，同一群的多条记录是各次不同的开奖而非重复：
+-- 除最早一条外先移入冷表保存，再与真正的重复记录一起从热表删除
+CREATE TABLE IF NOT EXISTS draw_history_archive LIKE draw_history;
+
+INSERT IGNORE INTO draw_history_archive
+SELECT d1.* FROM draw_history d1
+WHERE d1.issue = 'random'
+  AND EXISTS (
+    SELECT 1 FROM draw_history d2
+    WHERE d2.game_type = d1.game_type
+      AND d2.chat_id = d1.chat_id
+      AND d2.issue = d1.issue
+      AND d2.id < d1.id
+  );
+
+DELETE d1 FROM draw_history d1
+JOIN draw_history d2
+  ON d1.game_type = d2.game_type
+ AND d1.chat_id = d2.chat_id
+ AND d1.issue = d2.issue
+ AND d1.id > d2.id;
+
+-- ============================================
+-- 2. 添加唯一键
+-- ============================================
+SET @idx_exists = 0;
+SELECT COUNT(*) INTO @idx_exists
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'draw_history'
+  AND INDEX_NAME = 'uq_draw_game_chat_issue';
+
+SET @sql = IF(@idx_exists = 0,
+  'ALTER TABLE draw_history ADD UNIQUE KEY uq_draw_game_chat_issue (game_type, chat_id, issue)',
+  'SELECT ''✓ Unique key uq_draw_game_chat_issue already exists on draw_history'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- ============================================
+-- 3. 删除被唯一键替代的索引
+-- ============================================
+SET @idx_exists = 0;
+SELECT COUNT(*) INTO @idx_exists
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'draw_history'
+  AND INDEX_NAME = 'idx_draw_issue_game_chat';
+
+SET @sql = IF(@idx_exists > 0,
+  'DROP INDEX idx_draw_issue_game_chat ON draw_history',
+  'SELECT ''✓ Index idx_draw_issue_game_chat already dropped'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SELECT '✅ 006 迁移完成！' AS status;
@@ -0,0 +1,93 @@
+-- ============================================
+-- 007: 开奖记录按期全局存储 + draw_chat_results 关联表（安全版本 - 可重复执行）
+-- 执行方式：mysql -u root -p game_bot < migrations/007_global_draw_history.sql
+-- 日期：2026-10-19
+-- ============================================
+--
+-- 此前每个群每期开奖都会写一条 draw_history，历史同步再写一条 chat_id='system'，
+-- 同一期号码完全相同却重复存储。改为：
+-- - draw_history 每期只保留一条全局记录（chat_id='system'）
+-- - 各群的投注数量、结算状态记录在 draw_chat_results
+-- 已归档的 draw_history_archive 同样去重（按日期查询合并冷表且不过滤 chat_id，否则每期重复 N 条）
+
+USE game_bot;
+
+-- ============================================
+-- 1. 创建关联表
+-- ============================================
+CREATE TABLE IF NOT EXISTS draw_chat_results (
+  id INT NOT NULL AUTO_INCREMENT,
+  draw_id INT NULL COMMENT 'draw_history.id（随机开奖无全局记录时为空）',
+  chat_id VARCHAR(255) NOT NULL COMMENT '群聊ID',
+  game_type VARCHAR(255) NOT NULL DEFAULT 'lucky8' COMMENT '游戏类型',
+  issue VARCHAR(255) NOT NULL COMMENT '期号',
+  bet_count INT NOT NULL DEFAULT 0 COMMENT '本期结算的投注数量',
+  status VARCHAR(255) NOT NULL DEFAULT 'drawn' COMMENT 'drawn/settled',
+  created_at DATETIME NOT NULL,
+  updated_at DATETIME NOT NULL,
+  PRIMARY KEY (id),
+  UNIQUE KEY uq_draw_chat_issue (chat_id, game_type, issue),
+  KEY idx_draw_chat_game_issue (game_type, issue)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ============================================
+-- 2. 补齐全局记录（群聊写过但历史同步未写入的期号，取最早一条）
+-- ============================================
+INSERT IGNORE INTO draw_history (
+  draw_number, issue, draw_code, game_type, is_random,
+  chat_id, bet_count, timestamp, special_number, created_at
+)
+SELECT draw_number, issue, draw_code, game_type, is_random,
+       'system', 0, timestamp, special_number, created_at
+FROM draw_history
+WHERE chat_id <> 'system' AND issue <> 'random'
+ORDER BY id;
+
+-- ============================================
+-- 3. 回填关联记录（历史开奖均已结算）
+-- ============================================
+INSERT IGNORE INTO draw_chat_results (
+  draw_id, chat_id, game_type, issue, bet_count, status, created_at, updated_at
+)
+SELECT g.id, d.chat_id, d.game_type, d.issue, d.bet_count, 'settled', d.created_at, d.created_at
+FROM draw_history d
+LEFT JOIN draw_history g
+  ON g.game_type = d.game_type
+ AND g.issue = d.issue
+ AND g.chat_id = 'system'
+WHERE d.chat_id <> 'system';
+
+-- ============================================
+-- 4. 删除按群重复的开奖记录
+-- ============================================
+DELETE FROM draw_history WHERE chat_id <> 'system';
+
+-- ============================================
+-- 5. 冷表去重（每期只保留一条 chat_id='system'）
+-- ============================================
+CREATE TABLE IF NOT EXISTS draw_history_archive LIKE draw_history;
+
+-- 冷表和热表都没有全局记录的期号：最早一条改为全局记录
+UPDATE draw_history_archive a
+JOIN (
+  SELECT c.game_type, c.issue, MIN(c.id) AS keep_id
+  FROM draw_history_archive c
+  WHERE c.issue <> 'random'
+    AND NOT EXISTS (
+      SELECT 1 FROM draw_history h
+      WHERE h.game_type = c.game_type AND h.issue = c.issue AND h.chat_id = 'system'
+    )
+  GROUP BY c.game_type, c.issue
+  HAVING SUM(c.chat_id = 'system') = 0
+) k ON a.id = k.keep_id
+SET a.chat_id = 'system';
+
+DELETE FROM draw_history_archive WHERE chat_id <> 'system';
+
+-- ============================================
+-- 迁移完成验证
+-- ============================================
+SELECT '✅ 007 迁移完成！' AS status;
+SELECT 'draw_history' AS check_item, COUNT(*) AS total_rows FROM draw_history;
+SELECT 'draw_history_archive' AS check_item, COUNT(*) AS total_rows FROM draw_history_archive;
+SELECT 'draw_chat_results' AS check_item, COUNT(*) AS total_rows FROM draw_chat_results;
@@ -0,0 +1,65 @@
+-- ============================================
+-- 008: draw_history 开奖指标列（安全版本 - 可重复执行）
+-- 执行方式：mysql -u root -p game_bot < migrations/008_add_draw_metrics_columns.sql
+-- 执行后回填：python migrations/backfill_draw_metrics.py
+-- 日期：2026-10-19
+-- ============================================
+--
+-- 开奖结果接口（/api/lottery/results）此前每次请求对每一行重新解析 draw_code
+-- 并计算冠亚和/大小/单双/五组龙虎。改为写入时计算一次（biz/draw/metrics.py），
+-- 接口直接读取以下列。draw_history_archive 通过 UNION ALL 与热表合并查询，
+-- 两表列必须一致，因此冷表（如已创建）同步加列。
+
+USE game_bot;
+
+-- ============================================
+-- 1. draw_history
+-- ============================================
+SET @col_exists = 0;
+SELECT COUNT(*) INTO @col_exists
+FROM INFORMATION_SCHEMA.COLUMNS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'draw_history'
+  AND COLUMN_NAME = 'numbers_packed';
+
+SET @sql = IF(@col_exists = 0,
+  'ALTER TABLE draw_history
+     ADD COLUMN numbers_packed VARCHAR(255) NULL DEFAULT NULL COMMENT ''开奖号码定长编码（每个号码两位）'' AFTER special_number,
+     ADD COLUMN champion_sum INT NULL DEFAULT NULL COMMENT ''冠亚和'' AFTER numbers_packed,
+     ADD COLUMN champion_size VARCHAR(255) NULL DEFAULT NULL COMMENT ''冠亚和大小'' AFTER champion_sum,
+     ADD COLUMN champion_parity VARCHAR(255) NULL DEFAULT NULL COMMENT ''冠亚和单双'' AFTER champion_size,
+     ADD COLUMN dragon_tiger VARCHAR(255) NULL DEFAULT NULL COMMENT ''五组龙虎'' AFTER champion_parity',
+  'SELECT ''✓ Metrics columns already exist in draw_history'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- ============================================
+-- 2. draw_history_archive（仅冷表已存在且缺列时）
+-- ============================================
+SET @table_exists = 0;
+SELECT COUNT(*) INTO @table_exists
+FROM INFORMATION_SCHEMA.TABLES
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'draw_history_archive';
+
+SET @col_exists = 0;
+SELECT COUNT(*) INTO @col_exists
+FROM INFORMATION_SCHEMA.COLUMNS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'draw_history_archive'
+  AND COLUMN_NAME = 'numbers_packed';
+
+SET @sql = IF(@table_exists = 1 AND @col_exists = 0,
+  'ALTER TABLE draw_history_archive
+     ADD COLUMN numbers_packed VARCHAR(255) NULL DEFAULT NULL COMMENT ''开奖号码定长编码（每个号码两位）'' AFTER special_number,
+     ADD COLUMN champion_sum INT NULL DEFAULT NULL COMMENT ''冠亚和'' AFTER numbers_packed,
+     ADD COLUMN champion_size VARCHAR(255) NULL DEFAULT NULL COMMENT ''冠亚和大小'' AFTER champion_sum,
+     ADD COLUMN champion_parity VARCHAR(255) NULL DEFAULT NULL COMMENT ''冠亚和单双'' AFTER champion_size,
+     ADD COLUMN dragon_tiger VARCHAR(255) NULL DEFAULT NULL COMMENT ''五组龙虎'' AFTER champion_parity',
+  'SELECT ''✓ draw_history_archive absent or already migrated'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SELECT '✅ 008 迁移完成！请执行 python migrations/backfill_draw_metrics.py 回填已有记录' AS status;
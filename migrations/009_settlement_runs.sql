@@ -0,0 +1,55 @@
+-- ============================================
+-- 009: draw_chat_results 结算检查点（安全版本 - 可重复执行）
+-- 执行方式：mysql -u root -p game_bot < migrations/009_settlement_runs.sql
+-- 日期：2026-10-19
+-- ============================================
+--
+-- 每个群聊每期的结算改为一次可恢复的结算运行，状态依次为
+-- claimed（已认领）→ computed（已计算）→ committed（已入账）→ announced（已播报）。
+-- 认领时记录开奖号码，计算完成后记录本次结算的注单ID，进程中途退出时
+-- 启动恢复按记录的号码和注单继续，不会把剩余注单结算到下一期。
+-- 恢复扫描按 status 查询未完成的运行，需要 idx_draw_chat_status 索引。
+-- 此前的 drawn/settled 记录保持不变（settled 视为已完成）。
+
+USE game_bot;
+
+-- ============================================
+-- 1. 开奖号码与注单列
+-- ============================================
+SET @col_exists = 0;
+SELECT COUNT(*) INTO @col_exists
+FROM INFORMATION_SCHEMA.COLUMNS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'draw_chat_results'
+  AND COLUMN_NAME = 'draw_number';
+
+SET @sql = IF(@col_exists = 0,
+  'ALTER TABLE draw_chat_results
+     ADD COLUMN draw_number INT NULL DEFAULT NULL COMMENT ''开奖番数/特码'' AFTER bet_count,
+     ADD COLUMN draw_code VARCHAR(255) NULL DEFAULT NULL COMMENT ''开奖号码'' AFTER draw_number,
+     ADD COLUMN special_number INT NULL DEFAULT NULL COMMENT ''特码'' AFTER draw_code,
+     ADD COLUMN bet_ids MEDIUMTEXT NULL DEFAULT NULL COMMENT ''本次结算的注单ID（JSON 数组）'' AFTER special_number,
+     MODIFY COLUMN status VARCHAR(255) NOT NULL DEFAULT ''claimed'' COMMENT ''claimed/computed/committed/announced（旧记录：drawn/settled）''',
+  'SELECT ''✓ Settlement run columns already exist in draw_chat_results'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- ============================================
+-- 2. 恢复扫描索引
+-- ============================================
+SET @idx_exists = 0;
+SELECT COUNT(*) INTO @idx_exists
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'draw_chat_results'
+  AND INDEX_NAME = 'idx_draw_chat_status';
+
+SET @sql = IF(@idx_exists = 0,
+  'CREATE INDEX idx_draw_chat_status ON draw_chat_results (status)',
+  'SELECT ''✓ Index idx_draw_chat_status already exists'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SELECT '✅ 009 迁移完成！' AS status;
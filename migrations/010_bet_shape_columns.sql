@@ -0,0 +1,63 @@
+-- ============================================
+-- 010: bets 下注形状列（安全版本 - 可重复执行）
+-- 执行方式：mysql -u root -p game_bot < migrations/010_bet_shape_columns.sql
+-- 执行后回填：python migrations/backfill_bet_shape.py
+-- 日期：2026-10-19
+-- ============================================
+--
+-- 下注对象此前整体序列化为 JSON 写入 bets.bet_details，开奖结算时逐笔 json.loads。
+-- 改为写入类型化列：bet_number（已有）/ bet_first / bet_second / bet_numbers_mask / bet_jin_number，
+-- 下注类型与赔率沿用 lottery_type / odds。结算直接按列组装，无需解析 JSON。
+-- bets_archive 通过 INSERT ... SELECT * 归档，两表列必须一致，因此冷表（如已创建）同步加列。
+
+USE game_bot;
+
+-- ============================================
+-- 1. bets
+-- ============================================
+SET @col_exists = 0;
+SELECT COUNT(*) INTO @col_exists
+FROM INFORMATION_SCHEMA.COLUMNS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'bets'
+  AND COLUMN_NAME = 'bet_first';
+
+SET @sql = IF(@col_exists = 0,
+  'ALTER TABLE bets
+     ADD COLUMN bet_first TINYINT UNSIGNED NULL DEFAULT NULL COMMENT ''首位号码（念/通）'' AFTER bet_number,
+     ADD COLUMN bet_second TINYINT UNSIGNED NULL DEFAULT NULL COMMENT ''次位/末位号码（念/通）'' AFTER bet_first,
+     ADD COLUMN bet_numbers_mask BIGINT UNSIGNED NULL DEFAULT NULL COMMENT ''号码组合位掩码（角/中）'' AFTER bet_second,
+     ADD COLUMN bet_jin_number TINYINT UNSIGNED NULL DEFAULT NULL COMMENT ''禁号（正禁号玩法）'' AFTER bet_numbers_mask',
+  'SELECT ''✓ Shape columns already exist in bets'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- ============================================
+-- 2. bets_archive（仅冷表已存在且缺列时）
+-- ============================================
+SET @table_exists = 0;
+SELECT COUNT(*) INTO @table_exists
+FROM INFORMATION_SCHEMA.TABLES
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'bets_archive';
+
+SET @col_exists = 0;
+SELECT COUNT(*) INTO @col_exists
+FROM INFORMATION_SCHEMA.COLUMNS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = 'bets_archive'
+  AND COLUMN_NAME = 'bet_first';
+
+SET @sql = IF(@table_exists = 1 AND @col_exists = 0,
+  'ALTER TABLE bets_archive
+     ADD COLUMN bet_first TINYINT UNSIGNED NULL DEFAULT NULL COMMENT ''首位号码（念/通）'' AFTER bet_number,
+     ADD COLUMN bet_second TINYINT UNSIGNED NULL DEFAULT NULL COMMENT ''次位/末位号码（念/通）'' AFTER bet_first,
+     ADD COLUMN bet_numbers_mask BIGINT UNSIGNED NULL DEFAULT NULL COMMENT ''号码组合位掩码（角/中）'' AFTER bet_second,
+     ADD COLUMN bet_jin_number TINYINT UNSIGNED NULL DEFAULT NULL COMMENT ''禁号（正禁号玩法）'' AFTER bet_numbers_mask',
+  'SELECT ''✓ bets_archive absent or already migrated'' AS Info');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SELECT '✅ 010 迁移完成！请执行 python migrations/backfill_bet_shape.py 回填已有记录' AS status;
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+下注形状列回填（配合 010_bet_shape_columns.sql）
+为只有 bet_details 的旧记录写入 bet_number / bet_first / bet_second / bet_numbers_mask / bet_jin_number，
+按 id 分批更新，可重复执行
+
+执行方式: python migrations/backfill_bet_shape.py [--batch-size 500] [--drop-details]
+未回填的记录结算时仍会解析 bet_details，回填期间可正常开奖；
+--drop-details 在回填后清空 bet_details 以缩小行宽（清空后原始下注文本不再保留）
+"""
+import sys
+import os
+import asyncio
+import argparse
+import logging
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def backfill(batch_size: int, drop_details: bool) -> int:
+    """回填全部带 bet_details 的记录，返回处理的批次数"""
+    from biz.containers import Container
+
+    container = Container()
+    bet_repo = container.bet_repo()
+    batches = 0
+    after_id = ""
+    try:
+        while True:
+            after_id = await bet_repo.backfill_shape_columns(after_id, batch_size, drop_details)
+            if not after_id:
+                break
+            batches += 1
+            logger.info(f"已回填至 id={after_id}")
+    finally:
+        await container.db_engine().dispose()
+    return batches
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="回填 bets 下注形状列")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--drop-details", action="store_true", help="回填后清空 bet_details")
+    args = parser.parse_args()
+
+    batches = asyncio.run(backfill(args.batch_size, args.drop_details))
+    logger.info(f"✅ 下注形状列回填完成，共 {batches} 批")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+开奖指标回填（配合 008_add_draw_metrics_columns.sql）
+为已有 draw_history 记录计算 numbers_packed / 冠亚和 / 龙虎，按 id 分批更新，可重复执行
+
+执行方式: python migrations/backfill_draw_metrics.py [--batch-size 500]
+未回填的记录在开奖结果接口中会按 draw_code 现场计算，回填期间接口可正常使用
+"""
+import sys
+import os
+import asyncio
+import argparse
+import logging
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def backfill(batch_size: int) -> int:
+    """回填全部缺少指标的记录，返回处理的批次数"""
+    from biz.containers import Container
+
+    container = Container()
+    draw_repo = container.draw_repo()
+    batches = 0
+    after_id = 0
+    try:
+        while True:
+            after_id = await draw_repo.backfill_metrics(after_id, batch_size)
+            if not after_id:
+                break
+            batches += 1
+            logger.info(f"已回填至 id={after_id}")
+    finally:
+        await container.db_engine().dispose()
+    return batches
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="回填 draw_history 开奖指标列")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    batches = asyncio.run(backfill(args.batch_size))
+    logger.info(f"✅ 开奖指标回填完成，共 {batches} 批")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+热点查询执行计划校验（配合 004–010 迁移中的索引）
+对每条热点查询执行 EXPLAIN，出现全表扫描（type=ALL）、Using filesort 或未使用预期索引即视为失败；
+SQL 直接引用各 Repository 中的常量，查询改动后无需在此同步
+
+执行方式: python migrations/check_query_plans.py
+注意: 请在有代表性数据量的库上执行，空表/极小表时优化器可能直接选择全表扫描
+退出码: 0 = 全部通过，1 = 存在问题计划
+"""
+import sys
+import os
+import logging
+from typing import List, Dict, Any
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import bindparam, text
+
+from biz.archive.repo.archive_repo import archive_source
+from biz.bet.repo import bet_repo
+from biz.draw.repo import draw_repo
+from biz.reports.repo import report_repo
+from biz.user.repo import user_repo
+from biz.users.repo import agent_repo, member_repo
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _query(name: str, sql: str, params: Dict[str, Any], indexes=(), expanding=()) -> Dict[str, Any]:
+    """
+    热点查询条目
+
+    Args:
+        name: 查询名
+        sql: 各 Repository 中的 SQL 常量（同一字符串，不另行抄写）
+        params: 示例参数
+        indexes: 执行计划中必须使用的索引（与 004–010 迁移一致）
+        expanding: IN 列表参数名
+    """
+    return {"name": name, "sql": sql, "params": params, "indexes": tuple(indexes), "expanding": tuple(expanding)}
+
+
+def _with_archive(name: str, template: str, table: str, alias: str, params: Dict[str, Any],
+                  indexes=(), **fields) -> List[Dict[str, Any]]:
+    """
+    按数据源展开查询模板：只读热表 / 热表 UNION ALL 冷表（查询起始时间早于归档分界线时）
+
+    冷表由 CREATE TABLE ... LIKE 建立，索引与热表同名
+    """
+    return [
+        _query(name, template.format(source=f"{table} {alias}", **fields), params, indexes),
+        _query(f"{name}[archive]", template.format(source=archive_source(table, alias), **fields), params, indexes),
+    ]
+
+
+_DAY_START = "2000-01-01 00:00:00"
+_DAY_END = "2000-01-01 23:59:59"
+
+# 热点查询（SQL 直接引用各 Repository 的常量，参数为示例值）
+HOT_QUERIES: List[Dict[str, Any]] = [
+    # ---------- BetRepository ----------
+    _query("bets.get_all_pending_bets", bet_repo.PENDING_BETS_BY_CHAT_SQL,
+           {"chat_id": "check_chat"}, ["idx_bets_chat_pending"]),
+    _query("bets.get_user_all_pending_bets", bet_repo.PENDING_BETS_BY_USER_SQL,
+           {"user_id": "check_user", "chat_id": "check_chat"}, ["idx_bets_user_chat_pending"]),
+    _query("bets.get_pending_bets_by_issue", bet_repo.PENDING_BETS_BY_ISSUE_SQL,
+           {"chat_id": "check_chat", "issue": "check_issue"}, ["idx_bets_chat_issue_pending"]),
+    _query("bets.get_pending_bets", bet_repo.PENDING_BETS_SQL, {}, ["idx_bets_pending_created"]),
+    _query("bets.get_user_bets_since", bet_repo.USER_BETS_SINCE_SQL,
+           {"user_id": "check_user", "chat_id": "check_chat", "since_time": _DAY_START},
+           ["idx_bets_user_chat_created"]),
+    _query("bets.get_user_settled_bets_since", bet_repo.USER_SETTLED_BETS_SINCE_SQL,
+           {"user_id": "check_user", "chat_id": "check_chat", "since_time": _DAY_START},
+           ["idx_bets_user_chat_created"]),
+    _query("bets.get_user_bets", bet_repo.USER_BETS_SQL,
+           {"user_id": "check_user", "chat_id": "check_chat", "limit": 100, "skip": 0},
+           ["idx_bets_user_chat_created"]),
+    _query("bets.get_chat_bets", bet_repo.CHAT_BETS_SQL,
+           {"chat_id": "check_chat", "limit": 100, "skip": 0}, ["idx_bets_chat_created"]),
+    # ---------- DrawRepository ----------
+    # 006 以唯一键 uq_draw_game_chat_issue 取代 004 的 idx_draw_issue_game_chat
+    _query("draw_history.get_draw_by_issue", draw_repo.DRAW_BY_ISSUE_SQL,
+           {"issue": "check_issue", "game_type": "lucky8", "chat_id": draw_repo.GLOBAL_CHAT_ID},
+           ["uq_draw_game_chat_issue"]),
+    _query("draw_history.exists_issue", draw_repo.ISSUE_EXISTS_SQL,
+           {"issue": "check_issue", "game_type": "lucky8", "chat_id": draw_repo.GLOBAL_CHAT_ID},
+           ["uq_draw_game_chat_issue"]),
+    _query("draw_history.get_latest_draw", draw_repo.LATEST_DRAW_SQL,
+           {"game_type": "lucky8", "chat_id": draw_repo.GLOBAL_CHAT_ID}, ["idx_draw_game_chat_ts"]),
+    _query("draw_history.get_recent_draws", draw_repo.RECENT_DRAWS_BY_GAME_SQL,
+           {"chat_id": draw_repo.GLOBAL_CHAT_ID, "game_type": "lucky8", "limit": 15}, ["idx_draw_game_chat_ts"]),
+    _query("draw_history.get_recent_draws_all_games", draw_repo.RECENT_DRAWS_SQL,
+           {"chat_id": draw_repo.GLOBAL_CHAT_ID, "limit": 15}, ["idx_draw_chat_ts"]),
+    _query("draw_history.get_draw_history", draw_repo.DRAW_HISTORY_SQL,
+           {"game_type": "lucky8", "limit": 100, "skip": 0}, ["idx_draw_game_ts"]),
+    *_with_archive("draw_history.get_draw_history_by_date", draw_repo.DRAW_HISTORY_BY_DATE_SQL,
+                   "draw_history", "d",
+                   {"game_type": "lucky8", "lottery_date": "2000-01-01", "limit": 20, "skip": 0},
+                   ["idx_draw_game_ts"]),
+    _query("draw_history.get_latest_draw_by_date", draw_repo.LATEST_DRAW_BY_DATE_SQL,
+           {"pattern": "20000101%", "game_type": "lucky8"}, ["idx_draw_game_issue"]),
+    # 007/009：draw_chat_results 结算运行
+    _query("draw_chat_results.claim_settlement_run", draw_repo.SETTLEMENT_RUN_SQL,
+           {"chat_id": "check_chat", "game_type": "lucky8", "issue": "check_issue"}, ["uq_draw_chat_issue"]),
+    _query("draw_chat_results.get_unfinished_runs", draw_repo.UNFINISHED_RUNS_SQL,
+           {"statuses": list(draw_repo.RUN_UNFINISHED)}, ["idx_draw_chat_status"], expanding=["statuses"]),
+    _query("draw_chat_results.get_unfinished_runs_by_chat", draw_repo.CHAT_UNFINISHED_RUNS_SQL,
+           {"statuses": list(draw_repo.RUN_UNFINISHED), "chat_id": "check_chat"}, ["idx_draw_chat_status"],
+           expanding=["statuses"]),
+    # ---------- UserRepository ----------
+    _query("users.get_chat_users", user_repo.CHAT_USERS_SQL,
+           {"chat_id": "check_chat", "limit": 100, "skip": 0}, ["idx_users_chat_created"]),
+    _query("users.get_leaderboard", user_repo.LEADERBOARD_SQL,
+           {"chat_id": "check_chat", "limit": 10}, ["idx_users_chat_status_balance"]),
+    _query("users.get_new_users", user_repo.CHAT_NEW_USERS_SQL,
+           {"chat_id": "check_chat"}, ["idx_users_chat_new_created"]),
+    # ---------- ReportRepository ----------
+    _query("transactions.financial_summary", report_repo.DEPOSIT_SUMMARY_SQL,
+           {"start_dt": _DAY_START, "end_dt": _DAY_END}, ["idx_transactions_status_time"]),
+    *_with_archive("bet_orders.financial_summary", report_repo.BET_ORDER_SUMMARY_SQL, "bet_orders", "b",
+                   {"start_dt": _DAY_START, "end_dt": _DAY_END}, ["idx_bet_orders_status_time"]),
+    *_with_archive("bet_orders.win_loss_report", report_repo.WIN_LOSS_REPORT_SQL, "bet_orders", "b",
+                   {"start_dt": _DAY_START, "end_dt": _DAY_END, "page_size": 20, "offset": 0},
+                   ["idx_bet_orders_status_time"],
+                   where="WHERE b.bet_time BETWEEN :start_dt AND :end_dt AND b.status = 'settled'"),
+    # ---------- MemberRepository / AgentRepository ----------
+    *_with_archive("bet_orders.member_bet_orders", member_repo.MEMBER_BET_ORDERS_SQL, "bet_orders", "bo",
+                   {"account": "check_account", "start_date": _DAY_START, "limit": 20, "offset": 0},
+                   ["idx_bet_orders_user_time"],
+                   where="mp.account = :account AND bo.bet_time >= :start_date"),
+    *_with_archive("account_changes.member_transactions", member_repo.MEMBER_ACCOUNT_CHANGES_SQL,
+                   "account_changes", "ac",
+                   {"account": "check_account", "start_date": _DAY_START, "limit": 20, "offset": 0},
+                   ["idx_account_changes_user_created"],
+                   where="mp.account = :account AND ac.created_at >= :start_date"),
+    *_with_archive("account_changes.agent_transactions", agent_repo.AGENT_ACCOUNT_CHANGES_SQL,
+                   "account_changes", "ac",
+                   {"account": "check_account", "start_date": _DAY_START, "limit": 20, "offset": 0},
+                   ["idx_account_changes_user_created"],
+                   where="ap.account = :account AND ac.created_at >= :start_date"),
+]
+
+
+def find_plan_problems(plan_rows: List[Dict[str, Any]], indexes=()) -> List[str]:
+    """
+    检查 EXPLAIN 结果中的问题计划
+
+    热表 UNION ALL 冷表的派生表（<derived…>/<union…>）只能整体扫描、排序，不计入问题，
+    只检查其中各张实体表的访问方式
+
+    Args:
+        plan_rows: EXPLAIN 返回的行（dict，列名同 MySQL 传统格式）
+        indexes: 执行计划中必须使用的索引
+
+    Returns:
+        List[str]: 问题描述，空列表表示通过
+    """
+    problems = []
+    for row in plan_rows:
+        table = row.get("table") or "?"
+        if table.startswith("<"):
+            continue
+        access_type = (row.get("type") or "").upper()
+        extra = row.get("Extra") or ""
+
+        if access_type == "ALL":
+            problems.append(f"{table}: 全表扫描 (type=ALL)")
+        if "Using filesort" in extra:
+            problems.append(f"{table}: Using filesort")
+
+    used = {row.get("key") for row in plan_rows if row.get("key")}
+    for index in indexes:
+        if index not in used:
+            problems.append(f"未使用索引 {index}（实际: {', '.join(sorted(used)) or '无'}）")
+    return problems
+
+
+def check_query_plans(conn) -> Dict[str, List[str]]:
+    """
+    对全部热点查询执行 EXPLAIN
+
+    Args:
+        conn: SQLAlchemy 同步连接
+
+    Returns:
+        Dict[str, List[str]]: {查询名: 问题列表}，只包含存在问题的查询
+    """
+    failures = {}
+    for query in HOT_QUERIES:
+        statement = text("EXPLAIN " + query["sql"])
+        if query["expanding"]:
+            statement = statement.bindparams(*(bindparam(name, expanding=True) for name in query["expanding"]))
+        result = conn.execute(statement, query["params"])
+        plan_rows = [dict(row._mapping) for row in result.fetchall()]
+        problems = find_plan_problems(plan_rows, query["indexes"])
+        if problems:
+            failures[query["name"]] = problems
+    return failures
+
+
+def main() -> int:
+    """执行校验，返回进程退出码"""
+    from base.init_db import get_database_uri_from_config, get_mysql_sync_engine
+
+    engine = get_mysql_sync_engine(get_database_uri_from_config())
+    try:
+        with engine.connect() as conn:
+            failures = check_query_plans(conn)
+    finally:
+        engine.dispose()
+
+    if failures:
+        for name, problems in failures.items():
+            logger.error(f"❌ {name}: {'; '.join(problems)}")
+        logger.error(f"❌ {len(failures)}/{len(HOT_QUERIES)} 条热点查询执行计划不合格")
+        return 1
+
+    logger.info(f"✅ {len(HOT_QUERIES)} 条热点查询执行计划全部通过")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
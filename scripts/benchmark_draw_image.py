@@ -0,0 +1,71 @@
+"""
+开奖图片渲染基准
+对比两种方式生成同一张15期历史图片的耗时与文件大小：
+- 逐帧重绘：每次清空底图/字形缓存并保存为RGB PNG（与改造前的逐格 textbbox + 绘制、默认编码等价）
+- 模板合成：复用缓存的静态底图与字形位图，保存为4位调色板PNG
+
+执行方式: python scripts/benchmark_draw_image.py [--iterations 50] [--game-type lucky8]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加项目根目录到 sys.path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.draw_image_generator import DrawImageGenerator
+
+
+def sample_draws(count: int = 15):
+    return [
+        {
+            'issue': str(20250101100 - i),
+            'draw_code': ','.join(str((i + n) % 20 + 1) for n in range(8)),
+            'special_number': (i * 7) % 49 + 1,
+            'draw_number': i % 4 + 1,
+            'timestamp': '2025-01-01 10:00:00',
+        }
+        for i in range(count)
+    ]
+
+
+def run(generator: DrawImageGenerator, game_type: str, iterations: int, cold: bool):
+    """返回 (平均耗时ms, 文件字节数)"""
+    draws = sample_draws()
+    path = os.path.join(tempfile.gettempdir(), f"benchmark_{game_type}_{'cold' if cold else 'cached'}.png")
+    if cold:
+        generator._save_png = lambda image, save_path: image.convert('RGB').save(save_path)
+    else:
+        generator.generate_image(game_type, draws, path)  # 预热缓存
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        if cold:
+            generator._templates.clear()
+            generator._glyphs.clear()
+        generator.generate_image(game_type, draws, path)
+    elapsed_ms = (time.perf_counter() - started) / iterations * 1000
+    return elapsed_ms, os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="开奖图片渲染基准")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--game-type", default="lucky8", choices=["lucky8", "liuhecai"])
+    args = parser.parse_args()
+
+    cold_ms, cold_bytes = run(DrawImageGenerator(), args.game_type, args.iterations, cold=True)
+    cached_ms, cached_bytes = run(DrawImageGenerator(), args.game_type, args.iterations, cold=False)
+
+    print(f"{'方式':<12}{'耗时(ms)':>12}{'大小(bytes)':>14}")
+    print(f"{'逐帧重绘':<12}{cold_ms:>12.2f}{cold_bytes:>14}")
+    print(f"{'模板合成':<12}{cached_ms:>12.2f}{cached_bytes:>14}")
+    print(f"提升: 耗时 {cold_ms / cached_ms:.1f}x, 大小 {cold_bytes / cached_bytes:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
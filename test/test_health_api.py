@@ -9,4 +9,41 @@ async def test_health_ok():
     assert r.status_code == 200
     body = r.json()
     assert body.get("status") == "healthy"
-    assert isinstance(body.get("timestamp"), str)
\ No newline at end of file
+    assert isinstance(body.get("timestamp"), str)
+
+@pytest.mark.asyncio
+async def test_health_reports_warmup():
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        r = await client.get("/health")
+    body = r.json()
+    assert isinstance(body.get("ready"), bool)
+    assert set(body["warmup"]) >= {"draw_data", "chats", "registered_chats"}
+
+
+@pytest.mark.asyncio
+async def test_register_active_chats_pages_without_cap(monkeypatch):
+    from dependency_injector import providers
+    from biz import application
+
+    chat_ids = [f"chat_{i:05d}" for i in range(1203)]
+
+    class FakeChatRepo:
+        async def get_chats_after(self, after_id=None, limit=500, status=None):
+            remaining = [c for c in chat_ids if after_id is None or c > after_id]
+            return [{"id": c, "game_type": "lucky8"} for c in remaining[:limit]]
+
+    class FakeScheduler:
+        def __init__(self):
+            self.registered = []
+
+        def register_chat_to_global_timer(self, chat_id, game_type):
+            self.registered.append(chat_id)
+
+    scheduler = FakeScheduler()
+    monkeypatch.setattr(application, "warmup_state", {"draw_data": "pending", "chats": "pending", "registered_chats": 0})
+    with application.container.chat_repo.override(providers.Object(FakeChatRepo())):
+        await application._register_active_chats(scheduler)
+
+    assert scheduler.registered == chat_ids
+    assert application.warmup_state["chats"] == "ready"
+    assert application.warmup_state["registered_chats"] == 1203
@@ -0,0 +1,56 @@
+"""
+单元测试用的假数据库会话：记录执行的 SQL（空白已归一化），按测试给定的规则返回结果
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 执行记录：(SQL, 参数)；提交/回滚记为 ("COMMIT", {}) / ("ROLLBACK", {})
+Log = List[Tuple[str, Dict[str, Any]]]
+# 按 (SQL, 参数) 返回查询结果，返回 None 时为空结果
+Responder = Callable[[str, Dict[str, Any]], Optional["FakeResult"]]
+
+
+class FakeRow:
+    def __init__(self, mapping):
+        self._mapping = mapping
+
+
+class FakeResult:
+    def __init__(self, rows=(), rowcount=1):
+        self._rows = list(rows)
+        self.rowcount = rowcount
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return self._rows
+
+
+class FakeSession:
+    def __init__(self, log: Log, respond: Optional[Responder] = None):
+        self.log = log
+        self.respond = respond
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, params=None):
+        sql = " ".join(str(query).split())
+        params = params or {}
+        self.log.append((sql, params))
+        result = self.respond(sql, params) if self.respond else None
+        return result or FakeResult()
+
+    async def commit(self):
+        self.log.append(("COMMIT", {}))
+
+    async def rollback(self):
+        self.log.append(("ROLLBACK", {}))
+
+
+def session_factory(log: Log, respond: Optional[Responder] = None):
+    """Repository 使用的 session_factory：每次返回共享同一执行记录的 FakeSession"""
+    return lambda: FakeSession(log, respond)
@@ -0,0 +1,48 @@
+"""
+冷热数据读取路由测试
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from biz.archive.repo import archive_repo
+from biz.archive.repo.archive_repo import table_source, mark_archive_ready
+
+
+@pytest.fixture
+def archive_ready():
+    mark_archive_ready(True)
+    yield
+    mark_archive_ready(False)
+
+
+def test_hot_only_before_archive_tables_ready():
+    mark_archive_ready(False)
+    assert table_source("bet_orders", "b", "2000-01-01 00:00:00") == "bet_orders b"
+
+
+def test_recent_range_reads_hot_table(archive_ready):
+    start = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S")
+    assert table_source("bet_orders", "b", start) == "bet_orders b"
+
+
+def test_old_range_unions_archive(archive_ready):
+    source = table_source("draw_history", "d", "2000-01-01")
+    assert "UNION ALL SELECT * FROM draw_history_archive" in source
+    assert source.endswith(") d")
+
+
+def test_undated_query_reads_hot_table(archive_ready):
+    assert table_source("account_changes", "ac", None) == "account_changes ac"
+
+
+def test_retention_days_from_env(archive_ready, monkeypatch):
+    monkeypatch.setenv("ARCHIVE_RETENTION_DAYS", "3650")
+    start = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
+    assert table_source("bets", "b", start) == "bets b"
+
+
+def test_unknown_table_rejected():
+    with pytest.raises(ValueError):
+        table_source("users", "u", None)
+    assert "users" not in archive_repo.ARCHIVE_TABLES
@@ -0,0 +1,60 @@
+"""
+下注形状列测试（bets 表类型化列 ↔ 结算下注对象）
+"""
+from decimal import Decimal
+
+from biz.bet.repo.exposure_ledger import entry_for_bet, entry_for_new_bet
+from biz.game.logic import game_logic
+
+PARSED_BETS = [
+    {"type": "fan", "number": 3},
+    {"type": "zheng", "number": 1},
+    {"type": "nian", "first": 1, "second": 2},
+    {"type": "jiao", "numbers": [1, 2]},
+    {"type": "tong", "first": 3, "second": 4},
+    {"type": "zheng_jin", "number": 3, "jin_number": 4},
+    {"type": "zhong", "numbers": [1, 2, 3]},
+    {"type": "odd"},
+    {"type": "tema", "number": 8},
+]
+
+
+def _row(parsed: dict) -> dict:
+    """按 BetRepository.create 写入的列组装 bets 记录（不含 bet_details）"""
+    return {
+        "id": "b1", "game_type": "lucky8", "issue": "100", "lottery_type": parsed["type"],
+        "bet_amount": Decimal("100.00"), "odds": Decimal("2.50"), "bet_details": None,
+        **game_logic.bet_shape_columns(parsed),
+    }
+
+
+def test_mask_round_trip():
+    assert game_logic.numbers_to_mask([3, 1]) == 0b1010
+    assert game_logic.mask_to_numbers(0b1010) == [1, 3]
+    assert game_logic.numbers_to_mask(None) is None
+    assert game_logic.mask_to_numbers(None) is None
+
+
+def test_columns_settle_like_parsed_bet():
+    for parsed in PARSED_BETS:
+        settle_bet = game_logic.bet_for_settlement(_row(parsed))
+        original = {**parsed, "amount": Decimal("100.00"), "odds": Decimal("2.50")}
+        for fan in range(1, 5):
+            for special in (7, 8):
+                expected = game_logic.calculate_result(original, "", fan, special)
+                assert game_logic.calculate_result(settle_bet, "", fan, special) == expected, parsed
+
+
+def test_legacy_row_falls_back_to_details():
+    legacy = {
+        "lottery_type": "nian", "bet_amount": Decimal("100"), "odds": Decimal("2"),
+        "bet_number": None, "bet_first": None,
+        "bet_details": '{"type": "nian", "first": 2, "second": 4, "amount": 100, "odds": 2}',
+    }
+    assert game_logic.bet_for_settlement(legacy)["first"] == 2
+
+
+def test_exposure_key_matches_new_bet():
+    for parsed in PARSED_BETS:
+        new_entry = entry_for_new_bet("lucky8", "100", {**parsed, "amount_cents": 10000, "odds": Decimal("2.5"), "odds_bp": 25000})
+        assert entry_for_bet(_row(parsed))[0] == new_entry[0], parsed
@@ -0,0 +1,50 @@
+"""
+批量取消下注测试（取消注单与退款在同一事务中完成）
+"""
+from decimal import Decimal
+
+import pytest
+
+from biz.bet.repo.bet_repo import BetRepository
+from test.unit.fake_db import FakeResult, session_factory
+
+
+def _select_returns(rows):
+    return lambda sql, params: FakeResult(rows) if sql.startswith("SELECT") else None
+
+
+class FakeBook:
+    def __init__(self):
+        self.discarded = []
+
+    def discard(self, bet_ids):
+        self.discarded.extend(bet_ids)
+
+
+@pytest.mark.asyncio
+async def test_cancel_refunds_exactly_the_locked_rows_in_one_transaction():
+    log, book = [], FakeBook()
+    rows = [("b1", Decimal("100.00")), ("b2", Decimal("37.50"))]
+    repo = BetRepository(session_factory(log, _select_returns(rows)), pending_book=book)
+
+    refund = await repo.cancel_pending_for_user("u1", "c1")
+
+    assert refund == Decimal("137.50")
+    statements = [sql for sql, _ in log]
+    assert "FOR UPDATE" in statements[0]
+    assert statements[1].startswith("UPDATE bets SET status = 'cancelled'")
+    assert log[1][1] == {"bet_ids": ["b1", "b2"]}
+    assert statements[2].startswith("UPDATE users SET balance = balance + :amount")
+    assert log[2][1]["amount"] == Decimal("137.50")
+    assert statements[3] == "COMMIT"
+    assert book.discarded == ["b1", "b2"]
+
+
+@pytest.mark.asyncio
+async def test_cancel_without_pending_bets_touches_nothing():
+    log, book = [], FakeBook()
+    repo = BetRepository(session_factory(log, _select_returns([])), pending_book=book)
+
+    assert await repo.cancel_pending_for_user("u1", "c1") == Decimal("0")
+    assert [sql for sql, _ in log][1:] == ["ROLLBACK"]
+    assert book.discarded == []
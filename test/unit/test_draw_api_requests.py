@@ -0,0 +1,88 @@
+"""
+DrawApiClient 上游请求测试（本地 stub 服务代替真实开奖API）
+"""
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from external.draw_api_client import DrawApiClient
+
+LUCKY8_PAYLOAD = {
+    "errorCode": 0,
+    "result": {"data": [
+        {"preDrawIssue": "20250101100", "preDrawCode": "1,2,3,4,5,6,7,8", "preDrawTime": "2025-01-01 10:00:00"},
+    ]},
+}
+
+
+def _lucky8_app(delay: float = 0, hits: list = None) -> web.Application:
+    async def handler(request):
+        if hits is not None:
+            hits.append(request.headers.get("If-None-Match"))
+        if delay:
+            await asyncio.sleep(delay)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.json_response(LUCKY8_PAYLOAD, headers={"ETag": '"v1"'})
+
+    app = web.Application()
+    app.router.add_get("/klsf/getHistoryLotteryInfo.do", handler)
+    return app
+
+
+@pytest.fixture
+def no_snapshot(monkeypatch):
+    monkeypatch.setenv("DRAW_CACHE_SNAPSHOT", "")
+    monkeypatch.delenv("LUCKY8_API_BASE_SECONDARY", raising=False)
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_skips_unchanged_payload(no_snapshot, monkeypatch):
+    hits = []
+    async with TestServer(_lucky8_app(hits=hits)) as server:
+        monkeypatch.setenv("LUCKY8_API_BASE", str(server.make_url("")).rstrip("/"))
+        client = DrawApiClient()
+        try:
+            assert await client.fetch_lucky8_results() is True
+            assert await client.fetch_lucky8_results() is True
+        finally:
+            await client.close()
+
+    assert hits == [None, '"v1"']
+    stats = client.get_provider_stats()["lucky8:primary"]
+    assert stats["requests"] == 2
+    assert stats["not_modified"] == 1
+    assert client.get_latest_lucky8_draw_number()["issue"] == "20250101100"
+
+
+@pytest.mark.asyncio
+async def test_session_is_reused(no_snapshot, monkeypatch):
+    async with TestServer(_lucky8_app()) as server:
+        monkeypatch.setenv("LUCKY8_API_BASE", str(server.make_url("")).rstrip("/"))
+        client = DrawApiClient()
+        try:
+            await client.fetch_lucky8_results()
+            session = client._session
+            await client.fetch_lucky8_results()
+            assert client._session is session
+        finally:
+            await client.close()
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_uses_faster_secondary(no_snapshot, monkeypatch):
+    async with TestServer(_lucky8_app(delay=2)) as slow, TestServer(_lucky8_app()) as fast:
+        monkeypatch.setenv("LUCKY8_API_BASE", str(slow.make_url("")).rstrip("/"))
+        monkeypatch.setenv("LUCKY8_API_BASE_SECONDARY", str(fast.make_url("")).rstrip("/"))
+        monkeypatch.setenv("DRAW_HEDGE_DELAY_SECONDS", "0.1")
+        client = DrawApiClient()
+        try:
+            started = asyncio.get_running_loop().time()
+            assert await client.fetch_lucky8_results() is True
+            assert asyncio.get_running_loop().time() - started < 1.5
+        finally:
+            await client.close()
+
+    assert client.get_provider_stats()["lucky8:secondary"]["requests"] == 1
@@ -0,0 +1,117 @@
+"""
+开奖图片渲染缓存测试
+"""
+import asyncio
+
+import pytest
+
+from utils import draw_image_generator
+from utils.draw_image_generator import DrawImageGenerator, get_render_stats
+
+
+def _draws(latest_issue: int, count: int = 3):
+    return [
+        {"issue": str(latest_issue - i), "draw_number": 1, "draw_code": "1,2,3,4,5,6,7,8",
+         "special_number": 8, "timestamp": "2025-01-01 10:00:00"}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    monkeypatch.setenv("UPLOADS_DIR", str(tmp_path))
+    return DrawImageGenerator()
+
+
+@pytest.mark.asyncio
+async def test_same_issue_renders_once(generator, monkeypatch):
+    renders = []
+    render = draw_image_generator.render_image
+
+    async def counting_render(*args):
+        renders.append(args)
+        return await render(*args)
+
+    monkeypatch.setattr(draw_image_generator, "render_image", counting_render)
+
+    paths = await asyncio.gather(*[
+        generator.generate_image_cached("lucky8", _draws(20250101100)) for _ in range(5)
+    ])
+
+    assert len(renders) == 1
+    assert len(set(paths)) == 1
+    assert paths[0].endswith(".png") and "draw_lucky8_" in paths[0]
+
+
+@pytest.mark.asyncio
+async def test_new_issue_replaces_cache(generator):
+    first = await generator.generate_image_cached("lucky8", _draws(20250101100))
+    second = await generator.generate_image_cached("lucky8", _draws(20250101101))
+
+    assert first != second
+    assert generator.get_cached_image("lucky8", _draws(20250101100)) is None
+    assert generator.get_cached_image("lucky8", _draws(20250101101)) == second
+
+
+@pytest.mark.asyncio
+async def test_render_runs_in_pool_and_tracks_queue_depth(generator):
+    await generator.generate_image_cached("liuhecai", _draws(2025001))
+
+    stats = get_render_stats()
+    assert stats["queue_depth"] == 0
+    assert stats["rendered"] >= 1
+
+
+def test_template_reused_and_saved_as_palette_png(generator, tmp_path):
+    from PIL import Image
+
+    first = generator.generate_image("lucky8", _draws(20250101100), str(tmp_path / "a.png"))
+    template = generator._templates[("lucky8", 3)]
+    generator.generate_image("lucky8", _draws(20250101101), str(tmp_path / "b.png"))
+
+    assert generator._templates[("lucky8", 3)] is template
+    with Image.open(first) as image:
+        assert image.mode == "P"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_strand_waiters(generator, monkeypatch):
+    release = asyncio.Event()
+    render = draw_image_generator.render_image
+
+    async def slow_render(*args):
+        await release.wait()
+        return await render(*args)
+
+    monkeypatch.setattr(draw_image_generator, "render_image", slow_render)
+
+    owner = asyncio.create_task(generator.generate_image_cached("lucky8", _draws(20250101100)))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(generator.generate_image_cached("lucky8", _draws(20250101100)))
+    await asyncio.sleep(0)
+
+    owner.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    path = await asyncio.wait_for(waiter, timeout=5)
+    assert path.endswith(".png")
+    assert owner.cancelled()
+
+
+def test_same_draws_render_to_same_file_at_different_times(tmp_path, monkeypatch):
+    from datetime import datetime
+
+    class Clock(datetime):
+        ticks = 0
+
+        @classmethod
+        def now(cls, tz=None):
+            cls.ticks += 1
+            return datetime(2025, 1, 1, 10, 0, cls.ticks)
+
+    monkeypatch.setattr(draw_image_generator, "datetime", Clock)
+    first = draw_image_generator._render_in_worker("lucky8", _draws(20250101100), str(tmp_path))
+    second = draw_image_generator._render_in_worker("lucky8", _draws(20250101100), str(tmp_path))
+
+    assert first == second
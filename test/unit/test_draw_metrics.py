@@ -0,0 +1,43 @@
+"""
+开奖指标预计算测试
+"""
+from biz.draw.metrics import metric_columns, metrics_from_row, pack_numbers, unpack_numbers
+
+PK10_CODE = "10,2,3,4,5,6,7,8,9,1"
+
+
+def test_pack_round_trip():
+    assert pack_numbers([1, 20, 49]) == "012049"
+    assert unpack_numbers("012049") == [1, 20, 49]
+
+
+def test_metric_columns():
+    columns = metric_columns(PK10_CODE)
+    assert columns == {
+        "numbers_packed": "10020304050607080901",
+        "champion_sum": 12,
+        "champion_size": "大",
+        "champion_parity": "双",
+        "dragon_tiger": "龙虎虎虎虎",
+    }
+
+
+def test_lucky8_has_no_dragon_tiger():
+    columns = metric_columns("1,2,3,4,5,6,7,8")
+    assert columns["champion_sum"] == 3
+    assert columns["dragon_tiger"] is None
+
+
+def test_row_with_columns_matches_computed():
+    stored = {"draw_code": PK10_CODE, **metric_columns(PK10_CODE)}
+    legacy = {"draw_code": PK10_CODE, "numbers_packed": None}
+    assert metrics_from_row(stored) == metrics_from_row(legacy)
+    assert metrics_from_row(stored)["numbers"][0] == "10"
+
+
+def test_numbers_keep_two_digit_format():
+    code = "08,15,22,01,03,11,19,20"
+    stored = {"draw_code": code, **metric_columns(code)}
+    legacy = {"draw_code": code, "numbers_packed": None}
+    assert metrics_from_row(stored)["numbers"] == code.split(",")
+    assert metrics_from_row(legacy)["numbers"] == code.split(",")
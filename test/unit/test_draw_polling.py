@@ -0,0 +1,82 @@
+"""
+开奖数据自适应轮询测试
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from external.draw_api_client import DrawApiClient
+
+
+def _lucky8_row(issue: str, draw_time: str):
+    return {"preDrawIssue": issue, "preDrawCode": "1,2,3,4,5,6,7,8", "preDrawTime": draw_time}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("DRAW_CACHE_SNAPSHOT", "")
+    client = DrawApiClient()
+    client._ingest_lucky8([_lucky8_row("20250101100", "2025-01-01 10:00:00")])
+    return client
+
+
+def test_sleeps_until_window_between_draws(client):
+    # 下一期预计 10:05:00，窗口从 10:04:45 开始
+    delay = client._next_poll_delay("lucky8", now=datetime(2025, 1, 1, 10, 1, 0))
+    assert delay == 225
+
+
+def test_polls_fast_inside_window(client):
+    assert client._next_poll_delay("lucky8", now=datetime(2025, 1, 1, 10, 5, 10)) == client.poll_fast_seconds
+
+
+def test_falls_back_to_idle_after_window(client):
+    assert client._next_poll_delay("lucky8", now=datetime(2025, 1, 1, 10, 10, 0)) == client.poll_idle_seconds
+
+
+def test_idle_when_schedule_unknown(monkeypatch):
+    monkeypatch.setenv("DRAW_CACHE_SNAPSHOT", "")
+    assert DrawApiClient()._next_poll_delay("liuhecai") == DrawApiClient().poll_idle_seconds
+
+
+@pytest.mark.asyncio
+async def test_waiter_wakes_on_new_issue(client):
+    waiter = asyncio.create_task(client.wait_for_new_issue("lucky8", "20250101100", timeout=5))
+    await asyncio.sleep(0)
+    client._ingest_lucky8([_lucky8_row("20250101101", "2025-01-01 10:05:00")])
+    assert await asyncio.wait_for(waiter, timeout=1) is True
+
+
+@pytest.mark.asyncio
+async def test_waiter_times_out_without_new_issue(client):
+    assert await client.wait_for_new_issue("lucky8", "20250101100", timeout=0.05) is False
+
+
+@pytest.mark.asyncio
+async def test_peek_latest_issue_never_marks_served(client, monkeypatch):
+    monkeypatch.setattr(DrawApiClient, "is_polling", property(lambda self: True))
+    client._served_issues["lucky8"] = ("20250101100", datetime(2000, 1, 1))
+
+    issue = await asyncio.wait_for(client.peek_latest_issue("lucky8"), timeout=0.5)
+
+    assert issue == "20250101100"
+    assert client._served_issues["lucky8"] == ("20250101100", datetime(2000, 1, 1))
+
+
+@pytest.mark.asyncio
+async def test_unchanged_poll_logs_at_debug(client, caplog):
+    class Provider:
+        issue = "20250101101"
+
+        async def fetch(self, game_type):
+            return {"errorCode": 0, "result": {"data": [_lucky8_row(self.issue, "2025-01-01 10:05:00")]}}
+
+    client.provider = Provider()
+    with caplog.at_level("DEBUG", logger="external.draw_api_client"):
+        assert await client.fetch_lucky8_results()
+        assert await client.fetch_lucky8_results()
+
+    fetched = [record for record in caplog.records if "快乐十分开奖记录" in record.getMessage()]
+    assert [record.levelname for record in fetched] == ["INFO", "DEBUG"]
+    assert all(record.levelname == "DEBUG" for record in caplog.records if "正在获取" in record.getMessage())
@@ -0,0 +1,77 @@
+"""
+离线开奖数据源测试
+"""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from external.draw_api_client import DrawApiClient
+from external.draw_providers import OfflineDrawProvider, create_draw_provider, get_time_scale
+
+
+def test_http_provider_by_default(monkeypatch):
+    monkeypatch.delenv("DRAW_PROVIDER", raising=False)
+    assert create_draw_provider() is None
+    assert get_time_scale() == 1.0
+
+
+def test_unknown_provider_rejected(monkeypatch):
+    monkeypatch.setenv("DRAW_PROVIDER", "carrier-pigeon")
+    with pytest.raises(ValueError):
+        create_draw_provider()
+
+
+def test_synthetic_rows_are_deterministic():
+    now = datetime(2025, 1, 1, 10, 2, 0)
+    a = OfflineDrawProvider(seed=7, history_size=5).synthetic_rows("lucky8", now)
+    b = OfflineDrawProvider(seed=7, history_size=5).synthetic_rows("lucky8", now)
+    assert a == b
+    assert len(a) == 5
+    assert a[0]["preDrawTime"] == "2025-01-01 10:00:00"
+    assert len(a[0]["preDrawCode"].split(",")) == 8
+
+
+def test_replay_reveals_rows_as_virtual_time_advances(tmp_path):
+    start = datetime(2025, 1, 1, 10, 0, 0)
+    rows = [
+        {"preDrawIssue": str(i), "preDrawCode": "1,2,3,4,5,6,7,8",
+         "preDrawTime": (start + timedelta(minutes=5 * i)).strftime("%Y-%m-%d %H:%M:%S")}
+        for i in range(4)
+    ]
+    replay = tmp_path / "replay.json"
+    replay.write_text(json.dumps({"lucky8": list(reversed(rows)), "liuhecai": []}))
+
+    provider = OfflineDrawProvider(replay_file=str(replay))
+    visible = provider._replayed_rows("lucky8")
+    assert [r["preDrawIssue"] for r in visible] == ["2", "1", "0"]
+
+    provider._real_start -= timedelta(minutes=5)
+    assert provider._replayed_rows("lucky8")[0]["preDrawIssue"] == "3"
+
+
+@pytest.mark.asyncio
+async def test_client_runs_offline(monkeypatch):
+    monkeypatch.setenv("DRAW_PROVIDER", "offline")
+    monkeypatch.setenv("DRAW_OFFLINE_SPEED", "100")
+    monkeypatch.setenv("LUCKY8_API_BASE", "http://127.0.0.1:9")
+
+    client = DrawApiClient()
+    assert client.snapshot_path is None
+    assert client.time_scale == 100
+    assert await client.fetch_lucky8_results() is True
+    assert await client.fetch_draw_results() is True
+
+    result = await client.get_draw_result("lucky8")
+    assert result["issue"] != "random"
+    assert client.get_provider_stats() == {}
+
+
+def test_provider_without_fetch_cannot_be_constructed():
+    from external.draw_providers import DrawProvider
+
+    class Incomplete(DrawProvider):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,80 @@
+"""
+开奖记录全局存储测试（每期一条 draw_history + 群聊关联记录）
+"""
+from biz.draw.repo.draw_repo import DrawRepository
+from test.unit.fake_db import FakeResult, session_factory
+
+
+def _last_insert_id(sql, params):
+    if sql.startswith("SELECT LAST_INSERT_ID()"):
+        return FakeResult([(42,)])
+    return None
+
+
+class RecordingRepo(DrawRepository):
+    def __init__(self):
+        self.executed = []
+        super().__init__(session_factory(self.executed, _last_insert_id))
+
+    async def get_draw(self, draw_id):
+        return {"id": draw_id}
+
+
+DRAW = {
+    "chat_id": "chat_1",
+    "game_type": "lucky8",
+    "issue": "20250101100",
+    "draw_number": 4,
+    "draw_code": "1,2,3,4,5,6,7,8",
+    "special_number": 8,
+}
+
+
+async def test_chat_draw_writes_global_row_and_link():
+    repo = RecordingRepo()
+    draw = await repo.create(DRAW)
+
+    assert draw == {"id": 42}
+    history_sql, history_params = repo.executed[0]
+    assert "INSERT INTO draw_history" in history_sql
+    assert history_params["chat_id"] == "system"
+    link_sql, link_params = repo.executed[2]
+    assert "INSERT INTO draw_chat_results" in link_sql
+    assert link_params["draw_id"] == 42
+    assert link_params["chat_id"] == "chat_1"
+
+
+async def test_random_draw_only_writes_link():
+    repo = RecordingRepo()
+    assert await repo.create({**DRAW, "issue": "random"}) is None
+
+    assert [sql for sql, _ in repo.executed][1:] == ["COMMIT"]
+    assert "INSERT INTO draw_chat_results" in repo.executed[0][0]
+    assert repo.executed[0][1]["draw_id"] is None
+
+
+async def test_recent_draws_ignore_chat_id():
+    repo = RecordingRepo()
+    await repo.get_recent_draws("chat_1", limit=15, game_type="lucky8")
+
+    assert repo.executed[0][1]["chat_id"] == "system"
+
+
+
+async def test_issue_lookups_ignore_chat_id():
+    repo = RecordingRepo()
+    await repo.get_draw_by_issue("20250101100", "lucky8", "chat_1")
+    await repo.exists_issue("20250101100", "lucky8", "chat_1")
+
+    assert [params["chat_id"] for _, params in repo.executed] == ["system", "system"]
+
+
+async def test_create_draw_for_chat_writes_link_not_duplicate_row():
+    repo = RecordingRepo()
+    await repo.create_draw({**DRAW, "bet_count": 3})
+
+    assert repo.executed[0][1]["chat_id"] == "system"
+    link_sql, link_params = repo.executed[2]
+    assert "INSERT INTO draw_chat_results" in link_sql
+    assert link_params["chat_id"] == "chat_1"
+    assert link_params["bet_count"] == 3
@@ -0,0 +1,99 @@
+"""
+开奖缓存快照测试
+"""
+import json
+from datetime import datetime, timedelta
+
+from external.draw_api_client import DrawApiClient
+
+
+LUCKY8_ROWS = [
+    {"preDrawIssue": "20250101002", "preDrawCode": "1,2,3,4,5,6,7,9", "preDrawTime": "2025-01-01 00:05:00"},
+    {"preDrawIssue": "20250101001", "preDrawCode": "1,2,3,4,5,6,7,8", "preDrawTime": "2025-01-01 00:00:00"},
+]
+
+
+async def test_snapshot_round_trip(tmp_path, monkeypatch):
+    path = tmp_path / "draw_cache.json"
+    monkeypatch.setenv("DRAW_CACHE_SNAPSHOT", str(path))
+
+    client = DrawApiClient()
+    client._ingest_lucky8(LUCKY8_ROWS)
+    await client._save_snapshot()
+    assert path.exists()
+    assert not list(tmp_path.glob(".draw_cache_*"))
+
+    restored = DrawApiClient()
+    result = restored.get_latest_lucky8_draw_number()
+    assert result["is_random"] is False
+    assert result["issue"] == "20250101002"
+    assert restored.get_draw_stats()["snapshot_age_seconds"] is not None
+
+
+async def test_snapshot_written_only_when_content_changes(tmp_path, monkeypatch):
+    monkeypatch.setenv("DRAW_CACHE_SNAPSHOT", str(tmp_path / "draw_cache.json"))
+    client = DrawApiClient()
+    writes = []
+    monkeypatch.setattr(client, "_write_snapshot", writes.append)
+
+    client._ingest_lucky8(LUCKY8_ROWS)
+    await client._save_snapshot()
+    await client._save_snapshot()
+    assert len(writes) == 1
+
+    client._ingest_lucky8([
+        {"preDrawIssue": "20250101003", "preDrawCode": "1,2,3,4,5,6,7,10", "preDrawTime": "2025-01-01 00:10:00"},
+        *LUCKY8_ROWS,
+    ])
+    await client._save_snapshot()
+    assert len(writes) == 2
+    assert writes[1]["lucky8"][0]["preDrawIssue"] == "20250101003"
+
+
+def test_expired_snapshot_is_ignored(tmp_path, monkeypatch):
+    path = tmp_path / "draw_cache.json"
+    path.write_text(json.dumps({
+        "saved_at": (datetime.now() - timedelta(hours=48)).isoformat(),
+        "lucky8": LUCKY8_ROWS,
+        "liuhecai": [],
+    }))
+    monkeypatch.setenv("DRAW_CACHE_SNAPSHOT", str(path))
+
+    client = DrawApiClient()
+    assert client.get_latest_lucky8_draw_number()["is_random"] is True
+
+
+def test_corrupt_snapshot_is_ignored(tmp_path, monkeypatch):
+    path = tmp_path / "draw_cache.json"
+    path.write_text("{not json")
+    monkeypatch.setenv("DRAW_CACHE_SNAPSHOT", str(path))
+
+    client = DrawApiClient()
+    assert client.get_latest_lucky8_draw_number()["is_random"] is True
+
+
+def test_recent_draws_parsed_once_from_store(tmp_path, monkeypatch):
+    monkeypatch.setenv("DRAW_CACHE_SNAPSHOT", "")
+    client = DrawApiClient()
+    client._ingest_lucky8(LUCKY8_ROWS + [{"preDrawIssue": "bad", "preDrawCode": ""}])
+    client._ingest_marksix([
+        {"expect": "2025,001", "openCode": "1,2,3,4,5,6,49", "drawTime": "2025-01-01 21:30:00"},
+        {"expect": "2025,000", "openCode": "1,2,3", "drawTime": "2024-12-31 21:30:00"},
+    ])
+
+    lucky8 = client.get_recent_lucky8_draws(limit=15)
+    assert [d["issue"] for d in lucky8] == ["20250101002", "20250101001"]
+    assert lucky8[0]["draw_number"] == "1"
+    assert lucky8[0]["special_number"] == 9
+    assert lucky8[0]["numbers"] == [1, 2, 3, 4, 5, 6, 7, 9]
+
+    marksix = client.get_recent_marksix_draws(limit=15)
+    assert marksix == [{
+        "issue": "2025特001",
+        "draw_number": "49",
+        "draw_code": "1,2,3,4,5,6,49",
+        "special_number": 49,
+        "timestamp": "2025-01-01 21:30:00",
+        "numbers": [1, 2, 3, 4, 5, 6, 49],
+    }]
+    assert client.get_latest_marksix_tema()["issue"] == "2025特001"
@@ -0,0 +1,88 @@
+"""
+单期风险敞口账本测试
+"""
+from decimal import Decimal
+
+import pytest
+
+from biz.bet.repo.bet_repo import BetRepository
+from biz.bet.repo.exposure_ledger import ExposureLedger, entry_for_bet, entry_for_new_bet
+from biz.bet.repo.pending_bet_book import PendingBetBook
+from test.unit.fake_db import FakeResult, FakeRow, session_factory
+
+
+def _new_bet(amount: int, number: int = 3, odds: str = "3") -> dict:
+    return {"type": "fan", "number": number, "amount_cents": amount * 100, "odds": Decimal(odds), "odds_bp": int(odds) * 10000}
+
+
+def test_stake_limit_counts_committed_and_reserved():
+    ledger = ExposureLedger(payout_multiple=Decimal("0"))
+    limits = {"fan": Decimal("1000")}
+    ledger.add_bet({
+        "game_type": "lucky8", "issue": "100", "lottery_type": "fan",
+        "bet_details": {"type": "fan", "number": 3}, "bet_amount": Decimal("600"), "odds": Decimal("3"),
+    })
+
+    first = [entry_for_new_bet("lucky8", "100", _new_bet(300))]
+    assert ledger.reserve(first, limits) is None
+
+    # 600 已入库 + 300 预占，再下 200 超限；其它号码和其它期号不受影响
+    assert ledger.reserve([entry_for_new_bet("lucky8", "100", _new_bet(200))], limits) == ("lucky8", "100", "fan", "3")
+    assert ledger.reserve([entry_for_new_bet("lucky8", "100", _new_bet(200, number=4))], limits) is None
+    assert ledger.reserve([entry_for_new_bet("lucky8", "101", _new_bet(200))], limits) is None
+
+    ledger.release(first)
+    assert ledger.reserve([entry_for_new_bet("lucky8", "100", _new_bet(200))], limits) is None
+    assert ledger.get_stats()["rejected"] == 1
+
+
+def test_payout_limit_and_all_or_nothing():
+    ledger = ExposureLedger(payout_multiple=Decimal("1"))
+    limits = {"fan": Decimal("1000")}
+
+    # 下注额 400 未超限，但派彩 400×3 超过 1000：整单不预占
+    entries = [
+        entry_for_new_bet("lucky8", "100", _new_bet(100, number=1)),
+        entry_for_new_bet("lucky8", "100", _new_bet(400, number=2)),
+    ]
+    assert ledger.reserve(entries, limits) == ("lucky8", "100", "fan", "2")
+    assert ledger.exposure(("lucky8", "100", "fan", "1")) == (Decimal("0"), Decimal("0"))
+
+
+def test_row_and_new_bet_share_key():
+    details = {"type": "jiao", "numbers": [2, 1], "amount_cents": 5000, "odds": Decimal("1.5"), "odds_bp": 15000}
+    row = {
+        "game_type": "lucky8", "issue": "100", "lottery_type": "jiao",
+        "bet_details": details, "bet_amount": Decimal("50"), "odds": Decimal("1.5"),
+    }
+    assert entry_for_bet(row)[0] == entry_for_new_bet("lucky8", "100", details)[0] == ("lucky8", "100", "jiao", "12")
+
+
+@pytest.mark.asyncio
+async def test_limit_enforced_from_db_before_book_is_ready():
+    # 账本加载中：已入库的 1000 已达限额，新下注须按数据库汇总拒绝
+    book = PendingBetBook()
+    book.begin_load()
+    row = {
+        "id": "b1", "user_id": "u1", "chat_id": "c1", "game_type": "lucky8", "issue": "100",
+        "lottery_type": "fan", "bet_number": 3, "bet_details": '{"type": "fan", "number": 3}',
+        "bet_amount": Decimal("1000"), "odds": Decimal("3"), "status": "active", "result": "pending",
+    }
+    executed = []
+    repo = BetRepository(
+        session_factory(executed, lambda sql, params: FakeResult([FakeRow(dict(row))])),
+        pending_book=book
+    )
+    limits = {"fan": Decimal("1000")}
+
+    committed = await repo.get_pending_exposure("100", ["fan"])
+
+    assert executed[0][1] == {"issue": "100", "bet_types": ["fan"]}
+    entries = [entry_for_new_bet("lucky8", "100", _new_bet(100))]
+    assert book.exposure.reserve(entries, limits, committed) == ("lucky8", "100", "fan", "3")
+    assert book.exposure.reserve([entry_for_new_bet("lucky8", "100", _new_bet(100, number=4))], limits, committed) is None
+
+    # 加载完成后改用账本，不再查库
+    book.finish_load([row])
+    assert await repo.get_pending_exposure("100", ["fan"]) is None
+    assert book.exposure.reserve(entries, limits) == ("lucky8", "100", "fan", "3")
@@ -0,0 +1,66 @@
+"""
+历史开奖同步测试
+"""
+from datetime import datetime
+
+from biz.game.scheduler.draw_scheduler import DrawScheduler, build_history_rows
+
+
+class FakeDrawClient:
+    def __init__(self, recent):
+        self.recent = recent
+
+    async def fetch_lucky8_results(self):
+        return True
+
+    async def fetch_draw_results(self):
+        return True
+
+    async def get_recent_draws(self, game_type, limit=50):
+        return self.recent.get(game_type, [])
+
+
+class FakeDrawRepo:
+    def __init__(self, existing=()):
+        self.existing = set(existing)
+        self.upserts = []
+
+    async def exists_issue(self, issue, game_type="lucky8", chat_id="system"):
+        return (game_type, issue) in self.existing
+
+    async def upsert_many(self, draws, chunk_size=500):
+        self.upserts.append(draws)
+        return len(draws)
+
+
+LUCKY8_RECENT = [
+    {"issue": "20250101101", "draw_number": "2", "draw_code": "1,2,3,4,5,6,7,10",
+     "special_number": 10, "timestamp": "2025-01-01 10:05:00"},
+    {"issue": "20250101100", "draw_number": "4", "draw_code": "1,2,3,4,5,6,7,8",
+     "special_number": 8, "timestamp": "2025-01-01 10:00:00"},
+]
+
+
+def test_build_history_rows_uses_upstream_time():
+    rows = build_history_rows("lucky8", LUCKY8_RECENT + [{"issue": None}])
+    assert len(rows) == 2
+    assert rows[0]["chat_id"] == "system"
+    assert rows[0]["draw_number"] == 2
+    assert rows[0]["draw_time"] == datetime(2025, 1, 1, 10, 5, 0)
+
+
+async def test_sync_writes_batch_once_per_game():
+    repo = FakeDrawRepo()
+    scheduler = DrawScheduler(game_service=None, bot_client=None)
+    await scheduler._history_sync_once(repo, FakeDrawClient({"lucky8": LUCKY8_RECENT}))
+
+    assert len(repo.upserts) == 1
+    assert [r["issue"] for r in repo.upserts[0]] == ["20250101101", "20250101100"]
+
+
+async def test_sync_skips_when_newest_issue_stored():
+    repo = FakeDrawRepo(existing={("lucky8", "20250101101")})
+    scheduler = DrawScheduler(game_service=None, bot_client=None)
+    await scheduler._history_sync_once(repo, FakeDrawClient({"lucky8": LUCKY8_RECENT}))
+
+    assert repo.upserts == []
@@ -0,0 +1,31 @@
+"""
+表结构指纹测试
+"""
+from sqlalchemy import MetaData, Table, Column, Integer, String, Index
+
+from base.init_db import compute_schema_fingerprint
+
+
+def _build_metadata(with_index: bool = False, name_length: int = 50) -> MetaData:
+    metadata = MetaData()
+    table = Table(
+        "demo",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("name", String(name_length)),
+    )
+    if with_index:
+        Index("idx_demo_name", table.c.name)
+    return metadata
+
+
+def test_fingerprint_is_stable():
+    assert compute_schema_fingerprint(_build_metadata()) == compute_schema_fingerprint(_build_metadata())
+
+
+def test_fingerprint_changes_with_column_type():
+    assert compute_schema_fingerprint(_build_metadata()) != compute_schema_fingerprint(_build_metadata(name_length=100))
+
+
+def test_fingerprint_changes_with_index():
+    assert compute_schema_fingerprint(_build_metadata()) != compute_schema_fingerprint(_build_metadata(with_index=True))
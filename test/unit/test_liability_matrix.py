@@ -0,0 +1,54 @@
+"""
+实时盈亏矩阵测试
+"""
+from biz.bet.repo.pending_bet_book import PendingBetBook
+from biz.game.logic.liability_matrix import LiabilityMatrix
+
+
+def _bet(bet_id: str, game_type: str, details: dict, amount: float, odds: float) -> dict:
+    # 与 get_bet 返回一致：bet_details 经 JSON 往返，金额/赔率为 float
+    return {
+        "id": bet_id, "user_id": "u1", "chat_id": "c1", "issue": "100",
+        "game_type": game_type, "lottery_type": details["type"], "bet_amount": amount, "odds": odds,
+        "bet_details": {**details, "amount": amount, "odds": odds},
+    }
+
+
+def _book_with_matrix():
+    book = PendingBetBook()
+    book.begin_load()
+    book.finish_load([])
+    matrix = LiabilityMatrix()
+    book.add_listener(matrix)
+    return book, matrix
+
+
+def test_lucky8_matrix_follows_fan_and_special():
+    book, matrix = _book_with_matrix()
+    book.add(_bet("b1", "lucky8", {"type": "fan", "number": 3}, 100, 3))
+    book.add(_bet("b2", "lucky8", {"type": "tema", "number": 5}, 10, 10))
+
+    snapshot = matrix.snapshot("lucky8")
+    assert snapshot["pendingBets"] == 2 and snapshot["totalStake"] == 110
+    assert len(snapshot["matrix"]) == 4 and len(snapshot["matrix"][0]) == 20
+    # 番3 + 特码5：两笔都中
+    assert snapshot["matrix"][2][4] == -200 - 90
+    # 番1 + 特码1：两笔都输
+    assert snapshot["matrix"][0][0] == 110
+    assert snapshot["worst"] == {"fan": 3, "special": 5, "pnl": -290}
+
+    book.discard(["b1", "b2"])
+    assert matrix.snapshot("lucky8")["matrix"][2][4] == 0
+
+
+def test_liuhecai_single_row_and_existing_bets_seeded():
+    book = PendingBetBook()
+    book.begin_load()
+    book.finish_load([_bet("b1", "liuhecai", {"type": "tema", "number": 49}, 20, 40)])
+    matrix = LiabilityMatrix()
+    book.add_listener(matrix)
+
+    snapshot = matrix.snapshot("liuhecai")
+    assert snapshot["fans"] is None and len(snapshot["matrix"]) == 1
+    assert snapshot["matrix"][0][48] == -780
+    assert snapshot["matrix"][0][0] == 20
@@ -0,0 +1,88 @@
+"""
+定点整数金额测试：整数分/基点的结算结果与 Decimal 路径（calculate_result）逐一一致
+"""
+from decimal import Decimal
+
+from biz.game.logic import game_logic, money, outcome_table
+from test.unit.test_outcome_table import _signatures
+
+AMOUNTS = ["0.01", "0.05", "0.50", "1", "12.34", "37.50", "99.99", "100", "12345.67"]
+ODDS = ["0.95", "1.01", "1.05", "1.3", "1.8", "2", "2.85", "3.2", "3.5", "9.85", "10.5", "40"]
+
+
+def test_half_even_division_matches_decimal_rounding():
+    for numerator in range(0, 40001, 7):
+        expected = round(Decimal(numerator) / 10000, 2)
+        assert money.from_cents(money.div_half_even(numerator, 100)) == expected, numerator
+
+
+def test_exact_conversion_and_fallback():
+    assert money.exact_cents(Decimal("12.30")) == 1230
+    assert money.exact_cents(3.2) == 320
+    assert money.exact_cents(7) == 700
+    assert money.exact_cents(Decimal("1.005")) is None
+    assert money.to_cents(Decimal("1.005")) == 100
+    assert money.exact_basis_points(Decimal("2.85")) == 28500
+    assert money.from_cents(-3750) == Decimal("-37.50")
+
+
+def test_integer_settlement_matches_decimal_for_every_case():
+    for sig in _signatures():
+        for amount in AMOUNTS:
+            for odds in ODDS:
+                bet = {**sig, "bet_amount": Decimal(amount), "odds": Decimal(odds)}
+                for index in range(outcome_table.OUTCOME_COUNT):
+                    fan, special = outcome_table.outcome(index)
+                    expected = game_logic.calculate_result(bet, "", fan, special)
+                    assert outcome_table.settle(bet, "lucky8", "", fan, special) == expected, (sig, amount, odds, fan, special)
+
+
+def test_inexact_amount_uses_decimal_path():
+    bet = {"type": "fan", "number": 1, "bet_amount": Decimal("1.005"), "odds": Decimal("2")}
+    assert outcome_table.amounts_cents(bet) is None
+    assert outcome_table.settle(bet, "lucky8", "", 1, 1) == game_logic.calculate_result(bet, "", 1, 1)
+
+
+def test_liuhecai_settlement_matches_decimal():
+    for number in range(1, 50):
+        for amount in AMOUNTS:
+            for odds in ODDS:
+                bet = {"type": "tema", "number": number, "bet_amount": Decimal(amount), "odds": Decimal(odds)}
+                for special in range(1, 50):
+                    expected = game_logic.calculate_result(bet, "", special, special)
+                    assert outcome_table.settle(bet, "liuhecai", "", special, special) == expected, (number, amount, odds, special)
+
+
+class _DefaultOdds:
+    async def get_odds(self, bet_type, game_type):
+        return None
+
+
+async def test_parsed_bets_carry_exact_cents_and_basis_points():
+    message = "番 3/200 2番0150 正1/75 1念2/300 角12/200 34通/150 3无4/220 123/500 单200 双150 5特20 2.10.30.100"
+    bets = await game_logic.parse_bets(message, "alice", _DefaultOdds())
+
+    assert bets
+    for bet in bets:
+        assert isinstance(bet["amount_cents"], int)
+        assert bet["odds_bp"] == money.exact_basis_points(bet["odds"])
+        # 与按原文构造 Decimal 的旧路径结算结果一致
+        decimal_bet = {**bet, "amount": money.from_cents(bet["amount_cents"])}
+        for index in range(outcome_table.OUTCOME_COUNT):
+            fan, special = outcome_table.outcome(index)
+            assert outcome_table.settle(bet, "lucky8", "", fan, special) == \
+                game_logic.calculate_result(decimal_bet, "", fan, special)
+
+    summary = game_logic.format_bet_summary(bets)
+    assert "番 3 - 200元 (赔率3.0)" in summary
+    assert "番 2 - 150元" in summary
+    assert "特码 30 - 100元" in summary
+    assert bets[-1]["raw"] == "30.100"
+
+
+def test_rebate_units_match_decimal_ratio():
+    for amount in ["1", "7", "150", "999", "12345"]:
+        for percent in ["0", "0.5", "1", "1.25", "1.5", "2.75", "3"]:
+            expected = Decimal(amount) * (Decimal(percent) / Decimal("100"))
+            units = money.parse_cents(amount) * money.percent_basis_points(Decimal(percent))
+            assert money.from_cents_bp(units) == expected, (amount, percent)
@@ -0,0 +1,51 @@
+"""
+幸运8 结算结果表测试：查表结果与 calculate_result 逐个结果一致
+"""
+from decimal import Decimal
+from itertools import combinations, permutations
+
+from biz.game.logic import game_logic, outcome_table
+
+
+def _signatures():
+    for n in range(1, 5):
+        yield {"type": "fan", "number": n}
+        yield {"type": "zheng", "number": n}
+    for first, second in permutations(range(1, 5), 2):
+        yield {"type": "nian", "first": first, "second": second}
+        yield {"type": "tong", "first": first, "second": second}
+        yield {"type": "zheng_jin", "number": first, "jin_number": second}
+    for numbers in combinations(range(1, 5), 2):
+        yield {"type": "jiao", "numbers": list(numbers)}
+    for numbers in combinations(range(1, 5), 3):
+        yield {"type": "zhong", "numbers": list(numbers)}
+    yield {"type": "odd"}
+    yield {"type": "even"}
+    for n in range(1, 21):
+        yield {"type": "tema", "number": n}
+
+
+def test_lookup_matches_calculate_result_for_every_outcome():
+    for sig in _signatures():
+        bet = {**sig, "bet_amount": Decimal("37.50"), "odds": Decimal("2.85")}
+        for index in range(outcome_table.OUTCOME_COUNT):
+            fan, special = outcome_table.outcome(index)
+            expected = game_logic.calculate_result(bet, "", fan, special)
+            assert outcome_table.settle(bet, "lucky8", "", fan, special) == expected, (sig, fan, special)
+
+
+def test_same_signature_compiles_once():
+    first = outcome_table.compile_signature({"type": "fan", "number": 2, "amount": 10, "odds": 3})
+    second = outcome_table.compile_signature({"type": "fan", "number": 2, "amount": 99, "odds": 9})
+    assert first is second
+    assert first.count(outcome_table.WIN) == outcome_table.SPECIALS
+
+
+def test_out_of_table_draws_fall_back():
+    bet = {"type": "tema", "number": 33, "bet_amount": Decimal("10"), "odds": Decimal("40")}
+    assert outcome_table.outcome_index(3, None) is None
+    assert outcome_table.settle(bet, "liuhecai", "", 33, 33) == game_logic.calculate_result(bet, "", 33, 33)
+
+    odd = {"type": "odd", "bet_amount": Decimal("10"), "odds": Decimal("2")}
+    draw_code = "1,2,3,4,5,6,7,9"
+    assert outcome_table.settle(odd, "lucky8", draw_code, 2, None) == game_logic.calculate_result(odd, draw_code, 2, None)
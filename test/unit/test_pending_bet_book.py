@@ -0,0 +1,89 @@
+"""
+待结算投注内存账本测试
+"""
+from datetime import datetime
+
+import pytest
+
+from biz.bet.repo.bet_repo import BetRepository
+from biz.bet.repo.pending_bet_book import PendingBetBook
+from test.unit.fake_db import FakeResult, FakeRow, session_factory
+
+
+def _bet(bet_id: str, user_id: str = "u1", chat_id: str = "c1", issue: str = "100") -> dict:
+    return {
+        "id": bet_id, "user_id": user_id, "chat_id": chat_id, "issue": issue,
+        "game_type": "lucky8", "lottery_type": "fan", "bet_number": 1, "bet_amount": 100, "odds": 3,
+    }
+
+
+def _ready_book(*bets) -> PendingBetBook:
+    book = PendingBetBook()
+    book.begin_load()
+    book.finish_load(list(bets))
+    return book
+
+
+def test_indexes_by_user_and_issue():
+    book = _ready_book(_bet("b1"), _bet("b2", user_id="u2"), _bet("b3", issue="101"), _bet("b4", chat_id="c2"))
+
+    assert [b["id"] for b in book.chat_bets("c1")] == ["b1", "b2", "b3"]
+    assert [b["id"] for b in book.user_bets("c1", "u1")] == ["b1", "b3"]
+    assert [b["id"] for b in book.issue_bets("c1", "100")] == ["b1", "b2"]
+    assert book.user_bets("c2", "u2") == []
+
+
+def test_discard_clears_all_indexes():
+    book = _ready_book(_bet("b1"), _bet("b2"))
+
+    book.discard(["b1", "missing"])
+    assert [b["id"] for b in book.user_bets("c1", "u1")] == ["b2"]
+
+    book.discard(["b2"])
+    assert book.chat_bets("c1") == []
+    stats = book.get_stats()
+    assert (stats["ready"], stats["chats"], stats["bets"]) == (True, 0, 0)
+
+
+def test_writes_during_load_are_replayed():
+    book = PendingBetBook()
+    book.begin_load()
+    assert not book.ready
+
+    # 快照查询期间：b1 已被结算，b3 新下注
+    book.discard(["b1"])
+    book.add(_bet("b3"))
+    book.finish_load([_bet("b1"), _bet("b2")])
+
+    assert book.ready
+    assert [b["id"] for b in book.chat_bets("c1")] == ["b2", "b3"]
+
+
+def test_failed_load_stays_not_ready():
+    book = PendingBetBook()
+    book.begin_load()
+    book.add(_bet("b1"))
+    book.abort_load()
+
+    assert not book.ready
+    assert book.chat_bets("c1") == []
+
+
+@pytest.mark.asyncio
+async def test_bet_history_reads_pending_part_from_book():
+    today = datetime(2025, 1, 1)
+    pending = {**_bet("b3"), "created_at": datetime(2025, 1, 1, 12)}
+    yesterday = {**_bet("b1", issue="99"), "created_at": datetime(2024, 12, 31, 23)}
+    settled = {**_bet("b2"), "result": "win", "created_at": datetime(2025, 1, 1, 9)}
+    executed = []
+    repo = BetRepository(
+        session_factory(executed, lambda sql, params: FakeResult([FakeRow(settled)])),
+        pending_book=_ready_book(yesterday, pending)
+    )
+
+    bets = await repo.get_user_bets_since("u1", "c1", today)
+
+    assert [bet["id"] for bet in bets] == ["b3", "b2"]
+    assert "NOT (status = 'active' AND result = 'pending')" in executed[0][0]
+    assert [bet["id"] for bet in await repo.get_user_pending_bets("u1", "c1", "99")] == ["b1"]
+    assert len(executed) == 1
@@ -0,0 +1,66 @@
+"""
+热点查询执行计划校验单元测试
+只测试 EXPLAIN 结果判定逻辑，不依赖数据库
+"""
+from migrations.check_query_plans import HOT_QUERIES, find_plan_problems
+
+
+class TestFindPlanProblems:
+    """测试执行计划判定"""
+
+    def test_index_range_scan_passes(self):
+        rows = [{"table": "bets", "type": "ref", "key": "idx_bets_chat_pending", "Extra": "Using index condition"}]
+        assert find_plan_problems(rows) == []
+
+    def test_full_scan_detected(self):
+        rows = [{"table": "bets", "type": "ALL", "key": None, "Extra": "Using where"}]
+        problems = find_plan_problems(rows)
+        assert len(problems) == 1
+        assert "type=ALL" in problems[0]
+
+    def test_filesort_detected(self):
+        rows = [{"table": "draw_history", "type": "ref", "key": "ix_draw_history_game_type", "Extra": "Using where; Using filesort"}]
+        problems = find_plan_problems(rows)
+        assert problems == ["draw_history: Using filesort"]
+
+    def test_full_scan_with_filesort_reports_both(self):
+        rows = [{"table": "users", "type": "ALL", "Extra": "Using where; Using filesort"}]
+        assert len(find_plan_problems(rows)) == 2
+
+    def test_missing_expected_index_detected(self):
+        rows = [{"table": "draw_history", "type": "ref", "key": "idx_draw_issue_game_chat", "Extra": ""}]
+        problems = find_plan_problems(rows, ["uq_draw_game_chat_issue"])
+        assert problems == ["未使用索引 uq_draw_game_chat_issue（实际: idx_draw_issue_game_chat）"]
+
+    def test_union_derived_table_is_not_a_problem(self):
+        rows = [
+            {"table": "<derived2>", "type": "ALL", "key": None, "Extra": "Using where; Using filesort"},
+            {"table": "draw_history", "type": "range", "key": "idx_draw_game_ts", "Extra": "Using where"},
+            {"table": "draw_history_archive", "type": "range", "key": "idx_draw_game_ts", "Extra": "Using where"},
+        ]
+        assert find_plan_problems(rows, ["idx_draw_game_ts"]) == []
+
+
+def test_hot_queries_are_unique_and_parameterized():
+    """热点查询名唯一，且 SQL 中的参数都已提供示例值"""
+    import re
+
+    names = [q["name"] for q in HOT_QUERIES]
+    assert len(names) == len(set(names))
+
+    for query in HOT_QUERIES:
+        placeholders = set(re.findall(r":(\w+)", query["sql"]))
+        assert placeholders <= set(query["params"]), query["name"]
+
+
+def test_hot_queries_use_repository_sql():
+    """热点查询直接引用 Repository 的 SQL 常量，并覆盖冷表合并读取与结算运行查询"""
+    from biz.bet.repo import bet_repo
+    from biz.draw.repo import draw_repo
+
+    by_name = {q["name"]: q for q in HOT_QUERIES}
+    assert by_name["bets.get_all_pending_bets"]["sql"] is bet_repo.PENDING_BETS_BY_CHAT_SQL
+    assert by_name["draw_history.get_draw_by_issue"]["indexes"] == ("uq_draw_game_chat_issue",)
+    assert by_name["draw_chat_results.get_unfinished_runs"]["sql"] is draw_repo.UNFINISHED_RUNS_SQL
+    assert "UNION ALL SELECT * FROM bet_orders_archive" in by_name["bet_orders.member_bet_orders[archive]"]["sql"]
+    assert not any("idx_draw_issue_game_chat" in q["indexes"] for q in HOT_QUERIES)
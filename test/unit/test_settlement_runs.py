@@ -0,0 +1,192 @@
+"""
+结算运行检查点测试（claimed → computed → committed → announced）
+"""
+import asyncio
+
+import pytest
+
+from biz.all_tables import DrawChatResultTable
+from biz.draw.repo.draw_repo import DrawRepository
+from biz.game.service.game_service import GameService
+from test.unit.fake_db import FakeResult, FakeRow, session_factory
+
+
+def _run_rows(rows):
+    """SELECT draw_chat_results 依次返回 rows 中的记录"""
+    return lambda sql, params: FakeResult([rows.pop(0)]) if "SELECT * FROM draw_chat_results" in sql else None
+
+
+RUN = {
+    "id": 7, "chat_id": "c1", "game_type": "lucky8", "issue": "100", "status": "claimed",
+    "draw_number": 3, "draw_code": "1,2,3,4,5,6,7,8", "special_number": 8, "bet_ids": None,
+}
+
+
+@pytest.mark.asyncio
+async def test_claim_creates_run_once():
+    executed = []
+    repo = DrawRepository(session_factory(executed, _run_rows([None, FakeRow(dict(RUN))])))
+
+    run = await repo.claim_settlement_run("c1", "lucky8", {"issue": "100", "draw_number": 3, "draw_code": "x"})
+
+    assert run["status"] == "claimed"
+    assert "INSERT INTO draw_chat_results" in executed[1][0]
+    assert executed[1][1]["status"] == "claimed"
+
+
+@pytest.mark.asyncio
+async def test_claim_returns_finished_run_untouched():
+    executed = []
+    finished = {**RUN, "status": "announced", "bet_ids": '["b1"]'}
+    repo = DrawRepository(session_factory(executed, _run_rows([FakeRow(finished)])))
+
+    run = await repo.claim_settlement_run("c1", "lucky8", {"issue": "100"})
+
+    assert run["status"] == "announced"
+    assert run["bet_ids"] == ["b1"]
+    assert [sql for sql, _ in executed][1:] == ["COMMIT"]
+
+
+class FakeBetRepo:
+    def __init__(self, bets):
+        self.bets = {bet["id"]: bet for bet in bets}
+        self.commits = []
+
+    async def get_bets_by_ids(self, bet_ids):
+        return [self.bets[bet_id] for bet_id in bet_ids if bet_id in self.bets]
+
+    async def commit_settlement(self, chat_id, issue, draw_number, draw_code, settlements, run_id=None):
+        self.commits.append((issue, draw_number, [item["bet_id"] for item in settlements], run_id))
+        return [item["bet_id"] for item in settlements]
+
+
+class FakeDrawRepo:
+    def __init__(self, runs=()):
+        self.runs = list(runs)
+        self.announced = []
+
+    async def get_unfinished_runs(self, chat_id=None):
+        return [run for run in self.runs if chat_id is None or run["chat_id"] == chat_id]
+
+    async def mark_run_announced(self, run_id):
+        self.announced.append(run_id)
+        self.runs = [run for run in self.runs if run["id"] != run_id]
+        return True
+
+    async def get_recent_draws(self, *args, **kwargs):
+        return []
+
+
+class FakeUserRepo:
+    async def get_user_in_chat(self, user_id, chat_id):
+        return {"username": f"name_{user_id}"}
+
+
+def _bet(bet_id, result="pending", pnl=0):
+    return {
+        "id": bet_id, "user_id": "u1", "chat_id": "c1", "issue": "100", "game_type": "lucky8",
+        "lottery_type": "fan", "bet_number": 3, "bet_amount": 100, "odds": 3, "result": result, "pnl": pnl,
+    }
+
+
+def _service(bet_repo, draw_repo):
+    service = GameService(
+        user_service=None, user_repo=FakeUserRepo(), bet_repo=bet_repo, chat_repo=None,
+        draw_repo=draw_repo, odds_service=None, bot_api_client=None, exposure_ledger=object()
+    )
+    service.announcements = []
+
+    async def announce(chat_id, game_type, draw_result, results, image_task):
+        service.announcements.append((draw_result["issue"], [r["betId"] for r in results]))
+
+    service._announce_draw = announce
+    return service
+
+
+@pytest.mark.asyncio
+async def test_recover_computed_run_settles_only_recorded_pending_bets():
+    # b1 在退出前已入账，b3 是之后的新注单：恢复只结算 b2，且按运行记录的开奖号码
+    bet_repo = FakeBetRepo([_bet("b1", result="win"), _bet("b2"), _bet("b3")])
+    run = {**RUN, "status": "computed", "bet_ids": ["b1", "b2"]}
+    draw_repo = FakeDrawRepo([run])
+    service = _service(bet_repo, draw_repo)
+
+    assert await service.recover_settlement_runs() == 1
+
+    assert bet_repo.commits == [("100", 3, ["b2"], 7)]
+    assert service.announcements == [("100", ["b2"])]
+    assert draw_repo.announced == [7]
+
+
+@pytest.mark.asyncio
+async def test_recover_committed_run_only_announces():
+    bet_repo = FakeBetRepo([_bet("b1", result="win", pnl=200), _bet("b2", result="cancelled")])
+    run = {**RUN, "status": "committed", "bet_ids": ["b1", "b2"]}
+    draw_repo = FakeDrawRepo([run])
+    service = _service(bet_repo, draw_repo)
+
+    assert await service.recover_settlement_runs() == 1
+
+    assert bet_repo.commits == []
+    assert service.announcements == [("100", ["b1"])]
+    assert draw_repo.announced == [7]
+
+
+@pytest.mark.asyncio
+async def test_execute_draw_waits_for_run_being_recovered():
+    # 启动恢复正在推进 computed 运行时，定时开奖须等其完成后才去取新一期
+    release = asyncio.Event()
+    order = []
+
+    class SlowBetRepo(FakeBetRepo):
+        async def commit_settlement(self, *args, **kwargs):
+            await release.wait()
+            order.append("committed")
+            return await super().commit_settlement(*args, **kwargs)
+
+    class FakeChatRepo:
+        async def get_by_id(self, chat_id):
+            return {"id": chat_id, "game_type": "lucky8"}
+
+    class FakeBot:
+        async def send_message(self, chat_id, text):
+            pass
+
+    bet_repo = SlowBetRepo([_bet("b2")])
+    draw_repo = FakeDrawRepo([{**RUN, "status": "computed", "bet_ids": ["b2"]}])
+    service = _service(bet_repo, draw_repo)
+    service.chat_repo = FakeChatRepo()
+    service.bot_client = FakeBot()
+
+    async def fetch_draw_result(game_type):
+        order.append("fetch")
+        return None
+
+    service._fetch_draw_result = fetch_draw_result
+
+    recovery = asyncio.create_task(service.recover_settlement_runs())
+    await asyncio.sleep(0)
+    draw = asyncio.create_task(service.execute_draw("c1"))
+    await asyncio.sleep(0)
+    assert order == []
+
+    release.set()
+    assert await recovery == 1
+    await draw
+
+    assert order == ["committed", "fetch"]
+    assert bet_repo.commits == [("100", 3, ["b2"], 7)]
+
+
+@pytest.mark.asyncio
+async def test_new_link_row_is_a_claimed_run_not_legacy():
+    executed = []
+    repo = DrawRepository(session_factory(executed))
+    await repo.create({"chat_id": "c1", "game_type": "lucky8", "issue": "random", "draw_number": 3,
+                       "draw_code": "1,2,3,4,5,6,7,8", "special_number": 8})
+
+    link_sql, link_params = executed[0]
+    assert "INSERT INTO draw_chat_results" in link_sql
+    assert link_params["status"] == "claimed"
+    assert link_params["draw_code"] == "1,2,3,4,5,6,7,8"
+    assert DrawChatResultTable(chat_id="c1", issue="100").status == "claimed"
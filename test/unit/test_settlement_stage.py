@@ -0,0 +1,65 @@
+"""
+预结算暂存区测试
+"""
+import asyncio
+
+import pytest
+
+from biz.game.service.settlement_stage import SettlementStage
+
+
+@pytest.mark.asyncio
+async def test_concurrent_stage_computes_once():
+    stage = SettlementStage()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"bet_ids": frozenset({"b1"})}
+
+    first, second = await asyncio.gather(
+        stage.stage(("c1", "100"), compute),
+        stage.stage(("c1", "100"), compute),
+    )
+    assert first is second
+    assert len(calls) == 1
+    assert stage.has(("c1", "100"))
+
+    # 已暂存：再次预结算直接返回
+    assert await stage.stage(("c1", "100"), compute) is first
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_newer_issue_replaces_and_take_consumes():
+    stage = SettlementStage()
+
+    async def compute():
+        return {}
+
+    await stage.stage(("c1", "100"), compute)
+    await stage.stage(("c1", "101"), compute)
+    await stage.stage(("c2", "100"), compute)
+
+    assert not stage.has(("c1", "100"))
+    assert stage.take(("c1", "101")) == {}
+    assert stage.take(("c1", "101")) is None
+    assert stage.get_stats()["pending"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_abort_staging():
+    stage = SettlementStage()
+    release = asyncio.Event()
+
+    async def compute():
+        await release.wait()
+        return {"ok": True}
+
+    caller = asyncio.create_task(stage.stage(("c1", "100"), compute))
+    await asyncio.sleep(0)
+    caller.cancel()
+    release.set()
+
+    assert await stage.stage(("c1", "100"), compute) == {"ok": True}
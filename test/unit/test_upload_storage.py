@@ -0,0 +1,68 @@
+"""
+开奖图片目录管理测试
+"""
+import os
+import time
+
+from utils.upload_storage import UploadStorage
+
+
+def _temp(root, content: bytes) -> str:
+    path = os.path.join(root, f".render_{time.time_ns()}.png")
+    with open(path, "wb") as f:
+        f.write(content)
+    return path
+
+
+def test_identical_content_stored_once_in_shard(tmp_path):
+    storage = UploadStorage(str(tmp_path), max_bytes=10_000, max_age_hours=1)
+
+    first = storage.store(_temp(str(tmp_path), b"image"), "draw_lucky8")
+    second = storage.store(_temp(str(tmp_path), b"image"), "draw_lucky8")
+
+    assert first == second
+    assert os.path.dirname(first) != str(tmp_path)
+    assert storage.public_path(first).count("/") == 1
+    assert not list(tmp_path.glob(".render_*"))
+    assert storage.get_stats()["dedup_hits"] == 1
+
+
+def test_sweep_evicts_expired_and_least_recent(tmp_path):
+    storage = UploadStorage(str(tmp_path), max_bytes=10, max_age_hours=1)
+    now = time.time()
+    paths = []
+    for i, age in enumerate([7200, 120, 60, 0]):
+        path = storage.store(_temp(str(tmp_path), f"img{i}".encode()), "draw_lucky8")
+        os.utime(path, (now - age, now - age))
+        paths.append(path)
+    unmanaged = tmp_path / "avatar.png"
+    unmanaged.write_bytes(b"user upload")
+    os.utime(unmanaged, (now - 7200, now - 7200))
+
+    result = storage.sweep(now=now)
+
+    # 超期的 paths[0] 被删；剩余12字节超过上限10，再删最旧的 paths[1]
+    assert [os.path.exists(p) for p in paths] == [False, False, True, True]
+    assert unmanaged.exists()
+    assert result["files"] == 2
+    assert storage.get_stats()["bytes"] == 8
+
+
+def test_store_rewrites_file_removed_by_concurrent_sweep(tmp_path, monkeypatch):
+    storage = UploadStorage(str(tmp_path), max_bytes=10_000, max_age_hours=1)
+    path = storage.store(_temp(str(tmp_path), b"image"), "draw_lucky8")
+
+    # 清理线程在 store 刷新最后使用时间之前删除了同名文件
+    utime = os.utime
+
+    def swept_utime(target, *args, **kwargs):
+        if target == path and os.path.exists(path):
+            os.remove(path)
+        return utime(target, *args, **kwargs)
+
+    monkeypatch.setattr(os, "utime", swept_utime)
+    assert storage.store(_temp(str(tmp_path), b"image"), "draw_lucky8") == path
+
+    assert open(path, "rb").read() == b"image"
+    assert not list(tmp_path.glob(".render_*"))
+    assert storage.get_stats()["dedup_hits"] == 0
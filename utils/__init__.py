@@ -1,4 +1,11 @@
 """工具模块"""
-from utils.draw_image_generator import DrawImageGenerator, get_draw_image_generator
+from utils.draw_image_generator import (
+    DrawImageGenerator,
+    get_draw_image_generator,
+    get_render_stats,
+    shutdown_render_executor,
+)
+from utils.upload_storage import UploadStorage, get_upload_storage
 
-__all__ = ['DrawImageGenerator', 'get_draw_image_generator']
+__all__ = ['DrawImageGenerator', 'get_draw_image_generator', 'get_render_stats', 'shutdown_render_executor',
+           'UploadStorage', 'get_upload_storage']
@@ -3,15 +3,45 @@
 对应 bot-server.js 中的 draw-image.js
 完全复刻Node.js版本的表格结构和样式
 """
+import asyncio
 import logging
+import multiprocessing
 import os
-from typing import List, Dict, Any, Optional
+import threading
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageColor, ImageDraw, ImageFont
 import tempfile
 
+from utils.upload_storage import get_upload_storage
+
 logger = logging.getLogger(__name__)
 
+# 对应 Node.js line 312-320（增加开奖号码列宽度，确保长号码能完整显示）
+LUCKY8_HEADERS = ['期号', '开奖号码', '特码', '宝', '大小', '单双']
+LUCKY8_COL_WIDTHS = [100, 350, 100, 100, 100, 100]
+LIUHECAI_HEADERS = ["期号", "特码", "时间"]
+LIUHECAI_COL_WIDTHS = [200, 150, 300]
+
+# 图片只含灰度：按 'L' 模式渲染，保存时映射到16级灰度调色板（4位PNG）
+# 前7级为表格用到的精确颜色（白/#fafafa/#f5f5f5/#e0e0e0/#cccccc/#999999/黑），其余为文字抗锯齿过渡
+PALETTE_LEVELS = [255, 250, 245, 224, 204, 153, 0, 16, 40, 64, 88, 112, 130, 176, 190, 236]
+_PALETTE_LUT = [
+    min(range(len(PALETTE_LEVELS)), key=lambda i: abs(PALETTE_LEVELS[i] - value))
+    for value in range(256)
+]
+_PALETTE_RGB = [channel for level in PALETTE_LEVELS for channel in (level, level, level)]
+# zlib 压缩级别：9级体积仅再小约20%，编码耗时却是6级的约8倍
+PNG_COMPRESS_LEVEL = 6
+
+
+@lru_cache(maxsize=None)
+def _ink(fill: str, mode: str) -> int:
+    return ImageColor.getcolor(fill, mode)
+
 
 class DrawImageGenerator:
     """开奖图片生成器 - 完全对应Node.js版本"""
@@ -36,6 +66,16 @@ class DrawImageGenerator:
         self.row_height = 45
         self.padding = 20
 
+        # 渲染缓存：{game_type: ((game_type, 最新期号, 行数), 图片路径)}
+        # 开奖历史为全局序列，同一期所有群的图片相同，每期只渲染一次
+        self._render_cache: Dict[str, Tuple[Tuple[str, str, int], str]] = {}
+        # 正在渲染的任务（同一期并发请求共享一次渲染）
+        self._rendering: Dict[Tuple[str, str, int], asyncio.Task] = {}
+
+        # 静态底图 {(game_type, 行数): Image}，字形 {(字体, 字符): (蒙版, x偏移, y偏移, 步进)}
+        self._templates: Dict[Tuple[str, int], Image.Image] = {}
+        self._glyphs: Dict[Tuple[int, str], Tuple[Optional[Image.Image], int, int, float]] = {}
+
         # 尝试加载字体
         self.font = self._load_font(16)  # 普通字体，增大以更清晰
         self.header_font = self._load_font(18, bold=True)  # 表头加粗
@@ -79,97 +119,151 @@ class DrawImageGenerator:
             logger.error(f"❌ 加载字体失败: {str(e)}")
             return ImageFont.load_default()
 
-    def generate_lucky8_image(
-        self,
-        draws: List[Dict[str, Any]],
-        save_path: Optional[str] = None
-    ) -> str:
-        """
-        生成澳洲幸运8开奖历史图片
-        对应 Node.js generateCanvasImage() line 306-439
+    # ==================== 模板与字形缓存 ====================
 
-        表格结构（6列）：期号 | 开奖号码 | 特码 | 宝 | 大小 | 单双
-
-        Args:
-            draws: 开奖记录列表
-            save_path: 保存路径
+    def _glyph(self, font: ImageFont, char: str) -> Tuple[Optional[Image.Image], int, int, float]:
+        """
+        单个字符的字形位图与度量（缓存）
 
         Returns:
-            str: 图片文件路径
+            Tuple: (灰度蒙版, x偏移, y偏移, 步进宽度)；空白字符蒙版为 None
         """
-        if not draws:
-            logger.warning("⚠️ 开奖记录为空，无法生成图片")
-            return None
-
-        # 对应 Node.js line 312-320
-        headers = ['期号', '开奖号码', '特码', '宝', '大小', '单双']
-        # 增加开奖号码列宽度，确保长号码能完整显示
-        col_widths = [100, 350, 100, 100, 100, 100]
-
-        # 计算列位置 - 对应 Node.js line 336-339
-        col_x = [self.padding]
-        for i in range(len(col_widths) - 1):
-            col_x.append(col_x[-1] + col_widths[i])
+        key = (id(font), char)
+        glyph = self._glyphs.get(key)
+        if glyph is None:
+            left, top, right, bottom = font.getbbox(char)
+            mask = None
+            if right > left and bottom > top:
+                mask = Image.new('L', (right - left, bottom - top), 0)
+                ImageDraw.Draw(mask).text((-left, -top), char, fill=255, font=font)
+            glyph = (mask, left, top, font.getlength(char))
+            self._glyphs[key] = glyph
+        return glyph
+
+    def _text_width(self, text: str, font: ImageFont) -> int:
+        return int(sum(self._glyph(font, char)[3] for char in text))
+
+    def _draw_text(self, image: Image.Image, xy: Tuple[int, int], text: str, font: ImageFont, fill: str = '#000000'):
+        """用缓存的字形位图绘制文字（与 ImageDraw.text 的左上基准一致）"""
+        ink = _ink(fill, image.mode)
+        x, y = xy
+        pen = float(x)
+        for char in text:
+            mask, left, top, advance = self._glyph(font, char)
+            if mask is not None:
+                box_x, box_y = int(pen) + left, y + top
+                image.paste(ink, (box_x, box_y, box_x + mask.width, box_y + mask.height), mask)
+            pen += advance
+
+    def _draw_centered(self, image: Image.Image, center_x: int, y: int, text: str, font: ImageFont, fill: str = '#000000'):
+        self._draw_text(image, (center_x - self._text_width(text, font) // 2, y), text, font, fill)
+
+    def _draw_footer(self, image: Image.Image, draws: List[Dict[str, Any]]):
+        """
+        底部时间取图中最新一期的开奖时间（无开奖时间时取当前时间），
+        相同开奖数据渲染出相同图片，上传目录按内容哈希去重
+        """
+        latest = None
+        for draw_data in draws:
+            draw_time = draw_data.get('draw_time') or draw_data.get('timestamp')
+            if isinstance(draw_time, datetime):
+                draw_time = draw_time.strftime('%Y-%m-%d %H:%M:%S')
+            if draw_time and (latest is None or str(draw_time) > latest):
+                latest = str(draw_time)
+        footer_text = f"生成时间: {latest or datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        self._draw_centered(image, self.width // 2, image.height - 25, footer_text, self.footer_font, '#999999')
+
+    def _save_png(self, image: Image.Image, save_path: str):
+        """按固定灰度调色板保存为4位调色板PNG"""
+        indexed = Image.frombytes('P', image.size, image.point(_PALETTE_LUT).tobytes())
+        indexed.putpalette(_PALETTE_RGB)
+        indexed.save(save_path, format='PNG', bits=4, compress_level=PNG_COMPRESS_LEVEL)
+
+    def _lucky8_template(self, rows: int) -> Image.Image:
+        """澳洲幸运8静态底图：表头、网格线、交替行背景（按行数缓存）"""
+        key = ('lucky8', rows)
+        template = self._templates.get(key)
+        if template is not None:
+            return template
 
-        # 计算图片高度 - 对应 Node.js line 322-326
-        rows = min(len(draws), 15)  # 最多显示15期
         height = self.header_height + self.row_height * (rows + 1) + 40
+        col_x = self._lucky8_col_x()
 
-        # 创建图片 - 对应 Node.js line 328-333
-        image = Image.new('RGB', (self.width, height), color='white')
-        draw_ctx = ImageDraw.Draw(image)
+        # 对应 Node.js line 328-333
+        template = Image.new('L', (self.width, height), color='white')
+        draw_ctx = ImageDraw.Draw(template)
 
         # ==================== 绘制表头 ====================
         # 对应 Node.js line 341-356
-
-        # 表头背景 (#f5f5f5)
         draw_ctx.rectangle(
             [self.padding, 10, self.width - self.padding, 10 + self.header_height],
             fill='#f5f5f5',
             outline='#cccccc',
             width=1
         )
-
-        # 表头竖线
-        for i in range(1, len(col_widths)):
-            x = col_x[i]
+        for x in col_x[1:]:
             draw_ctx.line([(x, 10), (x, 10 + self.header_height)], fill='#cccccc', width=1)
 
         # 表头文字 - 对应 Node.js line 358-365
         # Node.js: ctx.fillText(header, colX[i] + colWidths[i] / 2, 30 + 8);
-        for i, header in enumerate(headers):
-            text_x = col_x[i] + col_widths[i] // 2
-            text_y = 30 + 8  # 对应Node.js的固定位置
-            # 居中绘制
-            bbox = draw_ctx.textbbox((0, 0), header, font=self.header_font)
-            text_width = bbox[2] - bbox[0]
-            draw_ctx.text(
-                (text_x - text_width // 2, text_y),
-                header,
-                fill='#000000',
-                font=self.header_font
-            )
-
-        # ==================== 绘制数据行 ====================
-        # 对应 Node.js line 367-426
+        for i, header in enumerate(LUCKY8_HEADERS):
+            self._draw_centered(template, col_x[i] + LUCKY8_COL_WIDTHS[i] // 2, 30 + 8, header, self.header_font)
 
-        for index, draw_data in enumerate(draws[:15]):  # 最多15期
+        # ==================== 数据行底纹 ====================
+        # 对应 Node.js line 373-388
+        for index in range(rows):
             row_y = 10 + self.header_height + self.row_height * index
-
-            # 行背景（交替颜色） - 对应 Node.js line 373-375
-            bg_color = '#ffffff' if index % 2 == 0 else '#fafafa'
             draw_ctx.rectangle(
                 [self.padding, row_y, self.width - self.padding, row_y + self.row_height],
-                fill=bg_color,
+                fill='#ffffff' if index % 2 == 0 else '#fafafa',
                 outline='#e0e0e0',
                 width=1
             )
-
-            # 列竖线 - 对应 Node.js line 382-388
-            for i in range(1, len(col_widths)):
-                x = col_x[i]
+            for x in col_x[1:]:
                 draw_ctx.line([(x, row_y), (x, row_y + self.row_height)], fill='#e0e0e0', width=1)
 
+        self._templates[key] = template
+        return template
+
+    def _lucky8_col_x(self) -> List[int]:
+        # 计算列位置 - 对应 Node.js line 336-339
+        col_x = [self.padding]
+        for width in LUCKY8_COL_WIDTHS[:-1]:
+            col_x.append(col_x[-1] + width)
+        return col_x
+
+    def generate_lucky8_image(
+        self,
+        draws: List[Dict[str, Any]],
+        save_path: Optional[str] = None
+    ) -> str:
+        """
+        生成澳洲幸运8开奖历史图片
+        对应 Node.js generateCanvasImage() line 306-439
+
+        表格结构（6列）：期号 | 开奖号码 | 特码 | 宝 | 大小 | 单双
+        静态部分取自缓存的底图，只绘制各单元格文字与底部时间
+
+        Args:
+            draws: 开奖记录列表
+            save_path: 保存路径
+
+        Returns:
+            str: 图片文件路径
+        """
+        if not draws:
+            logger.warning("⚠️ 开奖记录为空，无法生成图片")
+            return None
+
+        rows = min(len(draws), 15)  # 最多显示15期
+        image = self._lucky8_template(rows).copy()
+        col_x = self._lucky8_col_x()
+
+        # ==================== 绘制数据行 ====================
+        # 对应 Node.js line 367-426
+        for index, draw_data in enumerate(draws[:rows]):
+            row_y = 10 + self.header_height + self.row_height * index
+
             # 提取数据 - 对应 Node.js line 390-408
             issue = draw_data.get('issue', f'{index + 1}')
             draw_code = draw_data.get('draw_code', '')
@@ -196,31 +290,13 @@ class DrawImageGenerator:
 
             # 绘制文字 - 对应 Node.js line 420-425
             # Node.js: ctx.fillText(text, colX[i] + colWidths[i] / 2, rowY + rowHeight / 2 + 5);
+            text_y = row_y + self.row_height // 2 + 5
             for i, text in enumerate(data):
-                text_x = col_x[i] + col_widths[i] // 2
-                text_y = row_y + self.row_height // 2 + 5  # 对应Node.js
-
-                # 居中绘制
-                bbox = draw_ctx.textbbox((0, 0), text, font=self.font)
-                text_width = bbox[2] - bbox[0]
-                draw_ctx.text(
-                    (text_x - text_width // 2, text_y),
-                    text,
-                    fill='#000000',
-                    font=self.font
-                )
+                self._draw_centered(image, col_x[i] + LUCKY8_COL_WIDTHS[i] // 2, text_y, text, self.font)
 
         # ==================== 底部时间 ====================
         # 对应 Node.js line 428-432
-        footer_text = f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-        bbox = draw_ctx.textbbox((0, 0), footer_text, font=self.footer_font)
-        text_width = bbox[2] - bbox[0]
-        draw_ctx.text(
-            (self.width // 2 - text_width // 2, height - 25),
-            footer_text,
-            fill='#999999',
-            font=self.footer_font
-        )
+        self._draw_footer(image, draws[:rows])
 
         # 保存图片 - 对应 Node.js line 240-248
         if not save_path:
@@ -228,11 +304,34 @@ class DrawImageGenerator:
             filename = f"draw_lucky8_{issue}.png"
             save_path = os.path.join(self.uploads_dir, filename)
 
-        image.save(save_path)
+        self._save_png(image, save_path)
         logger.info(f"✅ 澳洲幸运8图片已生成: {save_path}")
 
         return save_path
 
+    def _liuhecai_template(self, rows: int) -> Image.Image:
+        """六合彩静态底图：标题与表头（按行数缓存）"""
+        key = ('liuhecai', rows)
+        template = self._templates.get(key)
+        if template is not None:
+            return template
+
+        image_height = (rows + 1) * self.row_height + self.padding * 2
+        template = Image.new('L', (self.width, image_height), color='white')
+
+        # 绘制标题
+        self._draw_text(template, (self.width // 2 - 120, self.padding), "【六合彩开奖历史】", self.font)
+
+        # 绘制表头
+        header_y = self.padding + self.row_height
+        x_offset = self.padding
+        for header, width in zip(LIUHECAI_HEADERS, LIUHECAI_COL_WIDTHS):
+            self._draw_text(template, (x_offset, header_y), header, self.font)
+            x_offset += width
+
+        self._templates[key] = template
+        return template
+
     def generate_liuhecai_image(
         self,
         draws: List[Dict[str, Any]],
@@ -256,31 +355,10 @@ class DrawImageGenerator:
             logger.warning("⚠️ 开奖记录为空，无法生成图片")
             return None
 
-        # 计算图片高度
-        row_count = len(draws) + 1  # +1 for header
-        image_height = row_count * self.row_height + self.padding * 2
-
-        # 创建图片
-        image = Image.new('RGB', (self.width, image_height), color='white')
-        draw = ImageDraw.Draw(image)
-
-        # 绘制标题
-        title = "【六合彩开奖历史】"
-        title_y = self.padding
-        draw.text((self.width // 2 - 120, title_y), title, fill='black', font=self.font)
-
-        # 绘制表头
-        header_y = title_y + self.row_height
-        headers = ["期号", "特码", "时间"]
-        col_widths = [200, 150, 300]
-        x_offset = self.padding
-
-        for i, header in enumerate(headers):
-            draw.text((x_offset, header_y), header, fill='black', font=self.font)
-            x_offset += col_widths[i]
+        image = self._liuhecai_template(len(draws)).copy()
 
         # 绘制数据行
-        y_offset = header_y + self.row_height
+        y_offset = self.padding + self.row_height * 2
 
         for draw_data in draws:
             issue = str(draw_data.get('issue', 'N/A'))
@@ -295,11 +373,9 @@ class DrawImageGenerator:
 
             # 绘制每一列
             x_offset = self.padding
-            values = [issue, special_number, time_str]
-
-            for i, value in enumerate(values):
-                draw.text((x_offset, y_offset), value, fill='black', font=self.font)
-                x_offset += col_widths[i]
+            for value, width in zip([issue, special_number, time_str], LIUHECAI_COL_WIDTHS):
+                self._draw_text(image, (x_offset, y_offset), value, self.font)
+                x_offset += width
 
             y_offset += self.row_height
 
@@ -311,7 +387,7 @@ class DrawImageGenerator:
             filename = f"draw_liuhecai_{issue}.png"
             save_path = os.path.join(self.uploads_dir, filename)
 
-        image.save(save_path)
+        self._save_png(image, save_path)
         logger.info(f"✅ 六合彩图片已生成: {save_path}")
 
         return save_path
@@ -342,6 +418,68 @@ class DrawImageGenerator:
             return None
 
 
+    @staticmethod
+    def _cache_key(game_type: str, draws: List[Dict[str, Any]]) -> Tuple[str, str, int]:
+        latest_issue = str(draws[0].get('issue')) if draws else ''
+        return (game_type, latest_issue, len(draws))
+
+    def get_cached_image(self, game_type: str, draws: List[Dict[str, Any]]) -> Optional[str]:
+        """命中渲染缓存时返回图片路径（文件已被清理视为未命中）"""
+        cached = self._render_cache.get(game_type)
+        if cached and cached[0] == self._cache_key(game_type, draws) and os.path.exists(cached[1]):
+            return cached[1]
+        return None
+
+    async def generate_image_cached(
+        self,
+        game_type: str,
+        draws: List[Dict[str, Any]]
+    ) -> Optional[str]:
+        """
+        带缓存的开奖图片生成
+
+        缓存键为 (game_type, 最新期号, 行数)：同一期重复调用直接返回已生成的文件，
+        新一期到来时替换该游戏的缓存；渲染在工作池中执行（见 render_image），不阻塞事件循环
+
+        Args:
+            game_type: 游戏类型（lucky8/liuhecai）
+            draws: 开奖记录列表（新到旧）
+
+        Returns:
+            str: 图片文件路径，失败返回 None
+        """
+        cached = self.get_cached_image(game_type, draws)
+        if cached:
+            return cached
+
+        key = self._cache_key(game_type, draws)
+        task = self._rendering.get(key)
+        if task is None:
+            # 渲染作为独立任务运行，由所有等待者共享：某个调用方被取消不会影响其他等待者
+            task = asyncio.ensure_future(self._render_and_cache(game_type, draws, key))
+            self._rendering[key] = task
+            task.add_done_callback(lambda t: self._on_render_done(key, t))
+        return await asyncio.shield(task)
+
+    async def _render_and_cache(
+        self,
+        game_type: str,
+        draws: List[Dict[str, Any]],
+        key: Tuple[str, str, int]
+    ) -> Optional[str]:
+        path = await render_image(game_type, draws, self.uploads_dir)
+        if path:
+            self._render_cache[game_type] = (key, path)
+        return path
+
+    def _on_render_done(self, key: Tuple[str, str, int], task: asyncio.Task):
+        if self._rendering.get(key) is task:
+            del self._rendering[key]
+        # 所有等待者都已取消时避免 "exception was never retrieved" 警告
+        if not task.cancelled():
+            task.exception()
+
+
 # 全局单例
 _generator: Optional[DrawImageGenerator] = None
 
@@ -352,3 +490,100 @@ def get_draw_image_generator() -> DrawImageGenerator:
     if _generator is None:
         _generator = DrawImageGenerator()
     return _generator
+
+
+# ==================== 渲染工作池 ====================
+# Pillow 绘图与 PNG 编码为 CPU 密集操作，放到有界工作池中执行：
+# - IMAGE_RENDER_MODE: thread（默认，线程池）/ process（进程池，绕开 GIL，适合多核）
+# - IMAGE_RENDER_WORKERS: 工作线程/进程数（默认2）
+# 每个工作线程/进程在启动时创建自己的生成器并预加载字体
+
+_render_executor: Optional[Executor] = None
+_render_stats = {"queue_depth": 0, "rendered": 0, "failed": 0}
+_worker_local = threading.local()
+
+
+def _init_render_worker():
+    """工作线程/进程初始化：预加载字体"""
+    _worker_local.generator = DrawImageGenerator()
+
+
+def _render_in_worker(game_type: str, draws: List[Dict[str, Any]], uploads_dir: str) -> Optional[str]:
+    """
+    在工作线程/进程中渲染图片，交由 UploadStorage 按内容哈希分目录保存
+
+    先写临时文件再原子替换，并发渲染同一内容时不会读到半成品
+    """
+    generator = getattr(_worker_local, 'generator', None)
+    if generator is None:
+        _init_render_worker()
+        generator = _worker_local.generator
+
+    temp_path = os.path.join(uploads_dir, f".render_{game_type}_{uuid.uuid4().hex}.png")
+    if not generator.generate_image(game_type, draws, temp_path):
+        return None
+    return get_upload_storage(uploads_dir).store(temp_path, f"draw_{game_type}")
+
+
+def get_render_executor() -> Executor:
+    """获取渲染工作池（首次调用时按配置创建）"""
+    global _render_executor
+    if _render_executor is None:
+        workers = max(int(os.getenv('IMAGE_RENDER_WORKERS', '2')), 1)
+        if os.getenv('IMAGE_RENDER_MODE', 'thread') == 'process':
+            # spawn：避免在已有事件循环和线程的进程中 fork
+            _render_executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_render_worker
+            )
+        else:
+            _render_executor = ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix='draw-render',
+                initializer=_init_render_worker
+            )
+        logger.info(f"✅ 开奖图片渲染工作池已创建: {type(_render_executor).__name__} x{workers}")
+    return _render_executor
+
+
+async def render_image(game_type: str, draws: List[Dict[str, Any]], uploads_dir: str) -> Optional[str]:
+    """
+    在渲染工作池中生成开奖图片
+
+    Args:
+        game_type: 游戏类型（lucky8/liuhecai）
+        draws: 开奖记录列表
+        uploads_dir: 图片保存目录
+
+    Returns:
+        str: 图片文件路径，失败返回 None
+    """
+    loop = asyncio.get_running_loop()
+    _render_stats["queue_depth"] += 1
+    try:
+        path = await loop.run_in_executor(get_render_executor(), _render_in_worker, game_type, draws, uploads_dir)
+    except Exception:
+        _render_stats["failed"] += 1
+        raise
+    finally:
+        _render_stats["queue_depth"] -= 1
+    _render_stats["rendered"] += 1
+    return path
+
+
+def get_render_stats() -> Dict[str, Any]:
+    """渲染工作池状态（queue_depth 为已提交未完成的渲染数，含正在执行的）"""
+    return {
+        "mode": os.getenv('IMAGE_RENDER_MODE', 'thread'),
+        "workers": int(os.getenv('IMAGE_RENDER_WORKERS', '2')),
+        **_render_stats,
+    }
+
+
+def shutdown_render_executor():
+    """关闭渲染工作池（应用关闭时调用）"""
+    global _render_executor
+    if _render_executor is not None:
+        _render_executor.shutdown(wait=False, cancel_futures=True)
+        _render_executor = None
@@ -0,0 +1,223 @@
+"""
+开奖图片存储管理
+图片按内容哈希命名并分目录存放（{UPLOADS_DIR}/{哈希前2位}/draw_{game_type}_{哈希}.png），
+相同内容只存一份；后台清理任务按保留时长和总容量（LRU，按最后使用时间）淘汰旧图片
+
+UPLOADS_DIR 与悦聊服务共用，清理只处理本模块写入的 draw_*.png 及渲染残留的临时文件
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 受管理的文件：开奖图片（含改造前直接写在根目录的 draw_{game_type}_{issue}.png）
+MANAGED_PREFIX = "draw_"
+MANAGED_SUFFIX = ".png"
+# 渲染临时文件前缀（见 utils.draw_image_generator._render_in_worker）
+TEMP_PREFIX = ".render_"
+# 临时文件超过该时长仍未被替换，视为渲染中断的残留
+TEMP_MAX_AGE_SECONDS = 3600
+
+
+class UploadStorage:
+    """
+    上传目录管理器
+
+    - store: 按内容哈希原子落盘，已存在则只刷新最后使用时间
+    - sweep: 删除超过保留时长的文件，再按最后使用时间从旧到新删除直到总容量不超过上限
+    """
+
+    def __init__(
+        self,
+        root: str,
+        max_bytes: Optional[int] = None,
+        max_age_hours: Optional[float] = None,
+        shard_chars: Optional[int] = None
+    ):
+        self.root = root
+        self.max_bytes = max_bytes if max_bytes is not None else int(float(os.getenv("UPLOADS_MAX_MB", "2048")) * 1024 * 1024)
+        self.max_age_hours = max_age_hours if max_age_hours is not None else float(os.getenv("UPLOADS_MAX_AGE_HOURS", "72"))
+        self.shard_chars = shard_chars if shard_chars is not None else int(os.getenv("UPLOADS_SHARD_CHARS", "2"))
+
+        self._stats: Dict[str, Any] = {
+            "files": None,
+            "bytes": None,
+            "last_sweep_at": None,
+            "evicted_files": 0,
+            "evicted_bytes": 0,
+            "dedup_hits": 0,
+        }
+        self._task: Optional[asyncio.Task] = None
+
+    # ==================== 写入 ====================
+
+    def store(self, temp_path: str, prefix: str) -> str:
+        """
+        按内容哈希保存文件
+
+        Args:
+            temp_path: 已写完的临时文件（与 root 在同一文件系统，保证 os.replace 原子）
+            prefix: 文件名前缀，如 draw_lucky8
+
+        Returns:
+            str: 最终文件的绝对路径
+        """
+        with open(temp_path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:16]
+
+        shard_dir = os.path.join(self.root, digest[:self.shard_chars]) if self.shard_chars else self.root
+        os.makedirs(shard_dir, exist_ok=True)
+        final_path = os.path.join(shard_dir, f"{prefix}_{digest}{MANAGED_SUFFIX}")
+
+        try:
+            # 相同内容已存在：刷新最后使用时间（LRU），丢弃新文件
+            os.utime(final_path)
+        except FileNotFoundError:
+            # 不存在，或刚被后台清理线程删除：写入新文件
+            os.replace(temp_path, final_path)
+        else:
+            os.remove(temp_path)
+            self._stats["dedup_hits"] += 1
+        return final_path
+
+    def public_path(self, path: str) -> str:
+        """文件相对 root 的 URL 路径（用于 /uploads/...）"""
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    # ==================== 清理 ====================
+
+    def _scan(self) -> Tuple[List[Tuple[float, int, str]], List[str]]:
+        """
+        扫描受管理的文件
+
+        Returns:
+            Tuple: ([(最后使用时间, 字节数, 路径)], [过期临时文件路径])
+        """
+        files = []
+        stale_temps = []
+        now = time.time()
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if name.startswith(TEMP_PREFIX):
+                    if now - stat.st_mtime > TEMP_MAX_AGE_SECONDS:
+                        stale_temps.append(path)
+                elif name.startswith(MANAGED_PREFIX) and name.endswith(MANAGED_SUFFIX):
+                    files.append((stat.st_mtime, stat.st_size, path))
+        return files, stale_temps
+
+    def _remove(self, path: str, size: int, mtime: Optional[float] = None) -> bool:
+        try:
+            # 扫描后被 store 刷新过最后使用时间（重新被使用）的文件保留
+            if mtime is not None and os.stat(path).st_mtime != mtime:
+                return False
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        self._stats["evicted_files"] += 1
+        self._stats["evicted_bytes"] += size
+        return True
+
+    def sweep(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        执行一次清理（同步，IO 密集，后台任务中放到线程执行）
+
+        Returns:
+            Dict: removed_files / removed_bytes / files / bytes
+        """
+        now = now if now is not None else time.time()
+        files, stale_temps = self._scan()
+        removed_files = 0
+        removed_bytes = 0
+
+        for path in stale_temps:
+            if self._remove(path, 0):
+                removed_files += 1
+
+        # 按最后使用时间从旧到新
+        files.sort()
+        expire_before = now - self.max_age_hours * 3600
+        total_bytes = sum(size for _, size, _ in files)
+        kept = []
+        for mtime, size, path in files:
+            if mtime < expire_before or total_bytes > self.max_bytes:
+                if self._remove(path, size, mtime):
+                    removed_files += 1
+                    removed_bytes += size
+                    total_bytes -= size
+                elif os.path.exists(path):
+                    kept.append(path)
+                else:
+                    total_bytes -= size
+            else:
+                kept.append(path)
+
+        self._stats["files"] = len(kept)
+        self._stats["bytes"] = total_bytes
+        self._stats["last_sweep_at"] = now
+        if removed_files:
+            logger.info(f"🧹 开奖图片清理: 删除 {removed_files} 个文件（{removed_bytes} 字节），剩余 {len(kept)} 个")
+        return {
+            "removed_files": removed_files,
+            "removed_bytes": removed_bytes,
+            "files": len(kept),
+            "bytes": total_bytes,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """磁盘占用指标（files/bytes 为最近一次清理后的统计）"""
+        return {
+            "root": self.root,
+            "max_bytes": self.max_bytes,
+            "max_age_hours": self.max_age_hours,
+            **self._stats,
+        }
+
+    def start(self, interval_minutes: int = 30):
+        """启动后台清理任务（启动时立即执行一次）"""
+        if self._task is not None:
+            logger.warning("⚠️ 图片清理任务已运行，跳过重复启动")
+            return
+
+        async def _loop():
+            while True:
+                try:
+                    await asyncio.to_thread(self.sweep)
+                except Exception as e:
+                    logger.error(f"❌ 开奖图片清理失败: {str(e)}", exc_info=True)
+                await asyncio.sleep(interval_minutes * 60)
+
+        self._task = asyncio.create_task(_loop())
+        logger.info(f"🧹 开奖图片清理任务已启动（间隔 {interval_minutes} 分钟）")
+
+    async def stop(self):
+        """停止后台清理任务"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+# 全局单例（按上传目录）
+_storages: Dict[str, UploadStorage] = {}
+
+
+def get_upload_storage(root: str) -> UploadStorage:
+    """获取指定上传目录的 UploadStorage 单例"""
+    storage = _storages.get(root)
+    if storage is None:
+        storage = UploadStorage(root)
+        _storages[root] = storage
+    return storage